@@ -0,0 +1,53 @@
+import asyncio
+from typing import Optional, Sequence, Tuple
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page
+
+from src.application.flows.checkpoints import CheckpointerCore, build_checkpointer
+
+
+class AsyncPageCheckpointer(CheckpointerCore):
+    """Async-вариант PageCheckpointer для flows.aio.scenario_engine.run_scenario.
+
+    Работа с CheckpointStore (файлы на диске) идёт в отдельном потоке.
+    """
+
+    page: Page
+
+    async def _probe(self, url: str) -> bool:
+        try:
+            response = await self.page.goto(url, timeout=self.probe_timeout_ms)
+        except PlaywrightError:
+            return False
+        return self._probe_passed(response, url)
+
+    async def resume(self) -> Tuple[str, ...]:
+        checkpoint = await asyncio.to_thread(self.store.load, self.key)
+        if checkpoint is None:
+            return ()
+
+        context = self.page.context
+        state = checkpoint["storage_state"]
+        if hasattr(context, "set_storage_state"):
+            await context.set_storage_state(state)
+        else:
+            await context.add_cookies(state.get("cookies", []))
+
+        if not await self._probe(checkpoint["url"]):
+            return await asyncio.to_thread(self._rejected, checkpoint)
+        return self._resumed(checkpoint)
+
+    async def save(self, completed: Sequence[str]) -> None:
+        state = await self.page.context.storage_state()
+        await asyncio.to_thread(self._save, completed, state)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    async def drop_before(self, step: str) -> None:
+        await asyncio.to_thread(self._drop_before, step)
+
+
+def default_checkpointer(page: Page, key: str) -> Optional[AsyncPageCheckpointer]:
+    return build_checkpointer(AsyncPageCheckpointer, page, key)
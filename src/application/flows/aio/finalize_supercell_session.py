@@ -0,0 +1,71 @@
+from typing import Optional
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page
+
+from src.application.flows.finalize_supercell_session import (
+    LOGOUT_FAST,
+    LOGOUT_UI,
+    FinalizeReport,
+    logout_fallback_event,
+    logout_status,
+)
+from src.infrastructure.browser.aio.supercell_store_client import AsyncSupercellStoreClient
+from src.infrastructure.browser.deadlines import task_deadline
+from src.infrastructure.config.app_config import FinalizeConfig, load_app_config
+from src.infrastructure.logging.tracing import traced
+
+
+async def open_account(client: AsyncSupercellStoreClient, account_url: Optional[str], cfg: FinalizeConfig) -> None:
+    with task_deadline(cfg.account_timeout_ms):
+        await client.open_account_page(account_url=account_url, timeout_ms=cfg.account_timeout_ms)
+
+
+async def detach_payment(client: AsyncSupercellStoreClient, cfg: FinalizeConfig) -> bool:
+    with task_deadline(cfg.detach_timeout_ms):
+        return await client.detach_payment_method()
+
+
+async def logout_session(client: AsyncSupercellStoreClient, account_url: Optional[str], cfg: FinalizeConfig) -> str:
+    """Async-вариант flows.finalize_supercell_session.logout_session."""
+
+    if cfg.logout == LOGOUT_FAST:
+        try:
+            await client.clear_session()
+            if await client.is_logged_out(account_url, timeout_ms=cfg.verify_timeout_ms):
+                return LOGOUT_FAST
+            logout_fallback_event("account page still available after clearing cookies")
+        except PlaywrightError as exc:
+            logout_fallback_event(f"{type(exc).__name__}: {exc}")
+
+    with task_deadline(cfg.ui_logout_timeout_ms):
+        if not await client.logout_supercell(timeout_ms=cfg.ui_logout_timeout_ms):
+            raise RuntimeError("Кнопка выхода из аккаунта Supercell не найдена")
+    return LOGOUT_UI
+
+
+@traced(kind="flow")
+async def finalize_supercell_session(page: Page) -> FinalizeReport:
+    """Async-вариант finalize_supercell_session: шаги со сроками и отчёт FinalizeReport."""
+
+    supercell = load_app_config().supercell
+    cfg = load_app_config().finalize
+    client = AsyncSupercellStoreClient(page=page, base_url=supercell.base_url, game_slug=supercell.game_slug)
+    report = FinalizeReport()
+
+    with report.step("open_account"):
+        await open_account(client, supercell.account_url, cfg)
+
+    if report.failed("open_account"):
+        report.skip("detach_payment", "account page not opened")
+    else:
+        with report.step("detach_payment") as outcome:
+            if not await detach_payment(client, cfg):
+                outcome.detail = "no payment method attached"
+
+    with report.step("logout") as outcome:
+        outcome.detail = await logout_session(client, supercell.account_url, cfg)
+        outcome.status = logout_status(cfg, outcome.detail)
+
+    report.log()
+    return report
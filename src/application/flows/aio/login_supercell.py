@@ -0,0 +1,83 @@
+import asyncio
+import inspect
+from typing import Awaitable, Callable, Optional, Union
+
+from playwright.async_api import Page
+
+from src.application.flows.login_supercell import load_supercell_config
+from src.infrastructure.browser.aio.supercell_store_client import AsyncSupercellStoreClient
+from src.infrastructure.browser.session_store import SessionStore, default_session_store
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.config.settings import SupercellSettings
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import traced
+from src.infrastructure.otp.providers import default_otp_provider
+
+
+OtpProvider = Callable[[], Union[str, Awaitable[str]]]
+
+
+async def _reuse_saved_session(client: AsyncSupercellStoreClient, store: SessionStore, account: str) -> bool:
+    """Async-аналог пробы сохранённой сессии: storage_state применяется здесь же,
+    т.к. SessionStore.restore работает с синхронным контекстом. Файлы SessionStore
+    читаются и пишутся в отдельном потоке."""
+
+    context = client.page.context
+    state = await asyncio.to_thread(store.load, client.base_url, account, client.game_slug)
+    if state is None:
+        return False
+
+    if hasattr(context, "set_storage_state"):
+        await context.set_storage_state(state)
+    else:
+        await context.add_cookies(state.get("cookies", []))
+
+    probe_timeout_ms = load_app_config().sessions.probe_timeout_ms
+    if await client.is_logged_in(timeout_ms=probe_timeout_ms):
+        log_event(stage="login", status="ok", message="Reused saved Supercell session")
+        return True
+
+    # Сессия протухла на стороне сервера: удаляем её и логинимся заново.
+    await asyncio.to_thread(store.invalidate, client.base_url, account, client.game_slug)
+    await context.clear_cookies()
+    log_event(stage="login", status="info", message="Saved Supercell session rejected by probe")
+    return False
+
+
+@traced(kind="flow")
+async def login_supercell_with_manual_otp(
+    page: Page,
+    settings: SupercellSettings,
+    session_store: Optional[SessionStore] = None,
+    otp_provider: Optional[OtpProvider] = None,
+) -> None:
+    """Async-вариант login_supercell_with_manual_otp.
+
+    otp_provider может быть обычной или async-функцией; без него провайдер выбирается
+    по OTP_MODE и ждёт код (консоль или почтовый ящик) в отдельном потоке, чтобы не
+    блокировать остальные сессии event loop.
+    """
+
+    cfg = load_supercell_config()
+    client = AsyncSupercellStoreClient(page=page, base_url=cfg.base_url, game_slug=cfg.game_slug)
+    store = session_store or default_session_store()
+
+    if store is not None and await _reuse_saved_session(client, store, settings.brawl_email):
+        return
+
+    default_provider = default_otp_provider(settings) if otp_provider is None else None
+    await client.start_login(settings.brawl_email)
+
+    if otp_provider is not None:
+        code = otp_provider()
+        otp_code = (await code if inspect.isawaitable(code) else code).strip()
+    else:
+        otp_code = (await asyncio.to_thread(default_provider)).strip()
+    if not otp_code:
+        raise RuntimeError("ОТП-код не был введён")
+
+    await client.complete_login_with_otp(otp_code)
+
+    if store is not None:
+        state = await page.context.storage_state()
+        await asyncio.to_thread(store.save_state, client.base_url, settings.brawl_email, client.game_slug, state)
@@ -0,0 +1,16 @@
+from playwright.async_api import Page
+
+from src.application.flows.finalize_supercell_session import FinalizeReport
+from src.domain.order import Order
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.config.settings import GooglePaySettings
+from src.infrastructure.logging.tracing import traced
+from src.application.flows.aio.purchase_order_flow import purchase_order_flow
+
+
+@traced(kind="flow")
+async def purchase_80_gems_flow(page: Page, settings: GooglePaySettings) -> FinalizeReport:
+    """Async-вариант purchase_80_gems_flow: товар, checkout, Google Pay и финализация."""
+
+    order = Order(sku_name=load_app_config().order.sku_name, quantity=1)
+    return (await purchase_order_flow(page, order, settings)).finalize
@@ -0,0 +1,102 @@
+from typing import Awaitable, Callable, Dict
+
+from playwright.async_api import Page
+
+from src.application.flows.aio.checkpoints import default_checkpointer
+from src.application.flows.aio.finalize_supercell_session import detach_payment, logout_session, open_account
+from src.application.flows.aio.scenario_engine import run_scenario
+from src.application.flows.finalize_supercell_session import logout_status
+from src.application.flows.purchase_order_flow import (
+    PurchaseResult,
+    checkpoint_key,
+    finalize_report,
+    new_context,
+)
+from src.application.flows.scenario_engine import ScenarioContext
+from src.domain.order import Order
+from src.domain.scenario import compile_scenario, purchase_scenario
+from src.infrastructure.browser.aio.google_pay_client import AsyncGooglePayClient
+from src.infrastructure.browser.aio.supercell_store_client import AsyncSupercellStoreClient
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.config.settings import GooglePaySettings
+from src.infrastructure.logging.tracing import traced
+
+
+PURCHASE = compile_scenario(purchase_scenario())
+
+
+def _store(ctx: ScenarioContext) -> AsyncSupercellStoreClient:
+    return ctx["store_client"]
+
+
+async def _open_product(ctx: ScenarioContext) -> None:
+    order: Order = ctx["order"]
+    cfg = load_app_config().order
+    product_url = cfg.product_url if order.sku_name == cfg.sku_name else None
+    await _store(ctx).go_to_product(order.sku_name, product_url=product_url)
+
+
+async def _add_to_cart(ctx: ScenarioContext) -> None:
+    await _store(ctx).add_to_cart(ctx["order"].quantity)
+
+
+async def _open_google_pay(ctx: ScenarioContext) -> None:
+    page = ctx.page
+    async with page.expect_popup() as popup_info:
+        await page.get_by_role("button", name="Google Pay").click()
+    ctx["popup"] = await popup_info.value
+
+
+async def _confirm_google_pay(ctx: ScenarioContext) -> None:
+    settings: GooglePaySettings = ctx["settings"]
+    await AsyncGooglePayClient(ctx["popup"]).login_and_confirm_payment(
+        email=settings.google_email,
+        password=settings.google_password,
+        backup_code=settings.google_backup_code,
+    )
+
+
+async def _open_account(ctx: ScenarioContext) -> None:
+    with ctx["finalize"].step("open_account", reraise=True):
+        await open_account(_store(ctx), load_app_config().supercell.account_url, load_app_config().finalize)
+
+
+async def _detach_payment(ctx: ScenarioContext) -> None:
+    with ctx["finalize"].step("detach_payment", reraise=True) as outcome:
+        if not await detach_payment(_store(ctx), load_app_config().finalize):
+            outcome.detail = "no payment method attached"
+
+
+async def _logout(ctx: ScenarioContext) -> None:
+    cfg = load_app_config().finalize
+    with ctx["finalize"].step("logout", reraise=True) as outcome:
+        outcome.detail = await logout_session(_store(ctx), load_app_config().supercell.account_url, cfg)
+        outcome.status = logout_status(cfg, outcome.detail)
+
+
+PURCHASE_ACTIONS: Dict[str, Callable[[ScenarioContext], Awaitable[None]]] = {
+    "store.open_product": _open_product,
+    "store.add_to_cart": _add_to_cart,
+    "store.checkout": lambda ctx: _store(ctx).proceed_to_checkout(),
+    "store.open_google_pay": _open_google_pay,
+    "google_pay.confirm": _confirm_google_pay,
+    "store.open_account": _open_account,
+    "store.detach_payment": _detach_payment,
+    "store.logout": _logout,
+}
+
+
+@traced(kind="flow")
+async def purchase_order_flow(page: Page, order: Order, settings: GooglePaySettings) -> PurchaseResult:
+    """Async-вариант purchase_order_flow: тот же сценарий на async Playwright."""
+
+    cfg = load_app_config().supercell
+    store_client = AsyncSupercellStoreClient(page=page, base_url=cfg.base_url, game_slug=cfg.game_slug)
+    ctx = new_context(page, order, settings, store_client)
+    checkpointer = default_checkpointer(page, checkpoint_key(store_client.game_url, order))
+    result = await run_scenario(PURCHASE, PURCHASE_ACTIONS, ctx, checkpointer)
+    report = finalize_report(ctx, result)
+    report.log()
+    if result.error is not None:
+        raise result.error
+    return PurchaseResult(result, report)
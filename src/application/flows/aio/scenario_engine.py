@@ -0,0 +1,85 @@
+"""Async-исполнитель декларативных сценариев.
+
+Решения о запуске шагов и порядок те же, что у sync-исполнителя
+(flows/scenario_engine.py), но timeout_ms шага — жёсткая граница
+(asyncio.wait_for), а не только таймаут Playwright.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.application.flows.scenario_engine import (
+    STEP_RESTORED,
+    ScenarioContext,
+    ScenarioResult,
+    check_actions,
+    completed_steps,
+    record_outcome,
+    retry_delays,
+    step_decision,
+)
+from src.domain.scenario import CompiledScenario, Step
+from src.infrastructure.logging.tracing import span
+
+
+AsyncAction = Callable[[ScenarioContext], Awaitable[Any]]
+
+
+async def _run_step(step: Step, action: AsyncAction, ctx: ScenarioContext) -> Optional[BaseException]:
+    delays = retry_delays(step)
+    attempt = 1
+    timeout_s = step.timeout_ms / 1000 if step.timeout_ms is not None else None
+    while True:
+        try:
+            with span(f"scenario.{step.name}", kind="step", action=step.action, attempt=attempt):
+                await asyncio.wait_for(action(ctx), timeout_s)
+            return None
+        except Exception as exc:
+            delay = next(delays, None)
+            if delay is None:
+                return exc
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def run_scenario(
+    compiled: CompiledScenario,
+    actions: Dict[str, AsyncAction],
+    ctx: ScenarioContext,
+    checkpointer: Optional[Any] = None,
+) -> ScenarioResult:
+    """См. flows.scenario_engine.run_scenario; checkpointer здесь асинхронный (flows/aio/checkpoints.py)."""
+
+    check_actions(compiled, actions)
+    result = ScenarioResult(name=compiled.name)
+    restored = set(await checkpointer.resume()) if checkpointer is not None else set()
+    for step in compiled.order:
+        if step.name in restored and not step.always:
+            result.statuses[step.name] = STEP_RESTORED
+            continue
+        skipped = step_decision(step, result, checkpointer is not None and checkpointer.defer_finalize)
+        if skipped is not None:
+            result.statuses[step.name] = skipped
+            continue
+        if step.irreversible and checkpointer is not None:
+            await checkpointer.drop_before(step.name)
+        error = await _run_step(step, actions[step.action], ctx)
+        record_outcome(step, result, error)
+        if error is None and step.checkpoint and checkpointer is not None:
+            await checkpointer.save(completed_steps(compiled, result))
+
+    if checkpointer is not None and result.error is None:
+        await checkpointer.clear()
+    return result
+
+
+async def run_scenario_or_raise(
+    compiled: CompiledScenario,
+    actions: Dict[str, AsyncAction],
+    ctx: ScenarioContext,
+    checkpointer: Optional[Any] = None,
+) -> ScenarioResult:
+    result = await run_scenario(compiled, actions, ctx, checkpointer)
+    if result.error is not None:
+        raise result.error
+    return result
@@ -0,0 +1,237 @@
+"""Smoke-матрица Supercell Store: страницы нескольких игр проверяются параллельно в одном браузере.
+
+    python -m src.application.flows.aio.store_smoke --slug brawlstars --slug clashroyale
+
+С --preflight браузер запускается, только если HTTP pre-flight (health/preflight.py)
+не ok. Каждая игра — отдельный контекст браузера (куки stand-in и магазина не пересекаются)
+со своим сроком `smoke.deadline_ms`; одновременно проверяется не больше
+`smoke.concurrency` игр. Результат — SmokeReport: общий pass/fail и таблица
+статусов и латентностей по играм.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from playwright.async_api import Browser, expect
+
+from src.infrastructure.browser.aio.supercell_store_client import AsyncSupercellStoreClient
+from src.infrastructure.browser.browser_server import connect_or_launch_async
+from src.infrastructure.browser.deadlines import task_deadline
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.health.preflight import preflight, title_pattern
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import span, traced
+
+
+SMOKE_OK = "ok"
+SMOKE_FAILED = "failed"
+SMOKE_TIMEOUT = "timeout"
+
+SmokeCheck = Callable[[str], Awaitable[None]]
+
+
+def smoke_slugs() -> List[str]:
+    cfg = load_app_config()
+    return list(cfg.smoke.game_slugs or (cfg.supercell.game_slug,))
+
+
+@dataclass
+class SmokeResult:
+    slug: str
+    status: str
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class SmokeReport:
+    """Итог матрицы: по строке на игру в порядке входного списка."""
+
+    results: List[SmokeResult] = field(default_factory=list)
+    concurrency: int = 1
+    elapsed_ms: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return bool(self.results) and all(result.status == SMOKE_OK for result in self.results)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "concurrency": self.concurrency,
+            "elapsed_ms": self.elapsed_ms,
+            "games": {
+                result.slug: {"status": result.status, "elapsed_ms": result.elapsed_ms, "error": result.error}
+                for result in self.results
+            },
+        }
+
+    def format_text(self) -> str:
+        header = f"{'game':<24} {'status':<8} {'ms':>9}  error"
+        lines = [header, "-" * len(header)]
+        for result in self.results:
+            error = (result.error or "").splitlines()[0][:80] if result.error else ""
+            lines.append(f"{result.slug[:24]:<24} {result.status:<8} {result.elapsed_ms:>9.1f}  {error}".rstrip())
+        ok = sum(result.status == SMOKE_OK for result in self.results)
+        lines.append(
+            f"{'PASS' if self.passed else 'FAIL'}: {ok}/{len(self.results)} ok "
+            f"in {self.elapsed_ms:.1f} ms (concurrency {self.concurrency})"
+        )
+        return "\n".join(lines)
+
+    def log(self) -> None:
+        log_event(
+            stage="smoke",
+            status="ok" if self.passed else "error",
+            message="Store smoke matrix passed" if self.passed else "Store smoke matrix failed",
+            data=self.as_dict(),
+        )
+
+
+async def run_smoke_matrix(
+    slugs: Sequence[str],
+    check: SmokeCheck,
+    concurrency: int,
+    deadline_ms: float,
+) -> SmokeReport:
+    """Запускает check(slug) по всем играм не больше чем concurrency за раз.
+
+    Срок игры отсчитывается после получения слота, а не с начала матрицы: ожидание
+    в очереди не съедает бюджет проверки. Падение или таймаут одной игры не
+    прерывает остальные.
+    """
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(slug: str) -> SmokeResult:
+        async with semaphore:
+            started = time.perf_counter()
+            status, error = SMOKE_OK, None
+            try:
+                with span("check_store_page", kind="step", game_slug=slug):
+                    await asyncio.wait_for(check(slug), timeout=deadline_ms / 1000)
+            except asyncio.TimeoutError:
+                status, error = SMOKE_TIMEOUT, f"deadline {deadline_ms:.0f} ms exceeded"
+            except Exception as exc:
+                status, error = SMOKE_FAILED, f"{type(exc).__name__}: {exc}"
+            return SmokeResult(slug, status, round((time.perf_counter() - started) * 1000, 1), error)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(slug) for slug in dict.fromkeys(slugs)))
+    return SmokeReport(
+        results=list(results),
+        concurrency=max(1, concurrency),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+async def check_store_page(
+    browser: Browser,
+    base_url: str,
+    slug: str,
+    timeout_ms: float,
+    context_args: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Страница игры открывается, её title и heading называют игру."""
+
+    context = await browser.new_context(**(context_args or {}))
+    try:
+        with task_deadline(timeout_ms):
+            client = AsyncSupercellStoreClient(await context.new_page(), base_url, slug)
+            await client.open_store()
+            name = title_pattern(slug)
+            await expect(client.page).to_have_title(name, timeout=timeout_ms)
+            await expect(client.page.get_by_role("heading", name=name).first).to_be_visible(timeout=timeout_ms)
+    finally:
+        await context.close()
+
+
+@traced(kind="flow")
+async def run_store_smoke(
+    browser: Browser,
+    slugs: Optional[Sequence[str]] = None,
+    base_url: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    deadline_ms: Optional[float] = None,
+    context_args: Optional[Dict[str, Any]] = None,
+) -> SmokeReport:
+    """Smoke-матрица по играм в уже открытом браузере; параметры по умолчанию — из config.yaml."""
+
+    cfg = load_app_config()
+    base_url = base_url or cfg.supercell.base_url
+    timeout_ms = deadline_ms or cfg.smoke.deadline_ms
+
+    async def check(slug: str) -> None:
+        await check_store_page(browser, base_url, slug, timeout_ms, context_args)
+
+    report = await run_smoke_matrix(
+        slugs or smoke_slugs(),
+        check,
+        concurrency=concurrency or cfg.smoke.concurrency,
+        deadline_ms=timeout_ms,
+    )
+    report.log()
+    return report
+
+
+async def store_smoke(browser_name: str = "chromium", **kwargs: Any) -> SmokeReport:
+    """run_store_smoke в собственном браузере: тёплый сервер, если запущен, иначе launch()."""
+
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        browser = await connect_or_launch_async(getattr(playwright, browser_name))
+        try:
+            return await run_store_smoke(browser, **kwargs)
+        finally:
+            await browser.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI: `python -m src.application.flows.aio.store_smoke`; код выхода 1, если хоть одна игра не прошла."""
+
+    parser = argparse.ArgumentParser(description="Параллельная smoke-проверка страниц игр Supercell Store")
+    parser.add_argument("--slug", action="append", default=[], help="slug игры, можно несколько (по умолчанию smoke.game_slugs)")
+    parser.add_argument("--base-url", help="адрес магазина вместо supercell.base_url (например, stand-in)")
+    parser.add_argument("--concurrency", type=int, help="сколько игр проверять одновременно")
+    parser.add_argument("--deadline-ms", type=float, help="срок на одну игру")
+    parser.add_argument("--browser", default="chromium", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("--preflight", action="store_true", help="браузер — только если HTTP pre-flight не ok")
+    args = parser.parse_args(argv)
+
+    if args.preflight:
+        checked = preflight(args.slug or smoke_slugs(), base_url=args.base_url)
+        if checked.ok:
+            if args.format == "json":
+                json.dump({"preflight": checked.as_dict()}, sys.stdout, ensure_ascii=False, indent=2)
+                sys.stdout.write("\n")
+            else:
+                print(checked.format_text())
+            sys.exit(0)
+        print(f"pre-flight {checked.verdict}: {checked.summary()}; escalating to browser smoke", file=sys.stderr)
+
+    report = asyncio.run(
+        store_smoke(
+            args.browser,
+            slugs=args.slug or None,
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            deadline_ms=args.deadline_ms,
+        )
+    )
+    if args.format == "json":
+        json.dump(report.as_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(report.format_text())
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
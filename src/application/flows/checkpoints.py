@@ -0,0 +1,146 @@
+from typing import Any, Dict, Optional, Sequence, Tuple, Type, TypeVar
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import Page
+
+from src.infrastructure.browser.checkpoint_store import CheckpointStore, default_checkpoint_store
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.events import log_event
+
+
+C = TypeVar("C", bound="CheckpointerCore")
+
+
+def same_page(url: str, expected: str) -> bool:
+    """Проба прошла, если после перехода мы на том же пути (без редиректа на логин)."""
+
+    return urlsplit(url).path.rstrip("/") == urlsplit(expected).path.rstrip("/")
+
+
+class CheckpointerCore:
+    """Общая часть sync- и async-checkpointer-а: решения и работа с CheckpointStore.
+
+    Подклассы добавляют только вызовы Playwright (переход, storage_state) в своём API.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        key: str,
+        page: Any,
+        probe_timeout_ms: float = 5_000,
+        defer_finalize_on_failure: bool = False,
+    ) -> None:
+        self.store = store
+        self.key = key
+        self.page = page
+        self.probe_timeout_ms = probe_timeout_ms
+        self.defer_finalize_on_failure = defer_finalize_on_failure
+        self.saved = False
+
+    @property
+    def defer_finalize(self) -> bool:
+        return self.defer_finalize_on_failure and self.saved
+
+    def _probe_passed(self, response: Any, url: str) -> bool:
+        return (response is None or response.ok) and same_page(self.page.url, url)
+
+    def _rejected(self, checkpoint: Dict[str, Any]) -> Tuple[str, ...]:
+        self.store.clear(self.key)
+        log_event(stage="checkpoint", status="info", message="Checkpoint rejected by probe", data={"url": checkpoint["url"]})
+        return ()
+
+    def _resumed(self, checkpoint: Dict[str, Any]) -> Tuple[str, ...]:
+        self.saved = True
+        completed = tuple(checkpoint["completed"])
+        log_event(
+            stage="checkpoint",
+            status="ok",
+            message="Resumed from checkpoint",
+            data={"url": checkpoint["url"], "completed": list(completed)},
+        )
+        return completed
+
+    def _save(self, completed: Sequence[str], storage_state: Dict[str, Any]) -> None:
+        self.store.save(self.key, completed, self.page.url, storage_state)
+        self.saved = True
+
+    def _clear(self) -> None:
+        self.store.clear(self.key)
+        self.saved = False
+
+    def _drop_before(self, step: str) -> None:
+        if self.store.load(self.key) is not None:
+            log_event(
+                stage="checkpoint",
+                status="info",
+                message=f"Checkpoint dropped before irreversible step {step}",
+                data={"step": step},
+            )
+        self._clear()
+
+
+class PageCheckpointer(CheckpointerCore):
+    """Контрольные точки сценария для sync-страницы (см. flows.scenario_engine.run_scenario).
+
+    - resume: применяет storage_state точки, делает пробный переход на её URL и,
+      если страница открылась без редиректа, возвращает выполненные шаги;
+      непрошедшая проверку точка удаляется;
+    - save: URL страницы и storage_state контекста после шага с checkpoint=True;
+    - drop_before: удаляет точку перед необратимым шагом (irreversible).
+    """
+
+    page: Page
+
+    def _probe(self, url: str) -> bool:
+        try:
+            response = self.page.goto(url, timeout=self.probe_timeout_ms)
+        except PlaywrightError:
+            return False
+        return self._probe_passed(response, url)
+
+    def resume(self) -> Tuple[str, ...]:
+        checkpoint = self.store.load(self.key)
+        if checkpoint is None:
+            return ()
+
+        context = self.page.context
+        state = checkpoint["storage_state"]
+        if hasattr(context, "set_storage_state"):
+            context.set_storage_state(state)
+        else:
+            context.add_cookies(state.get("cookies", []))
+
+        if not self._probe(checkpoint["url"]):
+            return self._rejected(checkpoint)
+        return self._resumed(checkpoint)
+
+    def save(self, completed: Sequence[str]) -> None:
+        self._save(completed, self.page.context.storage_state())
+
+    def clear(self) -> None:
+        self._clear()
+
+    def drop_before(self, step: str) -> None:
+        self._drop_before(step)
+
+
+def build_checkpointer(cls: Type[C], page: Any, key: str) -> Optional[C]:
+    """Checkpointer класса cls по секции `checkpoints:` config.yaml (None, если точки выключены)."""
+
+    store = default_checkpoint_store()
+    if store is None:
+        return None
+    cfg = load_app_config().checkpoints
+    return cls(
+        store,
+        key,
+        page,
+        probe_timeout_ms=cfg.probe_timeout_ms,
+        defer_finalize_on_failure=cfg.defer_finalize_on_failure,
+    )
+
+
+def default_checkpointer(page: Page, key: str) -> Optional[PageCheckpointer]:
+    return build_checkpointer(PageCheckpointer, page, key)
@@ -1,50 +1,165 @@
-from pathlib import Path
-from typing import Any, Dict, Optional
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
 
-import yaml
+from playwright.sync_api import Error as PlaywrightError
 from playwright.sync_api import Page
 
+from src.infrastructure.browser.deadlines import deadline
 from src.infrastructure.browser.supercell_store_client import SupercellStoreClient
+from src.infrastructure.config.app_config import FinalizeConfig, load_app_config
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import traced
 
 
-PROJECT_ROOT = Path(__file__).resolve().parents[3]
+LOGOUT_FAST = "fast"
+LOGOUT_UI = "ui"
 
+TEARDOWN_OK = "ok"
+TEARDOWN_SKIPPED = "skipped"
+TEARDOWN_FAILED = "failed"
+# Быстрый логаут не подтвердился, сработал запасной UI-логаут.
+TEARDOWN_FALLBACK = "fallback"
 
-def _load_supercell_config() -> Dict[str, Any]:
-    config_path = PROJECT_ROOT / "config.yaml"
-    with config_path.open(encoding="utf-8") as f:
-        raw: Dict[str, Any] = yaml.safe_load(f)
-    return raw.get("supercell", {})
 
+@dataclass
+class TeardownStep:
+    status: str = TEARDOWN_OK
+    elapsed_ms: float = 0.0
+    detail: Optional[str] = None
 
-def finalize_supercell_session(page: Page) -> None:
+
+@dataclass
+class FinalizeReport:
+    """Исходы шагов финализации (open_account, detach_payment, logout) с временем каждого."""
+
+    steps: Dict[str, TeardownStep] = field(default_factory=dict)
+
+    @contextmanager
+    def step(self, name: str, reraise: bool = False) -> Iterator[TeardownStep]:
+        """Замеряет шаг; исключение записывается как failed и пробрасывается только с reraise
+        (так шаги сценария покупки сообщают о падении исполнителю)."""
+
+        outcome = TeardownStep()
+        started = time.perf_counter()
+        try:
+            yield outcome
+        except Exception as exc:
+            outcome.status = TEARDOWN_FAILED
+            outcome.detail = f"{type(exc).__name__}: {exc}"
+            if reraise:
+                raise
+        finally:
+            outcome.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.steps[name] = outcome
+
+    def skip(self, name: str, detail: str) -> None:
+        self.steps[name] = TeardownStep(status=TEARDOWN_SKIPPED, detail=detail)
+
+    def failed(self, name: str) -> bool:
+        return name in self.steps and self.steps[name].status == TEARDOWN_FAILED
+
+    @property
+    def ok(self) -> bool:
+        return not any(step.status == TEARDOWN_FAILED for step in self.steps.values())
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round(sum(step.elapsed_ms for step in self.steps.values()), 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "elapsed_ms": self.elapsed_ms,
+            "steps": {
+                name: {"status": step.status, "elapsed_ms": step.elapsed_ms, "detail": step.detail}
+                for name, step in self.steps.items()
+            },
+        }
+
+    def log(self) -> None:
+        log_event(
+            stage="finalize",
+            status="ok" if self.ok else "error",
+            message="Supercell session finalized" if self.ok else "Supercell session finalization incomplete",
+            data=self.as_dict(),
+        )
+
+
+def logout_fallback_event(reason: str) -> None:
+    log_event(
+        stage="finalize",
+        status="info",
+        message="Fast logout not confirmed, falling back to UI logout",
+        data={"reason": reason},
+    )
+
+
+def open_account(client: SupercellStoreClient, account_url: Optional[str], cfg: FinalizeConfig) -> None:
+    with deadline(client.page.context, cfg.account_timeout_ms):
+        client.open_account_page(account_url=account_url, timeout_ms=cfg.account_timeout_ms)
+
+
+def detach_payment(client: SupercellStoreClient, cfg: FinalizeConfig) -> bool:
+    with deadline(client.page.context, cfg.detach_timeout_ms):
+        return client.detach_payment_method()
+
+
+def logout_session(client: SupercellStoreClient, account_url: Optional[str], cfg: FinalizeConfig) -> str:
+    """Логаут: быстрый путь (очистка cookies/storage + проверочный запрос), затем UI.
+
+    Возвращает сработавший способ (LOGOUT_FAST / LOGOUT_UI); если не сработал ни один,
+    бросает исключение.
+    """
+
+    if cfg.logout == LOGOUT_FAST:
+        try:
+            client.clear_session()
+            if client.is_logged_out(account_url, timeout_ms=cfg.verify_timeout_ms):
+                return LOGOUT_FAST
+            logout_fallback_event("account page still available after clearing cookies")
+        except PlaywrightError as exc:
+            logout_fallback_event(f"{type(exc).__name__}: {exc}")
+
+    with deadline(client.page.context, cfg.ui_logout_timeout_ms):
+        if not client.logout_supercell(timeout_ms=cfg.ui_logout_timeout_ms):
+            raise RuntimeError("Кнопка выхода из аккаунта Supercell не найдена")
+    return LOGOUT_UI
+
+
+def logout_status(cfg: FinalizeConfig, method: str) -> str:
+    return TEARDOWN_FALLBACK if cfg.logout == LOGOUT_FAST and method != LOGOUT_FAST else TEARDOWN_OK
+
+
+@traced(kind="flow")
+def finalize_supercell_session(page: Page) -> FinalizeReport:
     """Финализирует сессию Supercell: отвязка способа оплаты и логаут.
 
-    Best-effort: если какие-то шаги не удаётся выполнить (например, уже отвязано
-    или пользователь разлогинен), мы не роняем весь сценарий, а продолжаем.
+    Каждый шаг ограничен сроком из секции `finalize:` config.yaml и не роняет
+    сценарий: исход (ok / skipped / failed / fallback) и время попадают в отчёт,
+    который пишется событием stage="finalize" и возвращается вызывающему.
+    Логаут не зависит от страницы аккаунта: быстрый путь работает и без неё.
     """
 
-    cfg = _load_supercell_config()
-    base_url: str = cfg.get("base_url", "https://store.supercell.com")
-    game_slug: str = cfg.get("game_slug", "brawlstars")
-    account_url: Optional[str] = cfg.get("account_url")
-
-    client = SupercellStoreClient(page=page, base_url=base_url, game_slug=game_slug)
-
-    try:
-        client.open_account_page(account_url=account_url)
-    except Exception:
-        # Если не удалось открыть страницу аккаунта, дальше смысла продолжать нет.
-        return
-
-    try:
-        client.detach_payment_method()
-    except Exception:
-        # Не критично: возможно, метода оплаты уже нет или DOM изменился.
-        pass
-
-    try:
-        client.logout_supercell()
-    except Exception:
-        # Если не удалось явно разлогиниться, просто выходим.
-        pass
+    supercell = load_app_config().supercell
+    cfg = load_app_config().finalize
+    client = SupercellStoreClient(page=page, base_url=supercell.base_url, game_slug=supercell.game_slug)
+    report = FinalizeReport()
+
+    with report.step("open_account"):
+        open_account(client, supercell.account_url, cfg)
+
+    if report.failed("open_account"):
+        report.skip("detach_payment", "account page not opened")
+    else:
+        with report.step("detach_payment") as outcome:
+            if not detach_payment(client, cfg):
+                outcome.detail = "no payment method attached"
+
+    with report.step("logout") as outcome:
+        outcome.detail = logout_session(client, supercell.account_url, cfg)
+        outcome.status = logout_status(cfg, outcome.detail)
+
+    report.log()
+    return report
@@ -1,56 +1,78 @@
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict
+from typing import Optional
 
-import yaml
 from playwright.sync_api import Page
 
+from src.infrastructure.browser.session_store import SessionStore, default_session_store
 from src.infrastructure.browser.supercell_store_client import SupercellStoreClient
-from src.infrastructure.config.settings import Settings
+from src.infrastructure.config.app_config import SupercellConfig, load_app_config
+from src.infrastructure.config.settings import SupercellSettings
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import traced
+from src.infrastructure.otp.providers import OtpProvider, default_otp_provider
 
 
-PROJECT_ROOT = Path(__file__).resolve().parents[3]
+def load_supercell_config() -> SupercellConfig:
+    """Возвращает базовые URL/slug для Supercell из config.yaml.
 
+    Это не-секретная конфигурация, общая для всего сценария; файл разбирается
+    реестром конфигурации один раз и перечитывается только при изменении.
+    """
 
-@dataclass
-class SupercellConfig:
-    base_url: str
-    game_slug: str
+    return load_app_config().supercell
 
 
-def load_supercell_config() -> SupercellConfig:
-    """Загружает базовые URL/slug для Supercell из config.yaml.
+def _reuse_saved_session(client: SupercellStoreClient, store: SessionStore, account: str) -> bool:
+    """Пробует восстановить сохранённую сессию и проверяет её дешёвой пробой."""
 
-    Это не-секретная конфигурация, общая для всего сценария.
-    """
+    context = client.page.context
+    if not store.restore(context, client.base_url, account, client.game_slug):
+        return False
 
-    config_path = PROJECT_ROOT / "config.yaml"
-    with config_path.open(encoding="utf-8") as f:
-        raw: Dict[str, Any] = yaml.safe_load(f)
+    probe_timeout_ms = load_app_config().sessions.probe_timeout_ms
+    if client.is_logged_in(timeout_ms=probe_timeout_ms):
+        log_event(stage="login", status="ok", message="Reused saved Supercell session")
+        return True
 
-    supercell = raw.get("supercell", {})
-    base_url = supercell.get("base_url", "https://store.supercell.com")
-    game_slug = supercell.get("game_slug", "brawlstars")
+    # Сессия протухла на стороне сервера: удаляем её и логинимся заново.
+    store.invalidate(client.base_url, account, client.game_slug)
+    context.clear_cookies()
+    log_event(stage="login", status="info", message="Saved Supercell session rejected by probe")
+    return False
 
-    return SupercellConfig(base_url=base_url, game_slug=game_slug)
 
+@traced(kind="flow")
+def login_supercell_with_manual_otp(
+    page: Page,
+    settings: SupercellSettings,
+    session_store: Optional[SessionStore] = None,
+    otp_provider: Optional[OtpProvider] = None,
+) -> None:
+    """Логин в Supercell Store по email + ОТП.
 
-def login_supercell_with_manual_otp(page: Page, settings: Settings) -> None:
-    """Логин в Supercell Store по email + ОТП с ручным вводом кода.
-
-    - открывает страницу игры;
-    - запускает логин по email из настроек;
-    - запрашивает у пользователя ОТП-код в консоли;
-    - вводит код и дожидается возврата в магазин.
+    - если есть свежая сохранённая сессия для магазина, аккаунта и игры и проба её подтверждает,
+      логин пропускается;
+    - иначе открывает страницу игры и запускает логин по email из настроек;
+    - берёт ОТП-код у otp_provider (например, у локального stand-in в бенчмарках),
+      а без него — по OTP_MODE: из консоли (manual) или из почтового ящика (email);
+    - вводит код, дожидается возврата в магазин и сохраняет сессию.
     """
 
     cfg = load_supercell_config()
     client = SupercellStoreClient(page=page, base_url=cfg.base_url, game_slug=cfg.game_slug)
+    store = session_store or default_session_store()
+
+    if store is not None and _reuse_saved_session(client, store, settings.brawl_email):
+        return
 
+    # Провайдер создаётся до запроса кода: письма, пришедшие раньше, для него устаревшие.
+    otp_provider = otp_provider or default_otp_provider(settings)
     client.start_login(settings.brawl_email)
 
-    otp_code = input("Введите ОТП-код из письма Supercell: ").strip()
+    otp_code = otp_provider().strip()
     if not otp_code:
         raise RuntimeError("ОТП-код не был введён")
 
     client.complete_login_with_otp(otp_code)
+
+    if store is not None:
+        store.save(page.context, client.base_url, settings.brawl_email, client.game_slug)
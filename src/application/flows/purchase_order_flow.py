@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from playwright.sync_api import Page
+
+from src.application.flows.checkpoints import default_checkpointer
+from src.application.flows.finalize_supercell_session import (
+    FinalizeReport,
+    detach_payment,
+    logout_session,
+    logout_status,
+    open_account,
+)
+from src.application.flows.scenario_engine import ScenarioContext, ScenarioResult, run_scenario
+from src.domain.order import Order
+from src.domain.scenario import compile_scenario, purchase_scenario
+from src.infrastructure.browser.google_pay_client import GooglePayClient
+from src.infrastructure.browser.supercell_store_client import SupercellStoreClient
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.config.settings import GooglePaySettings
+from src.infrastructure.logging.tracing import traced
+
+
+PURCHASE = compile_scenario(purchase_scenario())
+# Шаги финализации сценария; в FinalizeReport они под теми же именами.
+FINALIZE_STEPS = ("open_account", "detach_payment", "logout")
+
+
+@dataclass
+class PurchaseResult:
+    scenario: ScenarioResult
+    finalize: FinalizeReport
+
+
+def finalize_report(ctx: ScenarioContext, result: ScenarioResult) -> FinalizeReport:
+    """FinalizeReport по шагам финализации: исходы выполненных шагов (их пишут действия
+    в ctx["finalize"]) и пропущенные или отложенные исполнителем шаги."""
+
+    recorded: FinalizeReport = ctx["finalize"]
+    report = FinalizeReport()
+    for name in FINALIZE_STEPS:
+        if name in recorded.steps:
+            report.steps[name] = recorded.steps[name]
+        elif name in result.statuses:
+            report.skip(name, f"scenario step {result.statuses[name]}")
+    return report
+
+
+def new_context(page: Page, order: Order, settings: GooglePaySettings, store_client: Any) -> ScenarioContext:
+    ctx = ScenarioContext(page=page)
+    ctx["order"] = order
+    ctx["settings"] = settings
+    ctx["store_client"] = store_client
+    ctx["finalize"] = FinalizeReport()
+    return ctx
+
+
+def checkpoint_key(game_url: str, order: Order) -> str:
+    return f"{PURCHASE.name}|{game_url}|{order.sku_name}|{order.quantity}"
+
+
+def _store(ctx: ScenarioContext) -> SupercellStoreClient:
+    return ctx["store_client"]
+
+
+def _open_product(ctx: ScenarioContext) -> None:
+    order: Order = ctx["order"]
+    cfg = load_app_config().order
+    # Прямая ссылка из config.yaml относится только к SKU из той же секции.
+    product_url = cfg.product_url if order.sku_name == cfg.sku_name else None
+    _store(ctx).go_to_product(order.sku_name, product_url=product_url)
+
+
+def _add_to_cart(ctx: ScenarioContext) -> None:
+    _store(ctx).add_to_cart(ctx["order"].quantity)
+
+
+def _open_google_pay(ctx: ScenarioContext) -> None:
+    """Выбор Google Pay на странице checkout; открывшийся попап передаётся следующему шагу."""
+
+    page = ctx.page
+    with page.expect_popup() as popup_info:
+        page.get_by_role("button", name="Google Pay").click()
+    ctx["popup"] = popup_info.value
+
+
+def _confirm_google_pay(ctx: ScenarioContext) -> None:
+    settings: GooglePaySettings = ctx["settings"]
+    GooglePayClient(ctx["popup"]).login_and_confirm_payment(
+        email=settings.google_email,
+        password=settings.google_password,
+        backup_code=settings.google_backup_code,
+    )
+
+
+def _open_account(ctx: ScenarioContext) -> None:
+    with ctx["finalize"].step("open_account", reraise=True):
+        open_account(_store(ctx), load_app_config().supercell.account_url, load_app_config().finalize)
+
+
+def _detach_payment(ctx: ScenarioContext) -> None:
+    with ctx["finalize"].step("detach_payment", reraise=True) as outcome:
+        if not detach_payment(_store(ctx), load_app_config().finalize):
+            outcome.detail = "no payment method attached"
+
+
+def _logout(ctx: ScenarioContext) -> None:
+    cfg = load_app_config().finalize
+    with ctx["finalize"].step("logout", reraise=True) as outcome:
+        outcome.detail = logout_session(_store(ctx), load_app_config().supercell.account_url, cfg)
+        outcome.status = logout_status(cfg, outcome.detail)
+
+
+PURCHASE_ACTIONS: Dict[str, Callable[[ScenarioContext], None]] = {
+    "store.open_product": _open_product,
+    "store.add_to_cart": _add_to_cart,
+    "store.checkout": lambda ctx: _store(ctx).proceed_to_checkout(),
+    "store.open_google_pay": _open_google_pay,
+    "google_pay.confirm": _confirm_google_pay,
+    "store.open_account": _open_account,
+    "store.detach_payment": _detach_payment,
+    "store.logout": _logout,
+}
+
+
+@traced(kind="flow")
+def purchase_order_flow(page: Page, order: Order, settings: GooglePaySettings) -> PurchaseResult:
+    """Покупка любого SKU и количества из Order по декларативному сценарию purchase_scenario().
+
+    Порядок, таймауты и повторы шагов задаёт сценарий; финализация (отвязка оплаты
+    и логаут) выполняется всегда и best-effort, её исходы — FinalizeReport, который,
+    как у finalize_supercell_session, пишется событием stage="finalize". Ошибка
+    обязательного шага пробрасывается после финализации.
+
+    Повторный вызов после падения продолжает с последней контрольной точки
+    (секция `checkpoints:`), если её подтверждает пробный переход.
+    """
+
+    cfg = load_app_config().supercell
+    store_client = SupercellStoreClient(page=page, base_url=cfg.base_url, game_slug=cfg.game_slug)
+    ctx = new_context(page, order, settings, store_client)
+    checkpointer = default_checkpointer(page, checkpoint_key(store_client.game_url, order))
+    result = run_scenario(PURCHASE, PURCHASE_ACTIONS, ctx, checkpointer)
+    report = finalize_report(ctx, result)
+    report.log()
+    if result.error is not None:
+        raise result.error
+    return PurchaseResult(result, report)
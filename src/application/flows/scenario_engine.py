@@ -0,0 +1,183 @@
+"""Исполнитель декларативных сценариев (src/domain/scenario.py) на sync Playwright.
+
+Сценарий компилируется один раз (compile_scenario), дальше исполнитель сам
+решает, какой шаг готов: по requires/after, исходам предыдущих шагов и флагу
+always. Для каждого шага применяются его таймаут и политика повторов, шаг
+выполняется в span-е `scenario.<шаг>`.
+
+Шаги идут по очереди и в async-исполнителе (flows/aio/scenario_engine.py): все
+шаги покупки работают с одной страницей магазина и её попапом, независимых
+шагов, которые можно было бы перекрыть, в сценариях нет.
+
+С checkpointer-ом (flows/checkpoints.py) после каждого успешного шага с
+checkpoint=True прогресс сохраняется, а следующий запуск после проверки точки
+пропускает уже выполненные шаги (статус restored). Шаги после точки не должны
+рассчитывать на значения ctx, которые выставили восстановленные шаги. Перед
+шагом с irreversible=True (оплата) точка удаляется: повтор не проходит его дважды.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.domain.scenario import CompiledScenario, Step
+from src.infrastructure.browser.deadlines import deadline
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import span
+
+
+STEP_OK = "ok"
+STEP_FAILED = "failed"
+STEP_SKIPPED = "skipped"
+STEP_RESTORED = "restored"
+# Логаут (шаг с ends_session) отложен до повтора с контрольной точки (checkpoints.defer_finalize_on_failure).
+STEP_DEFERRED = "deferred"
+
+SUCCEEDED = (STEP_OK, STEP_RESTORED)
+
+
+@dataclass
+class ScenarioContext:
+    """Общее состояние шагов: страница, заказ, настройки и то, что шаги передают друг другу."""
+
+    page: Any
+    values: Dict[str, Any] = field(default_factory=dict)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.values[key] = value
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    statuses: Dict[str, str] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+Action = Callable[[ScenarioContext], Any]
+
+
+def check_actions(compiled: CompiledScenario, actions: Dict[str, Any]) -> None:
+    missing = sorted({step.action for step in compiled.order} - set(actions))
+    if missing:
+        raise RuntimeError(f"Для сценария {compiled.name!r} не зарегистрированы действия: {missing}")
+
+
+def step_decision(step: Step, result: ScenarioResult, defer_finalize: bool = False) -> Optional[str]:
+    """None — шаг можно запускать, иначе статус, с которым шаг пропускается."""
+
+    if result.error is not None:
+        if not step.always:
+            return STEP_SKIPPED
+        # Откладывается только шаг, который сделал бы точку бесполезной (логаут);
+        # остальная финализация, например отвязка оплаты, выполняется всегда.
+        if defer_finalize and step.ends_session:
+            return STEP_DEFERRED
+    if any(result.statuses.get(name) not in SUCCEEDED for name in step.requires):
+        return STEP_SKIPPED
+    return None
+
+
+def completed_steps(compiled: CompiledScenario, result: ScenarioResult) -> List[str]:
+    """Выполненные шаги для контрольной точки (финализация в точку не попадает)."""
+
+    return [step.name for step in compiled.order if not step.always and result.statuses.get(step.name) in SUCCEEDED]
+
+
+def retry_delays(step: Step) -> Iterator[float]:
+    """Паузы перед повторными попытками шага, в секундах."""
+
+    delay = step.retry.delay_ms / 1000
+    for _ in range(max(1, step.retry.attempts) - 1):
+        yield delay
+        delay *= step.retry.backoff
+
+
+def record_outcome(step: Step, result: ScenarioResult, error: Optional[BaseException]) -> None:
+    if error is None:
+        result.statuses[step.name] = STEP_OK
+        return
+    result.statuses[step.name] = STEP_FAILED
+    if step.required and result.error is None:
+        result.error = error
+    elif not step.required:
+        log_event(
+            stage="scenario",
+            status="info",
+            message=f"Optional step {step.name} failed",
+            data={"step": step.name, "error": f"{type(error).__name__}: {error}"},
+        )
+
+
+def _run_step(step: Step, action: Action, ctx: ScenarioContext) -> Optional[BaseException]:
+    delays = retry_delays(step)
+    attempt = 1
+    # Таймаут шага ставится на контекст, чтобы действовал и в попапах (окно Google Pay).
+    with deadline(getattr(ctx.page, "context", None), step.timeout_ms):
+        while True:
+            try:
+                with span(f"scenario.{step.name}", kind="step", action=step.action, attempt=attempt):
+                    action(ctx)
+                return None
+            except Exception as exc:
+                delay = next(delays, None)
+                if delay is None:
+                    return exc
+                time.sleep(delay)
+                attempt += 1
+
+
+def run_scenario(
+    compiled: CompiledScenario,
+    actions: Dict[str, Action],
+    ctx: ScenarioContext,
+    checkpointer: Optional[Any] = None,
+) -> ScenarioResult:
+    """Выполняет сценарий и возвращает статусы шагов.
+
+    Первая ошибка обязательного шага сохраняется в result.error; после неё
+    выполняются только шаги с always=True (шаги с ends_session откладываются,
+    если есть точка для повтора). Успешный прогон удаляет контрольную точку.
+    """
+
+    check_actions(compiled, actions)
+    result = ScenarioResult(name=compiled.name)
+    restored = set(checkpointer.resume()) if checkpointer is not None else set()
+    for step in compiled.order:
+        if step.name in restored and not step.always:
+            result.statuses[step.name] = STEP_RESTORED
+            continue
+        skipped = step_decision(step, result, checkpointer is not None and checkpointer.defer_finalize)
+        if skipped is not None:
+            result.statuses[step.name] = skipped
+            continue
+        if step.irreversible and checkpointer is not None:
+            checkpointer.drop_before(step.name)
+        error = _run_step(step, actions[step.action], ctx)
+        record_outcome(step, result, error)
+        if error is None and step.checkpoint and checkpointer is not None:
+            checkpointer.save(completed_steps(compiled, result))
+
+    if checkpointer is not None and result.error is None:
+        checkpointer.clear()
+    return result
+
+
+def run_scenario_or_raise(
+    compiled: CompiledScenario,
+    actions: Dict[str, Action],
+    ctx: ScenarioContext,
+    checkpointer: Optional[Any] = None,
+) -> ScenarioResult:
+    result = run_scenario(compiled, actions, ctx, checkpointer)
+    if result.error is not None:
+        raise result.error
+    return result
+
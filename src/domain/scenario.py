@@ -1,18 +1,139 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
-from .accounts import BrawlStarsAccount, GoogleAccount
-from .order import Order
 
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Сколько раз выполнять шаг и пауза между попытками (растёт в backoff раз)."""
 
-@dataclass
-class PurchaseSettings:
-    game_slug: str
-    proxy_enabled: bool = True
+    attempts: int = 1
+    delay_ms: int = 0
+    backoff: float = 2.0
 
 
-def purchase_80_gems(brawl_account: BrawlStarsAccount, google_account: GoogleAccount, settings: PurchaseSettings) -> Order:
-    """Domain-level description: returns desired order (80 gems, qty=1).
+@dataclass(frozen=True)
+class Step:
+    """Шаг сценария как данные; action — имя действия в реестре исполнителя.
 
-    Инфраструктурные детали (Playwright, DOM, Google Pay) здесь не реализуются.
+    - requires: шаги, которые должны завершиться успешно (иначе шаг пропускается);
+    - after: шаги, которые должны просто завершиться (порядок без зависимости от исхода);
+    - timeout_ms: таймаут шага вместо общего `playwright.page_timeout_ms`;
+    - required: падение обязательного шага роняет сценарий, необязательного — только логируется;
+    - always: шаг выполняется и после падения сценария (финализация, как finally);
+    - ends_session: шаг делает недействительной сохранённую в контрольной точке сессию
+      (логаут) — после падения его можно отложить до повтора с точки;
+    - checkpoint: после успеха шага прогресс можно сохранить и при повторе продолжить
+      с этого места (состояние шага переживает навигацию: URL + storage_state);
+    - irreversible: шаг может необратимо изменить состояние (списать оплату) — перед его
+      запуском контрольная точка удаляется, и повтор не продолжит прогон до этого шага.
     """
-    return Order(sku_name="80_gems", quantity=1)
+
+    name: str
+    action: str
+    requires: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    timeout_ms: Optional[int] = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    required: bool = True
+    always: bool = False
+    ends_session: bool = False
+    checkpoint: bool = False
+    irreversible: bool = False
+
+    @property
+    def depends_on(self) -> Tuple[str, ...]:
+        return self.requires + self.after
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    steps: Tuple[Step, ...]
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    """Проверенный сценарий: шаги в топологическом порядке и индекс по имени."""
+
+    scenario: Scenario
+    order: Tuple[Step, ...]
+    by_name: Dict[str, Step] = field(hash=False, compare=False)
+
+    @property
+    def name(self) -> str:
+        return self.scenario.name
+
+
+@lru_cache(maxsize=None)
+def compile_scenario(scenario: Scenario) -> CompiledScenario:
+    """Проверяет сценарий (уникальные имена, известные зависимости, отсутствие циклов)
+    и упорядочивает шаги. Результат кэшируется: сценарий компилируется один раз."""
+
+    by_name: Dict[str, Step] = {}
+    for step in scenario.steps:
+        if step.name in by_name:
+            raise RuntimeError(f"Шаг {step.name!r} объявлен в сценарии {scenario.name!r} дважды")
+        by_name[step.name] = step
+
+    for step in scenario.steps:
+        for dependency in step.depends_on:
+            if dependency not in by_name:
+                raise RuntimeError(f"Шаг {step.name!r} зависит от неизвестного шага {dependency!r}")
+
+    # Алгоритм Кана; при равенстве сохраняется порядок объявления.
+    remaining = {step.name: set(step.depends_on) for step in scenario.steps}
+    order = []
+    while remaining:
+        ready = [step for step in scenario.steps if step.name in remaining and not remaining[step.name]]
+        if not ready:
+            raise RuntimeError(f"Цикл зависимостей в сценарии {scenario.name!r}: {sorted(remaining)}")
+        for step in ready:
+            del remaining[step.name]
+            order.append(step)
+        for dependencies in remaining.values():
+            dependencies.difference_update(step.name for step in ready)
+
+    return CompiledScenario(scenario=scenario, order=tuple(order), by_name=by_name)
+
+
+def purchase_scenario() -> Scenario:
+    """Покупка Order через Supercell Store и Google Pay с финализацией сессии.
+
+    Все шаги работают с одной страницей магазина (и попапом оплаты), поэтому
+    основная часть — цепочка; финализация выполняется всегда, её шаги необязательны.
+    Логаут не требует страницы аккаунта (быстрый путь работает без неё), поэтому
+    он идёт после отвязки оплаты, но и тогда, когда аккаунт не открылся.
+    Контрольные точки — страница товара и checkout (корзина закодирована в его URL):
+    повтор после падения до оплаты начинается сразу с checkout. С началом
+    confirm_payment точка удаляется: кнопка оплаты могла быть нажата, и повтор
+    с checkout мог бы списать деньги дважды. Таймаут шагу не задаётся: долгое
+    ожидание результата оплаты (`playwright.payment_confirm_timeout_ms`) GooglePayClient
+    передаёт только в wait_for_completion после нажатия Pay.
+    """
+
+    return Scenario(
+        name="purchase",
+        steps=(
+            Step(
+                "open_product",
+                "store.open_product",
+                retry=RetryPolicy(attempts=2, delay_ms=500),
+                checkpoint=True,
+            ),
+            Step("add_to_cart", "store.add_to_cart", requires=("open_product",)),
+            Step("checkout", "store.checkout", requires=("add_to_cart",), checkpoint=True),
+            Step("open_google_pay", "store.open_google_pay", requires=("checkout",)),
+            Step("confirm_payment", "google_pay.confirm", requires=("open_google_pay",), irreversible=True),
+            Step("open_account", "store.open_account", after=("confirm_payment",), required=False, always=True),
+            Step("detach_payment", "store.detach_payment", requires=("open_account",), required=False, always=True),
+            Step(
+                "logout",
+                "store.logout",
+                after=("detach_payment",),
+                required=False,
+                always=True,
+                ends_session=True,
+            ),
+        ),
+    )
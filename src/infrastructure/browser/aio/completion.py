@@ -0,0 +1,95 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Sequence
+
+from playwright.async_api import Page
+
+from src.infrastructure.browser.completion import (
+    CompletionResult,
+    CompletionSignal,
+    ElementVisible,
+    completion_timeout_error,
+    event_listeners,
+)
+from src.infrastructure.browser.deadlines import current_deadline_ms
+from src.infrastructure.config.app_config import load_app_config
+
+
+@asynccontextmanager
+async def wait_for_completion(
+    page: Page,
+    stage: str,
+    signals: Sequence[CompletionSignal],
+    timeout_ms: Optional[float] = None,
+) -> AsyncIterator[CompletionResult]:
+    """Async-вариант wait_for_completion.
+
+    Здесь отрезки не нужны: события завершают future, каждый ElementVisible ждётся
+    своей задачей, и выигрывает то, что завершилось первым.
+    """
+
+    if timeout_ms is None:
+        timeout_ms = current_deadline_ms() or load_app_config().playwright.page_timeout_ms
+    result = CompletionResult(stage=stage)
+    fired: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+
+    def fire(name: str) -> None:
+        if not fired.done():
+            fired.set_result(name)
+
+    listeners = event_listeners(page, signals, fire)
+    for event, listener in listeners:
+        page.on(event, listener)
+
+    started = time.perf_counter()
+    try:
+        yield result
+        result.signal = await _wait_first(page, signals, fired, started, timeout_ms)
+    finally:
+        for event, listener in listeners:
+            page.remove_listener(event, listener)
+        if not fired.done():
+            fired.cancel()
+
+    if result.signal is None:
+        raise completion_timeout_error(stage, signals, timeout_ms)
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    result.report()
+
+
+async def _wait_first(
+    page: Page,
+    signals: Sequence[CompletionSignal],
+    fired: "asyncio.Future[str]",
+    started: float,
+    timeout_ms: float,
+) -> Optional[str]:
+    remaining_ms = timeout_ms - (time.perf_counter() - started) * 1000
+    tasks: Dict["asyncio.Future[object]", str] = {}
+    for signal in signals:
+        if isinstance(signal, ElementVisible):
+            locator = signal.build(page).filter(visible=True).first
+            task = asyncio.ensure_future(locator.wait_for(state="visible", timeout=max(remaining_ms, 1)))
+            tasks[task] = signal.name
+
+    pending = {fired, *tasks}
+    try:
+        while pending:
+            remaining_s = timeout_ms / 1000 - (time.perf_counter() - started)
+            if remaining_s <= 0:
+                return None
+            done, pending = await asyncio.wait(pending, timeout=remaining_s, return_when=asyncio.FIRST_COMPLETED)
+            if fired in done:
+                return fired.result()
+            for task in done:
+                # Ошибка ожидания элемента (таймаут, закрытая страница) — просто выбывший сигнал.
+                if task.exception() is None:
+                    return tasks[task]
+        return None
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
@@ -0,0 +1,92 @@
+import re
+from typing import Optional
+
+from playwright.async_api import Page, Locator
+
+from src.infrastructure.browser import selectors
+from src.infrastructure.browser.aio.completion import wait_for_completion
+from src.infrastructure.browser.deadlines import adaptive_deadline, current_deadline_ms
+from src.infrastructure.browser.aio.locator_resolver import AsyncLocatorResolver
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.tracing import traced
+
+
+class AsyncGooglePayClient:
+    """Async-вариант GooglePayClient: логин в Google и подтверждение оплаты в попапе."""
+
+    def __init__(self, popup_page: Page, resolver: Optional[AsyncLocatorResolver] = None) -> None:
+        self.page = popup_page
+        self.resolver = resolver or AsyncLocatorResolver(popup_page)
+
+    # -------------------- Вспомогательные методы --------------------
+    async def _email_input(self) -> Locator:
+        candidate = await self.resolver.find(
+            "google.email_input",
+            selectors.GOOGLE_EMAIL_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
+        if candidate is not None:
+            return candidate
+
+        raise RuntimeError("Не удалось найти поле email на экране входа Google")
+
+    async def _password_input(self) -> Locator:
+        candidate = await self.resolver.find(
+            "google.password_input",
+            selectors.GOOGLE_PASSWORD_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
+        if candidate is not None:
+            return candidate
+
+        raise RuntimeError("Не удалось найти поле пароля Google")
+
+    async def _backup_code_input(self) -> Locator:
+        candidate = await self.resolver.find("google.backup_code_input", selectors.GOOGLE_BACKUP_CODE_INPUT)
+        if candidate is not None:
+            return candidate
+
+        raise RuntimeError("Не удалось найти поле ввода backup-кода Google 2FA")
+
+    def _next_button(self) -> Locator:
+        return self.page.get_by_role(
+            "button",
+            name=re.compile("Next|Далее|Продолжить", re.IGNORECASE),
+        )
+
+    # -------------------- Основной flow Google login + оплата --------------------
+    @traced()
+    @adaptive_deadline()
+    async def login_and_confirm_payment(self, email: str, password: str, backup_code: str) -> None:
+        """См. GooglePayClient.login_and_confirm_payment."""
+
+        email_input = await self._email_input()
+        await email_input.fill(email, timeout=current_deadline_ms())
+        await self._next_button().click(timeout=current_deadline_ms())
+
+        password_input = await self._password_input()
+        await password_input.fill(password, timeout=current_deadline_ms())
+        await self._next_button().click(timeout=current_deadline_ms())
+
+        try:
+            backup_input: Optional[Locator] = await self._backup_code_input()
+        except RuntimeError:
+            backup_input = None
+
+        if backup_input is not None:
+            await backup_input.fill(backup_code, timeout=current_deadline_ms())
+            await self._next_button().click(timeout=current_deadline_ms())
+
+        pay_button = self.page.get_by_role(
+            "button",
+            name=re.compile("Pay|Оплатить", re.IGNORECASE),
+        )
+
+        confirm_timeout_ms = load_app_config().playwright.payment_confirm_timeout_ms
+        async with wait_for_completion(
+            self.page, "google_pay.confirm", selectors.GOOGLE_PAY_DONE, timeout_ms=confirm_timeout_ms
+        ) as done:
+            await pay_button.click(timeout=current_deadline_ms())
+
+        if done.signal == "payment_error":
+            raise RuntimeError("Google Pay сообщает об ошибке при оплате")
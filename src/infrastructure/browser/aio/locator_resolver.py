@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Optional, Sequence
+
+from playwright.async_api import Locator, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.infrastructure.browser.locator_resolver import (
+    FIRST_MATCH_JS,
+    LearnedLocatorCache,
+    LocatorStrategy,
+    default_locator_cache,
+    first_match_probe,
+    prioritized,
+    union,
+    url_pattern,
+)
+
+
+class AsyncLocatorResolver:
+    """Async-вариант LocatorResolver с тем же алгоритмом и общим дисковым кэшем стратегий.
+
+    Кэш читается и пишется в отдельном потоке, чтобы диск не останавливал event loop.
+    """
+
+    def __init__(self, page: Page, cache: Optional[LearnedLocatorCache] = None) -> None:
+        self.page = page
+        self.cache = cache if cache is not None else default_locator_cache()
+        self.round_trips = 0
+
+    async def find(
+        self,
+        target: str,
+        strategies: Sequence[LocatorStrategy],
+        root: Optional[Any] = None,
+        timeout_ms: Optional[float] = None,
+    ) -> Optional[Locator]:
+        """См. LocatorResolver.find."""
+
+        root = root if root is not None else self.page
+        if not strategies:
+            return None
+        if timeout_ms is not None and not await self._wait_any(strategies, root, timeout_ms):
+            return None
+
+        key = f"{url_pattern(self.page.url)}::{target}"
+        learned_name = await asyncio.to_thread(self.cache.get, key) if self.cache is not None else None
+        by_name = {s.name: s for s in strategies}
+        order = prioritized(strategies, by_name.get(learned_name) if learned_name else None)
+        locators = [s.build(root) for s in order]
+
+        self.round_trips += 1
+        index = await first_match_probe(self.page, locators).evaluate_all(FIRST_MATCH_JS)
+        if index < 0:
+            return None
+        if order[index].name != learned_name:
+            await self._remember(key, order[index])
+        return locators[index].first
+
+    async def _wait_any(self, strategies: Sequence[LocatorStrategy], root: Any, timeout_ms: float) -> bool:
+        self.round_trips += 1
+        try:
+            await union([s.build(root) for s in strategies]).first.wait_for(state="attached", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            return False
+        return True
+
+    async def _remember(self, key: str, strategy: LocatorStrategy) -> None:
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, key, strategy.name)
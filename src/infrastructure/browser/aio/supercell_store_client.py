@@ -0,0 +1,333 @@
+import asyncio
+import re
+from typing import Dict, Optional
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page, Locator, expect
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.infrastructure.browser import selectors
+from src.infrastructure.browser.aio.completion import wait_for_completion
+from src.infrastructure.browser.aio.locator_resolver import AsyncLocatorResolver
+from src.infrastructure.browser.catalog_index import (
+    PRODUCT_LINKS_JS,
+    PRODUCT_LINKS_SELECTOR,
+    CatalogIndex,
+    build_catalog,
+    default_catalog_index,
+    match_sku,
+    sku_key,
+)
+from src.infrastructure.browser.completion import UrlChanged
+from src.infrastructure.browser.deadlines import (
+    adaptive_deadline,
+    current_deadline_ms,
+    current_navigation_deadline_ms,
+)
+from src.infrastructure.browser.teardown import CLEAR_STORAGE_JS, is_logged_out_status
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import traced
+
+
+class AsyncSupercellStoreClient:
+    """Async-вариант SupercellStoreClient на playwright.async_api.
+
+    Поведение и локаторы совпадают с sync-клиентом; позволяет вести много
+    независимых страниц в одном event loop (smoke по нескольким играм, матрица
+    прогонов против stand-in). Поэтому срок метода (deadlines.task_deadline)
+    передаётся в каждый вызов Playwright, а индекс каталога читается и пишется
+    в отдельном потоке.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        base_url: str,
+        game_slug: str,
+        resolver: Optional[AsyncLocatorResolver] = None,
+        catalog: Optional[CatalogIndex] = None,
+    ) -> None:
+        self.page = page
+        self.base_url = base_url.rstrip("/")
+        self.game_slug = game_slug.strip("/")
+        self.resolver = resolver or AsyncLocatorResolver(page)
+        self.catalog = catalog if catalog is not None else default_catalog_index()
+
+    # -------------------- Общие URL --------------------
+    @property
+    def game_url(self) -> str:
+        return f"{self.base_url}/{self.game_slug}"
+
+    # -------------------- Открытие магазина --------------------
+    @traced()
+    @adaptive_deadline()
+    async def open_store(self) -> None:
+        """Открывает страницу игры в Supercell Store и ждёт загрузки."""
+
+        await self.page.goto(self.game_url, timeout=current_navigation_deadline_ms())
+        await expect(self.page).to_have_url(re.compile(self.game_slug, re.IGNORECASE))
+
+    # -------------------- Логин --------------------
+    def _login_button(self) -> Locator:
+        return self.page.get_by_role("link", name=selectors.STORE_LOGIN_LINK_NAME)
+
+    def _account_link(self) -> Locator:
+        return self.page.get_by_role("link", name=selectors.STORE_ACCOUNT_LINK_NAME)
+
+    @traced()
+    @adaptive_deadline()
+    async def is_logged_in(self, timeout_ms: float = 3_000) -> bool:
+        """См. SupercellStoreClient.is_logged_in."""
+
+        await self.open_store()
+        account = self._account_link().first
+        try:
+            await self._login_button().first.or_(account).first.wait_for(state="visible", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            return False
+        return await account.is_visible()
+
+    @traced()
+    @adaptive_deadline()
+    async def start_login(self, email: str) -> None:
+        """Запускает процесс логина по email: открывает стор и запрашивает ОТП."""
+
+        await self.open_store()
+        await self._login_button().click(timeout=current_deadline_ms())
+
+        email_input = await self.resolver.find(
+            "store.email_input",
+            selectors.STORE_EMAIL_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
+        if email_input is None:
+            raise RuntimeError("Не удалось найти поле ввода email на странице логина Supercell Store")
+
+        await email_input.fill(email, timeout=current_deadline_ms())
+
+        next_button = self.page.get_by_role(
+            "button",
+            name=re.compile("Next|Continue|Продолжить", re.IGNORECASE),
+        )
+        await next_button.click(timeout=current_deadline_ms())
+
+    @traced()
+    @adaptive_deadline()
+    async def complete_login_with_otp(self, otp_code: str) -> None:
+        """Вводит ОТП-код из письма и завершает логин."""
+
+        otp_input = await self.resolver.find(
+            "store.otp_input",
+            selectors.STORE_OTP_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
+        if otp_input is None:
+            raise RuntimeError("Не удалось найти поле ввода одноразового кода на странице логина Supercell Store")
+
+        await otp_input.fill(otp_code, timeout=current_deadline_ms())
+
+        submit_button = self.page.get_by_role(
+            "button",
+            name=re.compile("Log in|Войти|Submit|Continue", re.IGNORECASE),
+        )
+        await submit_button.click(timeout=current_deadline_ms())
+
+        await expect(self.page).to_have_url(re.compile(self.game_slug, re.IGNORECASE))
+
+    # -------------------- Этап 3: выбор товара и корзина --------------------
+    async def _crawl_catalog(self) -> Dict[str, str]:
+        await self.open_store()
+        links = await self.page.eval_on_selector_all(PRODUCT_LINKS_SELECTOR, PRODUCT_LINKS_JS)
+        products = build_catalog(links, self.game_url)
+        if self.catalog is not None:
+            await asyncio.to_thread(self.catalog.put, self.game_url, products)
+        log_event(
+            stage="catalog",
+            status="ok",
+            message="Store catalog indexed",
+            data={"game_slug": self.game_slug, "products": len(products)},
+        )
+        return products
+
+    async def _open_product_url(self, url: str) -> bool:
+        try:
+            response = await self.page.goto(url, timeout=current_navigation_deadline_ms())
+        except PlaywrightError:
+            return False
+        return response is None or response.ok
+
+    @traced()
+    @adaptive_deadline()
+    async def go_to_product(self, sku_name: str, product_url: Optional[str] = None) -> None:
+        """См. SupercellStoreClient.go_to_product: product_url, индекс каталога, обход страницы игры."""
+
+        if product_url:
+            await self.page.goto(product_url, timeout=current_navigation_deadline_ms())
+            return
+
+        url = await asyncio.to_thread(self.catalog.lookup, self.game_url, sku_name) if self.catalog is not None else None
+        if url is not None:
+            if await self._open_product_url(url):
+                return
+            await asyncio.to_thread(self.catalog.invalidate, self.game_url)
+            log_event(
+                stage="catalog",
+                status="info",
+                message="Indexed product URL failed, re-indexing",
+                data={"game_slug": self.game_slug, "sku": sku_name, "url": url},
+            )
+
+        url = match_sku(await self._crawl_catalog(), sku_name)
+        if url is not None:
+            await self.page.goto(url, timeout=current_navigation_deadline_ms())
+            return
+
+        fallback = selectors.STORE_PRODUCT_FALLBACKS.get(sku_key(sku_name))
+        product_link = await self.resolver.find(f"store.product_{sku_key(sku_name)}", fallback) if fallback else None
+        if product_link is None:
+            raise RuntimeError(f"Не удалось найти товар {sku_name!r} на странице магазина Supercell")
+
+        await product_link.click(timeout=current_deadline_ms())
+
+    async def go_to_product_80_gems(self, product_url: Optional[str] = None) -> None:
+        await self.go_to_product("80_gems", product_url=product_url)
+
+    async def _ensure_quantity(self, quantity: int = 1) -> None:
+        qty_input = self.page.locator("input[type='number']")
+        if await qty_input.count() > 0:
+            await qty_input.first.fill(str(quantity), timeout=current_deadline_ms())
+            return
+
+        minus_button = self.page.get_by_role(
+            "button",
+            name=re.compile("-|minus|Decrease", re.IGNORECASE),
+        )
+        for _ in range(5):
+            if await minus_button.count() == 0:
+                break
+            await minus_button.first.click(timeout=current_deadline_ms())
+
+        if quantity > 1:
+            plus_button = self.page.get_by_role("button", name=re.compile(r"\+|plus|Increase", re.IGNORECASE))
+            for _ in range(quantity - 1):
+                await plus_button.first.click(timeout=current_deadline_ms())
+
+    @traced()
+    @adaptive_deadline()
+    async def add_to_cart(self, quantity: int = 1) -> None:
+        """Нажимает Buy и приводит количество к quantity."""
+
+        buy_button = self.page.get_by_role(
+            "button",
+            name=re.compile("Buy|Купить", re.IGNORECASE),
+        )
+        await buy_button.click(timeout=current_deadline_ms())
+
+        await self._ensure_quantity(quantity)
+
+    async def add_to_cart_single_quantity(self) -> None:
+        await self.add_to_cart(1)
+
+    @traced()
+    @adaptive_deadline()
+    async def proceed_to_checkout(self) -> None:
+        """Переходит к странице Checkout и ждёт первый сигнал её готовности (URL или заголовок)."""
+
+        checkout_button = self.page.get_by_role(
+            "button",
+            name=re.compile("Checkout|Перейти к оплате", re.IGNORECASE),
+        )
+        async with wait_for_completion(self.page, "store.checkout", selectors.CHECKOUT_DONE) as done:
+            await checkout_button.click(timeout=current_deadline_ms())
+
+        if done.signal != "checkout_heading":
+            heading = self.page.get_by_role("heading", name=selectors.CHECKOUT_HEADING_NAME)
+            await expect(heading).to_be_visible()
+
+    # -------------------- Этап 5: аккаунт, отвязка оплаты и логаут --------------------
+    @traced()
+    @adaptive_deadline()
+    async def open_account_page(self, account_url: Optional[str] = None, timeout_ms: Optional[float] = None) -> None:
+        """Открывает страницу аккаунта Supercell Store (timeout_ms ограничивает и expect-проверки)."""
+
+        url = account_url or f"{self.base_url}/account"
+        await self.page.goto(url, timeout=current_navigation_deadline_ms())
+
+        heading = self.page.get_by_role(
+            "heading",
+            name=re.compile("Account|Аккаунт", re.IGNORECASE),
+        )
+        if await heading.count() == 0:
+            payment_label = self.page.get_by_text(re.compile("Payment information", re.IGNORECASE))
+            await expect(payment_label).to_be_visible(timeout=timeout_ms)
+        else:
+            await expect(heading.first).to_be_visible(timeout=timeout_ms)
+
+    @traced()
+    @adaptive_deadline()
+    async def detach_payment_method(self) -> bool:
+        """Отвязывает способ оплаты в разделе Payment information (best-effort).
+
+        Возвращает True, если кнопка отвязки была нажата.
+        """
+
+        section = self.page.get_by_text(re.compile("Payment information", re.IGNORECASE))
+        if await section.count() == 0:
+            return False
+
+        container = section.nth(0).locator("xpath=ancestor::section | xpath=ancestor::div")
+
+        remove_button = await self.resolver.find(
+            "store.remove_payment_button",
+            selectors.STORE_REMOVE_PAYMENT_BUTTON,
+            root=container,
+        )
+        if remove_button is not None:
+            await remove_button.click(timeout=current_deadline_ms())
+
+            confirm = self.page.get_by_role(
+                "button",
+                name=re.compile("Remove|Yes|Да|Confirm", re.IGNORECASE),
+            )
+            if await confirm.count() > 0:
+                await confirm.first.click(timeout=current_deadline_ms())
+            return True
+        return False
+
+    @traced()
+    @adaptive_deadline()
+    async def logout_supercell(self, timeout_ms: Optional[float] = None) -> bool:
+        """Выходит из аккаунта Supercell через ссылку/кнопку Log out (False — кнопки нет)."""
+
+        logout = await self.resolver.find("store.logout", selectors.STORE_LOGOUT)
+        if logout is None:
+            return False
+
+        signals = (*selectors.LOGOUT_DONE, UrlChanged(self.game_url, name="game_page"))
+        async with wait_for_completion(self.page, "store.logout", signals, timeout_ms=timeout_ms):
+            await logout.click(timeout=current_deadline_ms())
+        return True
+
+    @traced()
+    @adaptive_deadline()
+    async def clear_session(self) -> None:
+        """Быстрый логаут без UI: cookies контекста и web storage текущего origin."""
+
+        await self.page.context.clear_cookies()
+        try:
+            await self.page.evaluate(CLEAR_STORAGE_JS)
+        except PlaywrightError:
+            pass
+
+    @traced()
+    @adaptive_deadline()
+    async def is_logged_out(self, account_url: Optional[str] = None, timeout_ms: Optional[float] = None) -> bool:
+        """Проверяет логаут одним запросом к странице аккаунта (см. sync-клиент)."""
+
+        url = account_url or f"{self.base_url}/account"
+        response = await self.page.context.request.get(url, max_redirects=0, timeout=timeout_ms)
+        try:
+            return is_logged_out_status(response.status)
+        finally:
+            await response.dispose()
@@ -0,0 +1,314 @@
+"""Тёплый браузер-сервер: браузер запускается один раз и переживает сессии pytest.
+
+    python -m src.infrastructure.browser.browser_server            # запустить
+    python -m src.infrastructure.browser.browser_server --status   # health
+    python -m src.infrastructure.browser.browser_server --stop
+
+Браузер поднимает драйвер Playwright (`playwright launch-server`, аналог
+browserType.launchServer из Node): он один на все подключения, клиенты получают
+в нём свои контексты через browser_type.connect(ws_endpoint). Перед драйвером
+стоит TCP-прокси на порту из секции `browser_server:` config.yaml, который:
+- отвечает на GET /__health (JSON со статусом и числом подключений);
+- ограничивает число одновременных подключений (сверх лимита — 503);
+- завершает сервер, если подключений нет дольше idle_timeout_s.
+
+Фикстуры и раннеры вызывают warm_connect_options(): если сервер не отвечает или
+занят, возвращается None и браузер запускается как обычно.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.infrastructure.config.app_config import BrowserServerConfig, load_app_config
+
+
+HEALTH_PATH = "/__health"
+STOP_PATH = "/__stop"
+_HEADER_LIMIT = 64 * 1024
+
+
+def _http_response(status: str, body: Dict[str, Any]) -> bytes:
+    payload = json.dumps(body).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+    )
+    return head.encode("ascii") + payload
+
+
+def _pump(source: socket.socket, target: socket.socket) -> None:
+    try:
+        while True:
+            chunk = source.recv(65536)
+            if not chunk:
+                break
+            target.sendall(chunk)
+    except OSError:
+        pass
+    finally:
+        try:
+            target.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+class ConnectionProxy:
+    """TCP-прокси перед ws-эндпоинтом драйвера: health, лимит подключений, учёт простоя."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        upstream: Tuple[str, int],
+        ws_path: str,
+        max_connections: int,
+    ) -> None:
+        self.upstream = upstream
+        self.ws_path = ws_path
+        self.max_connections = max_connections
+        self.started_at = time.time()
+        self.active = 0
+        self.total = 0
+        self.rejected = 0
+        self.idle_since: Optional[float] = time.monotonic()
+        self.stop_requested = threading.Event()
+        self._lock = threading.Lock()
+        self._listener = socket.create_server((host, port), reuse_port=False)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._listener.getsockname()[:2]
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "ok",
+                "pid": os.getpid(),
+                "active": self.active,
+                "max_connections": self.max_connections,
+                "total": self.total,
+                "rejected": self.rejected,
+                "uptime_s": round(time.time() - self.started_at, 1),
+            }
+
+    def idle_for(self) -> float:
+        with self._lock:
+            if self.idle_since is None:
+                return 0.0
+            return time.monotonic() - self.idle_since
+
+    def start(self) -> "ConnectionProxy":
+        self._thread = threading.Thread(target=self._accept_loop, name="browser-server-proxy", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _read_head(self, client: socket.socket) -> bytes:
+        data = b""
+        while b"\r\n\r\n" not in data and len(data) < _HEADER_LIMIT:
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def _handle(self, client: socket.socket) -> None:
+        with client:
+            head = self._read_head(client)
+            request_line = head.split(b"\r\n", 1)[0].decode("latin-1", "replace").split(" ")
+            method, path = (request_line + ["", ""])[:2]
+            path = path.split("?", 1)[0]
+
+            if path == HEALTH_PATH:
+                client.sendall(_http_response("200 OK", self.health()))
+                return
+            if path == STOP_PATH and method == "POST":
+                client.sendall(_http_response("200 OK", {"status": "stopping"}))
+                self.stop_requested.set()
+                return
+            if path != self.ws_path:
+                client.sendall(_http_response("404 Not Found", {"error": "unknown path"}))
+                return
+
+            with self._lock:
+                if self.active >= self.max_connections:
+                    self.rejected += 1
+                    client.sendall(_http_response("503 Service Unavailable", {"error": "connection limit"}))
+                    return
+                self.active += 1
+                self.total += 1
+                self.idle_since = None
+
+            try:
+                with socket.create_connection(self.upstream) as upstream:
+                    upstream.sendall(head)
+                    reader = threading.Thread(target=_pump, args=(upstream, client), daemon=True)
+                    reader.start()
+                    _pump(client, upstream)
+                    reader.join()
+            except OSError:
+                pass
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    if self.active == 0:
+                        self.idle_since = time.monotonic()
+
+
+def _launch_driver(cfg: BrowserServerConfig, timeout_s: float = 60) -> Tuple[subprocess.Popen, str]:
+    """Запускает `playwright launch-server` и возвращает процесс и его ws-эндпоинт."""
+
+    from playwright._impl._driver import compute_driver_executable, get_driver_env
+
+    options = {"headless": cfg.headless, "host": "127.0.0.1", "port": 0, "wsPath": cfg.ws_path}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(options, f)
+        config_path = f.name
+
+    driver_executable, driver_cli = compute_driver_executable()
+    process = subprocess.Popen(
+        [driver_executable, driver_cli, "launch-server", "--browser", cfg.browser, "--config", config_path],
+        stdout=subprocess.PIPE,
+        env=get_driver_env(),
+        text=True,
+    )
+    endpoint: List[str] = []
+    reader = threading.Thread(target=lambda: endpoint.append(process.stdout.readline().strip()), daemon=True)
+    reader.start()
+    reader.join(timeout_s)
+    os.unlink(config_path)
+    if not endpoint or not endpoint[0].startswith("ws://"):
+        process.kill()
+        raise RuntimeError("Драйвер Playwright не запустил браузер-сервер")
+    # Дальнейший вывод драйвера вычитываем, чтобы он не заблокировался на полном пайпе.
+    threading.Thread(target=process.stdout.read, daemon=True).start()
+    return process, endpoint[0]
+
+
+def serve(cfg: BrowserServerConfig) -> None:
+    """Запускает браузер и прокси; блокирует до простоя, --stop или Ctrl+C."""
+
+    process, endpoint = _launch_driver(cfg)
+    upstream_host, upstream_port = endpoint[len("ws://"):].split("/", 1)[0].rsplit(":", 1)
+    proxy = ConnectionProxy(
+        cfg.host,
+        cfg.port,
+        upstream=(upstream_host, int(upstream_port)),
+        ws_path=cfg.ws_path,
+        max_connections=cfg.max_connections,
+    ).start()
+    print(f"Browser server ({cfg.browser}): ws://{cfg.host}:{cfg.port}{cfg.ws_path}", flush=True)
+
+    try:
+        while not proxy.stop_requested.wait(1.0):
+            if process.poll() is not None:
+                break
+            if proxy.idle_for() > cfg.idle_timeout_s:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.close()
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _request(cfg: BrowserServerConfig, method: str, path: str) -> Optional[Dict[str, Any]]:
+    import http.client
+
+    connection = http.client.HTTPConnection(cfg.host, cfg.port, timeout=cfg.probe_timeout_ms / 1000)
+    try:
+        connection.request(method, path)
+        response = connection.getresponse()
+        if response.status != 200:
+            return None
+        return json.loads(response.read())
+    except (OSError, ValueError, http.client.HTTPException):
+        return None
+    finally:
+        connection.close()
+
+
+def probe(cfg: Optional[BrowserServerConfig] = None) -> Optional[Dict[str, Any]]:
+    """Health тёплого сервера или None, если он не запущен."""
+
+    return _request(cfg or load_app_config().browser_server, "GET", HEALTH_PATH)
+
+
+def warm_connect_options(browser_name: str = "chromium") -> Optional[Dict[str, Any]]:
+    """connect_options для pytest-playwright / browser_type.connect, если тёплый сервер доступен."""
+
+    cfg = load_app_config().browser_server
+    if not cfg.enabled or browser_name != cfg.browser:
+        return None
+    health = probe(cfg)
+    if health is None or health.get("active", 0) >= health.get("max_connections", 0):
+        return None
+    return {"ws_endpoint": f"ws://{cfg.host}:{cfg.port}{cfg.ws_path}"}
+
+
+def connect_or_launch(browser_type: Any, **launch_args: Any) -> Any:
+    """Browser из тёплого сервера, а если его нет — обычный browser_type.launch()."""
+
+    options = warm_connect_options(browser_type.name)
+    if options is not None:
+        try:
+            return browser_type.connect(**options)
+        except Exception:
+            # Сервер мог закрыться между проверкой и подключением.
+            pass
+    return browser_type.launch(**launch_args)
+
+
+async def connect_or_launch_async(browser_type: Any, **launch_args: Any) -> Any:
+    """connect_or_launch для playwright.async_api."""
+
+    options = warm_connect_options(browser_type.name)
+    if options is not None:
+        try:
+            return await browser_type.connect(**options)
+        except Exception:
+            pass
+    return await browser_type.launch(**launch_args)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    cfg = load_app_config().browser_server
+    parser = argparse.ArgumentParser(description="Тёплый браузер-сервер Playwright между сессиями pytest")
+    parser.add_argument("--status", action="store_true", help="показать health запущенного сервера")
+    parser.add_argument("--stop", action="store_true", help="остановить запущенный сервер")
+    args = parser.parse_args(argv)
+
+    if args.status or args.stop:
+        result = _request(cfg, "POST", STOP_PATH) if args.stop else probe(cfg)
+        print(json.dumps(result) if result is not None else "not running")
+        return
+    serve(cfg)
+
+
+if __name__ == "__main__":
+    main()
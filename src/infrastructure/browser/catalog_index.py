@@ -0,0 +1,120 @@
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config
+
+
+# Все ссылки страницы одним запросом к браузеру: [(текст, абсолютный href), ...].
+PRODUCT_LINKS_SELECTOR = "a[href]"
+PRODUCT_LINKS_JS = "links => links.map(a => [a.textContent || '', a.href])"
+
+
+def sku_key(name: str) -> str:
+    """Нормализует имя SKU: "80 Gems", "80-gems" и "80_gems" дают один ключ."""
+
+    return re.sub(r"[^0-9a-zа-яё]+", "_", name.lower()).strip("_")
+
+
+def build_catalog(links: Iterable[Tuple[str, str]], game_url: str) -> Dict[str, str]:
+    """SKU -> URL товара по ссылкам со страницы игры.
+
+    Берутся только ссылки глубже страницы игры (<game_url>/...). Ключ — текст ссылки,
+    а если по тексту ключ уже занят или текста нет — последний сегмент пути.
+    """
+
+    game_path = urlsplit(game_url).path.rstrip("/") + "/"
+    products: Dict[str, str] = {}
+    for text, href in links:
+        parts = urlsplit(href)
+        if not parts.path.startswith(game_path) or parts.path.rstrip("/") + "/" == game_path:
+            continue
+        url = parts._replace(query="", fragment="").geturl()
+        for key in (sku_key(text), sku_key(parts.path.rstrip("/").rsplit("/", 1)[-1])):
+            if key:
+                products.setdefault(key, url)
+    return products
+
+
+def match_sku(products: Dict[str, str], sku_name: str) -> Optional[str]:
+    """URL товара по имени SKU: точное совпадение ключа, иначе первый ключ вида `<sku>_...`
+    (текст карточки часто содержит цену: "80 Gems €0.99" -> 80_gems_0_99)."""
+
+    key = sku_key(sku_name)
+    if key in products:
+        return products[key]
+    return next((url for name, url in products.items() if name.startswith(key + "_")), None)
+
+
+class CatalogIndex:
+    """Дисковый индекс товаров: URL страницы игры -> {SKU: URL} с временем обхода.
+
+    Ключ — URL, а не только game_slug, чтобы индексы живого магазина и stand-in
+    не смешивались.
+
+    Индекс игры живёт ttl_s секунд; если переход по URL из индекса не удался,
+    индекс игры сбрасывается (invalidate) и страница магазина обходится заново.
+    """
+
+    def __init__(self, path: Path, ttl_s: float) -> None:
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self._load(), ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def products(self, game_url: str) -> Optional[Dict[str, str]]:
+        """Индекс игры или None, если его нет или истёк TTL."""
+
+        with self._lock:
+            entry = self._load().get(game_url)
+        if entry is None or time.time() - float(entry.get("crawled_at", 0)) > self.ttl_s:
+            return None
+        return entry.get("products", {})
+
+    def lookup(self, game_url: str, sku_name: str) -> Optional[str]:
+        return match_sku(self.products(game_url) or {}, sku_name)
+
+    def put(self, game_url: str, products: Dict[str, str]) -> None:
+        with self._lock:
+            self._load()[game_url] = {"crawled_at": time.time(), "products": dict(products)}
+            self._save()
+
+    def invalidate(self, game_url: str) -> None:
+        with self._lock:
+            if self._load().pop(game_url, None) is not None:
+                self._save()
+
+
+_default_index: Optional[CatalogIndex] = None
+
+
+def default_catalog_index() -> Optional[CatalogIndex]:
+    """Общий индекс из секции `catalog:` config.yaml (None, если индекс выключен)."""
+
+    global _default_index
+
+    cfg = load_app_config().catalog
+    if not cfg.enabled:
+        return None
+    path = PROJECT_ROOT / cfg.path
+    if _default_index is None or _default_index.path != path or _default_index.ttl_s != cfg.ttl_s:
+        _default_index = CatalogIndex(path, ttl_s=cfg.ttl_s)
+    return _default_index
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config
+
+
+class CheckpointStore:
+    """Дисковые контрольные точки сценариев: выполненные шаги, URL и storage_state.
+
+    Ключ описывает прогон (сценарий, игра, заказ); в имени файла хранится только
+    его хэш. Файлы содержат куки сессии и лежат в .cache (не под git).
+    """
+
+    def __init__(self, directory: Path, ttl_s: float) -> None:
+        self.directory = Path(directory)
+        self.ttl_s = ttl_s
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Последняя точка прогона или None, если её нет или истёк TTL."""
+
+        path = self._path(key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if payload.get("key") != key or time.time() - float(payload.get("saved_at", 0)) > self.ttl_s:
+            path.unlink(missing_ok=True)
+            return None
+        return payload
+
+    def save(self, key: str, completed: Sequence[str], url: str, storage_state: Dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "key": key,
+            "saved_at": time.time(),
+            "completed": list(completed),
+            "url": url,
+            "storage_state": storage_state,
+        }
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def clear(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+def default_checkpoint_store() -> Optional[CheckpointStore]:
+    """CheckpointStore по секции `checkpoints:` config.yaml (None, если точки выключены)."""
+
+    cfg = load_app_config().checkpoints
+    if not cfg.enabled:
+        return None
+    return CheckpointStore(PROJECT_ROOT / cfg.directory, ttl_s=cfg.ttl_s)
@@ -0,0 +1,210 @@
+"""Сигналы завершения стадий flow и ожидание первого из них.
+
+Стадия заранее объявляет, что для неё значит «готово» (закрылся попап, пришёл
+ответ с нужным URL/статусом, сменился URL, появился элемент), и ждёт того
+сигнала, который случится раньше. Это заменяет ожидание networkidle, которое
+тянется до тишины в сети и зависает на страницах с long-poll.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import Locator, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.infrastructure.browser.deadlines import current_deadline_ms
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.events import log_event
+
+
+UrlPattern = Union[str, Pattern[str]]
+
+
+def _url_matches(pattern: UrlPattern, url: str) -> bool:
+    if isinstance(pattern, str):
+        return pattern in url
+    return pattern.search(url) is not None
+
+
+@dataclass(frozen=True)
+class PopupClosed:
+    """Страница (обычно попап оплаты) закрылась."""
+
+    name: str = "popup_closed"
+
+
+@dataclass(frozen=True)
+class ResponseReceived:
+    """Пришёл ответ, URL которого содержит подстроку / совпал с regex; status=None — любой."""
+
+    url: UrlPattern
+    status: Optional[int] = None
+    name: str = "response"
+
+    def matches(self, response: Any) -> bool:
+        if self.status is not None and response.status != self.status:
+            return False
+        return _url_matches(self.url, response.url)
+
+
+@dataclass(frozen=True)
+class UrlChanged:
+    """Главный фрейм перешёл на URL, подходящий под шаблон."""
+
+    url: UrlPattern
+    name: str = "url_changed"
+
+
+@dataclass(frozen=True)
+class ElementVisible:
+    """Появился видимый элемент; build строит локатор от страницы, как LocatorStrategy."""
+
+    name: str
+    build: Callable[[Any], Any]
+
+
+CompletionSignal = Union[PopupClosed, ResponseReceived, UrlChanged, ElementVisible]
+
+
+@dataclass
+class CompletionResult:
+    """Какой сигнал завершил стадию; заполняется при выходе из wait_for_completion."""
+
+    stage: str
+    signal: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def report(self) -> None:
+        """Пишет в events.ndjson, какой сигнал завершил стадию и через сколько."""
+
+        log_event(
+            stage="completion",
+            status="ok",
+            message=f"{self.stage} completed by {self.signal}",
+            data={"stage": self.stage, "signal": self.signal, "elapsed_ms": round(self.elapsed_ms, 3)},
+        )
+
+
+class CompletionTimeoutError(RuntimeError):
+    """Ни один сигнал завершения стадии не сработал за срок (по имени типа TimeoutPolicy узнаёт таймауты)."""
+
+
+def completion_timeout_error(stage: str, signals: Sequence[CompletionSignal], timeout_ms: float) -> RuntimeError:
+    names = ", ".join(signal.name for signal in signals)
+    return CompletionTimeoutError(f"Стадия {stage}: ни один сигнал завершения ({names}) не сработал за {timeout_ms:.0f} мс")
+
+
+def event_listeners(
+    page: Any,
+    signals: Sequence[CompletionSignal],
+    fire: Callable[[str], None],
+) -> List[Tuple[str, Callable[[Any], None]]]:
+    """Обработчики событий страницы для PopupClosed/ResponseReceived/UrlChanged (sync и async API)."""
+
+    def on_close(_: Any) -> None:
+        for s in signals:
+            if isinstance(s, PopupClosed):
+                fire(s.name)
+
+    def on_response(response: Any) -> None:
+        for s in signals:
+            if isinstance(s, ResponseReceived) and s.matches(response):
+                fire(s.name)
+
+    def on_navigated(frame: Any) -> None:
+        if frame != page.main_frame:
+            return
+        for s in signals:
+            if isinstance(s, UrlChanged) and _url_matches(s.url, frame.url):
+                fire(s.name)
+
+    return [("close", on_close), ("response", on_response), ("framenavigated", on_navigated)]
+
+
+@contextmanager
+def wait_for_completion(
+    page: Page,
+    stage: str,
+    signals: Sequence[CompletionSignal],
+    timeout_ms: Optional[float] = None,
+) -> Iterator[CompletionResult]:
+    """Подписывается на сигналы до действия внутри with и ждёт первый из них на выходе.
+
+        with wait_for_completion(page, "checkout", [UrlChanged("/checkout")]) as done:
+            button.click()
+        done.signal  # "url_changed"
+
+    События страницы (close/response/framenavigated) ловятся обработчиками. Элементы
+    ждутся на стороне браузера одним wait_for по объединению локаторов, отрезками по
+    `playwright.completion_slice_ms`: между отрезками проверяются флаги событий,
+    поэтому событие замечается не позже, чем через один отрезок.
+    Без timeout_ms ждём срок активного deadline() или `playwright.page_timeout_ms`.
+    """
+
+    config = load_app_config().playwright
+    if timeout_ms is None:
+        timeout_ms = current_deadline_ms() or config.page_timeout_ms
+    result = CompletionResult(stage=stage)
+    fired: List[str] = []
+    listeners = event_listeners(page, signals, fired.append)
+    for event, listener in listeners:
+        page.on(event, listener)
+
+    started = time.perf_counter()
+    try:
+        yield result
+        result.signal = _wait_first(page, signals, fired, started, timeout_ms, config.completion_slice_ms)
+    finally:
+        for event, listener in listeners:
+            page.remove_listener(event, listener)
+
+    if result.signal is None:
+        raise completion_timeout_error(stage, signals, timeout_ms)
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    result.report()
+
+
+def _wait_first(
+    page: Page,
+    signals: Sequence[CompletionSignal],
+    fired: List[str],
+    started: float,
+    timeout_ms: float,
+    slice_ms: float,
+) -> Optional[str]:
+    elements = [s for s in signals if isinstance(s, ElementVisible)]
+    union: Optional[Locator] = None
+    for signal in elements:
+        # Только видимые совпадения: иначе .first мог бы застрять на скрытом элементе.
+        locator = signal.build(page).filter(visible=True)
+        union = locator if union is None else union.or_(locator)
+
+    while not fired:
+        remaining = timeout_ms - (time.perf_counter() - started) * 1000
+        if remaining <= 0:
+            return None
+        step = min(slice_ms, remaining)
+        try:
+            if union is None:
+                page.wait_for_timeout(step)
+                continue
+            union.first.wait_for(state="visible", timeout=step)
+        except PlaywrightTimeoutError:
+            continue
+        except PlaywrightError:
+            # Страница закрылась: это сигнал, только если стадия его объявила.
+            if fired:
+                break
+            closed = [s.name for s in signals if isinstance(s, PopupClosed)]
+            if closed and page.is_closed():
+                return closed[0]
+            raise
+        if fired:
+            break
+        for signal in elements:
+            if signal.build(page).filter(visible=True).count() > 0:
+                return signal.name
+    return fired[0]
@@ -0,0 +1,161 @@
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from playwright.sync_api import Browser, BrowserContext
+
+from src.infrastructure.config.app_config import load_app_config
+
+
+ContextConfigurer = Callable[[BrowserContext], None]
+
+
+@dataclass
+class _PooledContext:
+    context: BrowserContext
+    uses: int = 0
+
+
+@dataclass
+class PoolStats:
+    created: int = 0
+    reused: int = 0
+    recycled: int = 0
+
+
+class BrowserContextPool:
+    """Пул изолированных BrowserContext поверх одного долгоживущего Browser.
+
+    Рассчитан на один процесс (под pytest-xdist — по пулу на воркер): Browser
+    запускается один раз, а контексты создаются заранее с общими опциями (прокси,
+    видео и т.п. из context_args) и настройкой configure (таймауты, роутинг).
+
+    При возврате контекст сбрасывается: закрываются страницы, чистятся куки,
+    разрешения и маршруты, configure применяется заново. Контекст с данными
+    localStorage сбросить дёшево нельзя — такой контекст закрывается.
+    После max_uses выдач контекст тоже пересоздаётся, чтобы не копить состояние
+    браузерного процесса.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        context_args: Optional[Dict[str, Any]] = None,
+        configure: Optional[ContextConfigurer] = None,
+        max_uses: int = 20,
+        max_idle: int = 2,
+    ) -> None:
+        self.browser = browser
+        self.context_args = dict(context_args or {})
+        self.configure = configure
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self.stats = PoolStats()
+        self._idle: Deque[_PooledContext] = deque()
+        self._leased: Dict[int, _PooledContext] = {}
+
+    def _create(self) -> _PooledContext:
+        context = self.browser.new_context(**self.context_args)
+        if self.configure is not None:
+            self.configure(context)
+        self.stats.created += 1
+        return _PooledContext(context)
+
+    def warm(self, count: int) -> None:
+        """Создаёт контексты заранее, чтобы первые тесты не платили за их запуск."""
+
+        while len(self._idle) < min(count, self.max_idle):
+            self._idle.append(self._create())
+
+    def acquire(self) -> BrowserContext:
+        if self._idle:
+            pooled = self._idle.popleft()
+        else:
+            pooled = self._create()
+        if pooled.uses:
+            self.stats.reused += 1
+        pooled.uses += 1
+        self._leased[id(pooled.context)] = pooled
+        return pooled.context
+
+    def release(self, context: BrowserContext, reusable: bool = True) -> None:
+        """Возвращает контекст в пул; reusable=False — закрыть без переиспользования."""
+
+        pooled = self._leased.pop(id(context), None)
+        if pooled is None:
+            raise RuntimeError("Контекст не был выдан этим пулом")
+
+        if reusable and pooled.uses < self.max_uses and len(self._idle) < self.max_idle:
+            try:
+                reusable = self._reset(context)
+            except Exception:
+                # Контекст или браузер уже закрыт — просто выбрасываем его.
+                reusable = False
+            if reusable:
+                self._idle.append(pooled)
+                return
+
+        self.stats.recycled += 1
+        self._close(context)
+
+    @contextmanager
+    def lease(self) -> Iterator[BrowserContext]:
+        context = self.acquire()
+        reusable = False
+        try:
+            yield context
+            reusable = True
+        finally:
+            self.release(context, reusable=reusable)
+
+    def _reset(self, context: BrowserContext) -> bool:
+        for page in list(context.pages):
+            page.close()
+
+        state = context.storage_state()
+        if any(origin.get("localStorage") for origin in state.get("origins", [])):
+            return False
+
+        context.clear_cookies()
+        context.clear_permissions()
+        if hasattr(context, "unroute_all"):
+            context.unroute_all(behavior="ignoreErrors")
+        if self.configure is not None:
+            self.configure(context)
+        return True
+
+    @staticmethod
+    def _close(context: BrowserContext) -> None:
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        while self._idle:
+            self._close(self._idle.popleft().context)
+        for pooled in list(self._leased.values()):
+            self._close(pooled.context)
+        self._leased.clear()
+
+
+def default_context_pool(
+    browser: Browser,
+    context_args: Optional[Dict[str, Any]] = None,
+    configure: Optional[ContextConfigurer] = None,
+) -> Optional[BrowserContextPool]:
+    """Пул по секции `pool:` config.yaml (None, если пул выключен); сразу прогревается."""
+
+    cfg = load_app_config().pool
+    if not cfg.enabled:
+        return None
+    pool = BrowserContextPool(
+        browser,
+        context_args=context_args,
+        configure=configure,
+        max_uses=cfg.max_uses,
+        max_idle=cfg.max_idle,
+    )
+    pool.warm(cfg.warm_size)
+    return pool
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.tracing import current_span
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline_ms", default=None)
+_current_navigation_deadline: ContextVar[Optional[float]] = ContextVar("current_navigation_deadline_ms", default=None)
+
+
+def current_deadline_ms() -> Optional[float]:
+    """Срок самого внутреннего активного deadline() (None — действуют значения `playwright:`)."""
+
+    return _current_deadline.get()
+
+
+def current_navigation_deadline_ms() -> Optional[float]:
+    """Срок переходов: только от deadline() с navigation=True (выученные сроки методов его не задают)."""
+
+    return _current_navigation_deadline.get()
+
+
+def _narrowed(var: "ContextVar[Optional[float]]", timeout_ms: float) -> Any:
+    outer = var.get()
+    return var.set(timeout_ms if outer is None else min(timeout_ms, outer))
+
+
+@contextmanager
+def task_deadline(timeout_ms: Optional[float], navigation: bool = True) -> Iterator[None]:
+    """Срок для async-кода: запоминается только в ContextVar, контекст браузера не меняется.
+
+    Контекст общий для задач event loop-а, и set_default_timeout одной задачи
+    действовал бы на остальные. ContextVar у каждой задачи свой, поэтому async-клиенты
+    передают срок в каждый вызов Playwright (timeout=current_deadline_ms(), для goto —
+    current_navigation_deadline_ms()), а aio.completion.wait_for_completion читает его сам.
+    Вложенный срок не длиннее внешнего. С navigation=False переходы срок не ограничивает.
+    """
+
+    if timeout_ms is None:
+        yield
+        return
+
+    token = _narrowed(_current_deadline, timeout_ms)
+    navigation_token = _narrowed(_current_navigation_deadline, timeout_ms) if navigation else None
+    try:
+        yield
+    finally:
+        if navigation_token is not None:
+            _current_navigation_deadline.reset(navigation_token)
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def deadline(context: Any, timeout_ms: Optional[float], navigation: bool = True) -> Iterator[None]:
+    """Временно ставит контексту sync API общий и навигационный таймауты.
+
+    Навигационный таймаут задаётся отдельно, т.к. conftest выставляет его явно и он
+    важнее общего; navigation=False оставляет его как есть (срок одного метода не
+    должен урезать загрузку страницы). Вложенный срок не длиннее внешнего; по выходу
+    восстанавливается внешний срок или значения из секции `playwright:`.
+    Ожидания expect() этим не ограничиваются — им таймаут передаётся явно.
+    В async-коде вместо него — task_deadline().
+    """
+
+    if timeout_ms is None or context is None:
+        yield
+        return
+
+    outer = _current_deadline.get()
+    outer_navigation = _current_navigation_deadline.get()
+    with task_deadline(timeout_ms, navigation):
+        context.set_default_timeout(_current_deadline.get())
+        if navigation:
+            context.set_default_navigation_timeout(_current_navigation_deadline.get())
+        try:
+            yield
+        finally:
+            timeouts = load_app_config().playwright
+            context.set_default_timeout(outer if outer is not None else timeouts.page_timeout_ms)
+            if navigation:
+                context.set_default_navigation_timeout(
+                    outer_navigation if outer_navigation is not None else timeouts.navigation_timeout_ms
+                )
+
+
+def client_origin(client: Any) -> Optional[str]:
+    """Origin, к которому обращается клиент: его base_url, иначе адрес страницы (попап Google Pay)."""
+
+    url = getattr(client, "base_url", None) or getattr(client.page, "url", "")
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def learned_timeout_ms(stage: str, origin: Optional[str] = None) -> Optional[int]:
+    # Импорт по требованию: политика читает лог событий только при первом вызове метода клиента.
+    from src.infrastructure.perf.timeout_policy import default_timeout_policy
+
+    policy = default_timeout_policy()
+    timeout_ms = policy.timeout_ms(stage, origin) if policy is not None else None
+    span = current_span()
+    if span is not None and span.name == stage:
+        # origin — ключ истории: по нему политика отделяет stand-in от боевого магазина.
+        if origin is not None:
+            span.attrs["origin"] = origin
+        if timeout_ms is not None:
+            span.attrs["timeout_ms"] = timeout_ms
+    return timeout_ms
+
+
+def adaptive_deadline(name: Optional[str] = None) -> Callable[[F], F]:
+    """Декоратор метода клиента: срок из TimeoutPolicy по истории его span-ов для того же origin.
+
+    Ставится под @traced() (имя стейджа то же — имя метода), срок действует на
+    контекст self.page (кроме навигационного таймаута: переходы ждут по своим
+    срокам); применённый срок попадает в атрибуты span-а. У async-методов
+    срок — task_deadline(), а политика (первый вызов читает лог событий) загружается
+    в отдельном потоке.
+    """
+
+    def decorator(func: F) -> F:
+        stage = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+                timeout_ms = await asyncio.to_thread(learned_timeout_ms, stage, client_origin(self))
+                with task_deadline(timeout_ms, navigation=False):
+                    return await func(self, *args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            with deadline(self.page.context, learned_timeout_ms(stage, client_origin(self)), navigation=False):
+                return func(self, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,131 @@
+import json
+import re
+import threading
+import time
+import weakref
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import BrowserContext
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, ArtifactConfig, load_app_config
+
+
+class ArtifactStore:
+    """Сохраняет артефакты упавших тестов в artifacts/failures/<время>_<тест>.zip.
+
+    Упаковка (сжатие скриншота, перенос trace) и соблюдение квоты на каталог
+    выполняются в фоновом потоке, чтобы не задерживать следующий тест.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-store")
+        self._pending: List["Future[None]"] = []
+        self._lock = threading.Lock()
+
+    def save_failure(
+        self,
+        test_name: str,
+        screenshot: Optional[bytes] = None,
+        trace_path: Optional[Path] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Ставит артефакты в очередь на запись и сразу возвращает путь будущего архива."""
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", test_name)[:120]
+        bundle = self.directory / "failures" / f"{time.strftime('%Y%m%d-%H%M%S')}_{safe_name}.zip"
+        future = self._executor.submit(self._write, bundle, screenshot, trace_path, meta or {})
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return bundle
+
+    def _write(self, bundle: Path, screenshot: Optional[bytes], trace_path: Optional[Path], meta: Dict[str, Any]) -> None:
+        bundle.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = bundle.with_suffix(".tmp")
+        with zipfile.ZipFile(tmp_path, "w") as archive:
+            archive.writestr("meta.json", json.dumps(meta, ensure_ascii=False, indent=2), zipfile.ZIP_DEFLATED)
+            if screenshot is not None:
+                archive.writestr("screenshot.png", screenshot, zipfile.ZIP_DEFLATED, compresslevel=9)
+            if trace_path is not None and trace_path.exists():
+                # trace уже zip: повторно не сжимаем. Открывается `playwright show-trace trace.zip`.
+                archive.write(trace_path, "trace.zip", zipfile.ZIP_STORED)
+        tmp_path.replace(bundle)
+        if trace_path is not None:
+            trace_path.unlink(missing_ok=True)
+        self.enforce_quota()
+
+    def enforce_quota(self) -> None:
+        """Удаляет самые старые файлы каталога, пока суммарный размер больше max_bytes."""
+
+        files = []
+        for path in self.directory.rglob("*"):
+            if path.is_file() and path.suffix != ".tmp":
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result(timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+_traced_contexts: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+
+
+def start_test_trace(
+    context: BrowserContext,
+    title: str,
+    config: ArtifactConfig,
+    screenshots: Optional[bool] = None,
+) -> bool:
+    """Начинает trace-чанк теста; tracing на контексте запускается один раз (контексты из пула).
+
+    По умолчанию trace без screencast (только DOM-снапшоты): кадры снимались бы и
+    у зелёных тестов. screenshots=None — значение `artifacts.trace_screenshots`.
+    """
+
+    if config.mode == "off" or not config.trace:
+        return False
+    if screenshots is None:
+        screenshots = config.trace_screenshots
+    if context not in _traced_contexts:
+        context.tracing.start(screenshots=screenshots, snapshots=config.trace_snapshots)
+        _traced_contexts.add(context)
+    context.tracing.start_chunk(title=title)
+    return True
+
+
+def stop_test_trace(context: BrowserContext, path: Optional[Path] = None) -> Optional[Path]:
+    """Закрывает чанк: без path он отбрасывается и на диск ничего не пишется."""
+
+    if path is None:
+        context.tracing.stop_chunk()
+        return None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    context.tracing.stop_chunk(path=str(path))
+    return path
+
+
+def default_artifact_store() -> Optional[ArtifactStore]:
+    """ArtifactStore по секции `artifacts:` config.yaml (None, если артефакты выключены)."""
+
+    cfg = load_app_config().artifacts
+    if cfg.mode == "off":
+        return None
+    return ArtifactStore(PROJECT_ROOT / cfg.directory, max_bytes=cfg.max_bytes)
@@ -1,7 +1,15 @@
 import re
+from typing import Optional
 
 from playwright.sync_api import Page, FrameLocator, Locator, expect
 
+from src.infrastructure.browser import selectors
+from src.infrastructure.browser.completion import wait_for_completion
+from src.infrastructure.browser.deadlines import adaptive_deadline
+from src.infrastructure.browser.locator_resolver import LocatorResolver
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.tracing import traced
+
 
 class GooglePayClient:
     """Адаптер для взаимодействия с окном/фреймом Google Pay.
@@ -15,42 +23,37 @@ class GooglePayClient:
     общие и устойчивые паттерны по label/role/xpath, как в примерах Playwright.
     """
 
-    def __init__(self, popup_page: Page) -> None:
+    def __init__(self, popup_page: Page, resolver: Optional[LocatorResolver] = None) -> None:
         self.page = popup_page
+        self.resolver = resolver or LocatorResolver(popup_page)
 
     # -------------------- Вспомогательные методы --------------------
     def _email_input(self) -> Locator:
-        # Gmail / Google login обычно имеет label "Email or phone" и id="identifierId".
-        candidate = self.page.get_by_label(re.compile("Email|Phone", re.IGNORECASE))
-        if candidate.count() > 0:
-            return candidate.first
-
-        candidate = self.page.locator("input#identifierId")
-        if candidate.count() > 0:
-            return candidate.first
+        candidate = self.resolver.find(
+            "google.email_input",
+            selectors.GOOGLE_EMAIL_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
+        if candidate is not None:
+            return candidate
 
         raise RuntimeError("Не удалось найти поле email на экране входа Google")
 
     def _password_input(self) -> Locator:
-        candidate = self.page.get_by_label(re.compile("Password|Пароль", re.IGNORECASE))
-        if candidate.count() > 0:
-            return candidate.first
-
-        candidate = self.page.locator("input[type='password']")
-        if candidate.count() > 0:
-            return candidate.first
+        candidate = self.resolver.find(
+            "google.password_input",
+            selectors.GOOGLE_PASSWORD_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
+        if candidate is not None:
+            return candidate
 
         raise RuntimeError("Не удалось найти поле пароля Google")
 
     def _backup_code_input(self) -> Locator:
-        # Экран резервного кода может иметь текст "Enter code" или аналогичный.
-        candidate = self.page.get_by_role("textbox", name=re.compile("code|Код", re.IGNORECASE))
-        if candidate.count() > 0:
-            return candidate.first
-
-        candidate = self.page.locator("input[type='tel']")
-        if candidate.count() > 0:
-            return candidate.first
+        candidate = self.resolver.find("google.backup_code_input", selectors.GOOGLE_BACKUP_CODE_INPUT)
+        if candidate is not None:
+            return candidate
 
         raise RuntimeError("Не удалось найти поле ввода backup-кода Google 2FA")
 
@@ -61,6 +64,8 @@ class GooglePayClient:
         )
 
     # -------------------- Основной flow Google login + оплата --------------------
+    @traced()
+    @adaptive_deadline()
     def login_and_confirm_payment(self, email: str, password: str, backup_code: str) -> None:
         """Выполняет полный сценарий: логин в Google и подтверждение оплаты.
 
@@ -93,13 +98,16 @@ class GooglePayClient:
             "button",
             name=re.compile("Pay|Оплатить", re.IGNORECASE),
         )
-        pay_button.click()
-
-        # Ожидаем, что попап либо закроется, либо вернёт успешный статус.
-        # Минимальная проверка: страница не содержит явного текста об ошибке.
-        # В реальном проекте здесь можно добавить точные проверки по DOM.
-        self.page.wait_for_load_state("networkidle")
 
-        error_text = self.page.get_by_text(re.compile("error|ошибка|declined", re.IGNORECASE))
-        if error_text.count() > 0:
+        # Ждём первый сигнал завершения (попап закрылся, ответ на подтверждение,
+        # текст успеха или ошибки) вместо networkidle, который зависает на long-poll.
+        # Длинный срок `playwright.payment_confirm_timeout_ms` — только у этого ожидания:
+        # поля логина и кнопки ищутся с обычными таймаутами.
+        confirm_timeout_ms = load_app_config().playwright.payment_confirm_timeout_ms
+        with wait_for_completion(
+            self.page, "google_pay.confirm", selectors.GOOGLE_PAY_DONE, timeout_ms=confirm_timeout_ms
+        ) as done:
+            pay_button.click()
+
+        if done.signal == "payment_error":
             raise RuntimeError("Google Pay сообщает об ошибке при оплате")
@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import List, Tuple
+
+from playwright.sync_api import BrowserContext, Route
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, HarConfig, load_app_config
+from src.infrastructure.logging.events import log_event
+
+
+# Запросы, не попавшие ни в один стейдж (ресурсы, API), пишутся в отдельный HAR.
+COMMON_STAGE = "common"
+
+
+def har_routes(config: HarConfig, game_slug: str) -> List[Tuple[str, str]]:
+    """(стейдж, glob URL) в порядке регистрации: common первым, т.к. у Playwright
+    приоритет у маршрута, зарегистрированного последним."""
+
+    stages = [(name, glob.format(game_slug=game_slug)) for name, glob in config.stages.items()]
+    return [(COMMON_STAGE, "**/*"), *stages]
+
+
+def _log_miss(route: Route) -> None:
+    request = route.request
+    log_event(
+        stage="har",
+        status="info",
+        message="Request not found in HAR, passing through",
+        data={"method": request.method, "url": request.url},
+    )
+    route.fallback()
+
+
+def install_har_routing(context: BrowserContext, config: HarConfig, game_slug: str, directory: Path) -> None:
+    """Подключает HAR-файлы стейджей к контексту.
+
+    - record: запросы идут в сеть и записываются в <directory>/<стейдж>.har при
+      закрытии контекста (route_from_har с update=True);
+    - replay: ответы берутся из HAR; промах по on_miss — abort (fail), дальше по
+      цепочке маршрутов в сеть (passthrough) или в сеть с записью в events.ndjson (log).
+    """
+
+    if config.mode == "off":
+        return
+
+    record = config.mode == "record"
+    not_found = "abort" if config.on_miss == "fail" else "fallback"
+
+    if not record and config.on_miss == "log":
+        # Зарегистрирован раньше HAR-маршрутов, поэтому до него доходят только промахи.
+        context.route("**/*", _log_miss)
+
+    for stage, url in har_routes(config, game_slug):
+        path = directory / f"{stage}.har"
+        if record:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        elif not path.exists():
+            if config.on_miss == "fail":
+                raise RuntimeError(f"Нет HAR для стейджа {stage}: {path}; сначала запишите его (har.mode: record)")
+            continue
+        context.route_from_har(path, url=url, not_found=not_found, update=record)
+
+
+def default_har_routing(context: BrowserContext) -> None:
+    """install_har_routing по секциям `har:` и `supercell:` config.yaml."""
+
+    config = load_app_config()
+    install_har_routing(context, config.har, config.supercell.game_slug, PROJECT_ROOT / config.har.directory)
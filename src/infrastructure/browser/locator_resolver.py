@@ -0,0 +1,192 @@
+import json
+import re
+import threading
+from dataclasses import dataclass
+from functools import reduce
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Locator, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config
+
+
+@dataclass(frozen=True)
+class LocatorStrategy:
+    """Одна стратегия поиска элемента.
+
+    build получает корень поиска (Page или Locator) и возвращает локатор. Построение
+    локатора не делает запросов к браузеру, поэтому одни и те же стратегии подходят
+    и для sync, и для async API Playwright.
+    """
+
+    name: str
+    build: Callable[[Any], Any]
+
+
+_NUMERIC_SEGMENT = re.compile(r"^\d+$|^[0-9a-f]{8,}$|^[0-9a-f-]{32,}$", re.IGNORECASE)
+
+
+def url_pattern(url: str) -> str:
+    """Нормализует URL страницы в шаблон для кэша: host + путь без query и id-сегментов."""
+
+    parts = urlsplit(url)
+    segments = ["*" if _NUMERIC_SEGMENT.match(s) else s for s in parts.path.split("/") if s]
+    return f"{parts.netloc}/{'/'.join(segments)}"
+
+
+class LearnedLocatorCache:
+    """Дисковый кэш выигравших стратегий: ключ `<url-шаблон>::<цель>` -> имя стратегии."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self._load(), ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, strategy_name: str) -> None:
+        with self._lock:
+            data = self._load()
+            if data.get(key) == strategy_name:
+                return
+            data[key] = strategy_name
+            self._save()
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
+
+
+_default_cache: Optional[LearnedLocatorCache] = None
+
+
+def default_locator_cache() -> Optional[LearnedLocatorCache]:
+    """Общий кэш стратегий из секции `locators:` config.yaml (None, если кэш выключен)."""
+
+    global _default_cache
+
+    cfg = load_app_config().locators
+    if not cfg.cache_enabled:
+        return None
+    path = PROJECT_ROOT / cfg.cache_path
+    if _default_cache is None or _default_cache.path != path:
+        _default_cache = LearnedLocatorCache(path)
+    return _default_cache
+
+
+# Индекс элемента в порядке документа; проба ниже помечает выигравшую стратегию i
+# i-м элементом документа, поэтому индекс метки и есть номер стратегии.
+FIRST_MATCH_JS = "els => els.length ? Array.prototype.indexOf.call(document.getElementsByTagName('*'), els[0]) : -1"
+
+
+def union(locators: Sequence[Any]) -> Any:
+    return reduce(lambda acc, item: acc.or_(item), locators)
+
+
+def first_match_probe(page: Any, locators: Sequence[Any]) -> Any:
+    """Локатор-проба: первая по приоритету стратегия с найденным элементом за один запрос.
+
+    Ветка i — корень документа, у которого нет элементов стратегий 0..i-1, но есть
+    элемент стратегии i (filter has_not/has), и из неё берётся i-й элемент документа.
+    Пройти может только одна ветка, и FIRST_MATCH_JS по её метке возвращает i
+    (или -1, если не нашла ни одна стратегия). Когда что-то найдено, в документе
+    есть html, head, body и сам элемент, так что меток хватает на цепочки до 4 стратегий.
+    """
+
+    gate = page.locator(":root")
+    probes = []
+    for index, locator in enumerate(locators):
+        probes.append(gate.filter(has=locator).locator(f"xpath=(//*)[{index + 1}]"))
+        gate = gate.filter(has_not=locator)
+    return union(probes)
+
+
+def prioritized(strategies: Sequence[LocatorStrategy], learned: Optional[LocatorStrategy]) -> Sequence[LocatorStrategy]:
+    """Порядок проверки: выученная стратегия первой, остальные — в порядке приоритета."""
+
+    if learned is None:
+        return list(strategies)
+    return [learned, *(s for s in strategies if s is not learned)]
+
+
+class LocatorResolver:
+    """Поиск элемента по цепочке стратегий с минимальным числом обращений к браузеру.
+
+    Вместо последовательных `.count()` по каждой стратегии первая по приоритету
+    сработавшая стратегия определяется одним запросом (first_match_probe). Выигравшая
+    стратегия запоминается в LearnedLocatorCache для шаблона URL страницы и при
+    следующих запусках проверяется первой; если она перестала находить элемент,
+    кэш переписывается новой выигравшей.
+    """
+
+    def __init__(self, page: Page, cache: Optional[LearnedLocatorCache] = None) -> None:
+        self.page = page
+        self.cache = cache if cache is not None else default_locator_cache()
+        # Число обращений к браузеру, сделанных резолвером (для бенчмарков/отладки).
+        self.round_trips = 0
+
+    def find(
+        self,
+        target: str,
+        strategies: Sequence[LocatorStrategy],
+        root: Optional[Any] = None,
+        timeout_ms: Optional[float] = None,
+    ) -> Optional[Locator]:
+        """Возвращает `.first` локатора первой сработавшей стратегии или None.
+
+        Без timeout_ms проверка мгновенная и стоит один запрос к браузеру. С timeout_ms
+        сначала одним запросом ждём появления элемента по любой из стратегий — это
+        нужно сразу после навигации, когда форма ещё не отрисована.
+        """
+
+        root = root if root is not None else self.page
+        if not strategies:
+            return None
+        if timeout_ms is not None and not self._wait_any(strategies, root, timeout_ms):
+            return None
+
+        key = f"{url_pattern(self.page.url)}::{target}"
+        learned_name = self.cache.get(key) if self.cache is not None else None
+        by_name = {s.name: s for s in strategies}
+        order = prioritized(strategies, by_name.get(learned_name) if learned_name else None)
+        locators = [s.build(root) for s in order]
+
+        self.round_trips += 1
+        index = first_match_probe(self.page, locators).evaluate_all(FIRST_MATCH_JS)
+        if index < 0:
+            return None
+        if order[index].name != learned_name:
+            self._remember(key, order[index])
+        return locators[index].first
+
+    def _wait_any(self, strategies: Sequence[LocatorStrategy], root: Any, timeout_ms: float) -> bool:
+        self.round_trips += 1
+        try:
+            union([s.build(root) for s in strategies]).first.wait_for(state="attached", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            return False
+        return True
+
+    def _remember(self, key: str, strategy: LocatorStrategy) -> None:
+        if self.cache is not None:
+            self.cache.put(key, strategy.name)
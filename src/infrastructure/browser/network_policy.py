@@ -0,0 +1,110 @@
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Route
+
+from src.infrastructure.config.app_config import NetworkPolicyConfig, NetworkRule, load_app_config
+
+
+@dataclass
+class NetworkPolicyStats:
+    """Счётчики заблокированных запросов контекста за один прогон."""
+
+    allowed: int = 0
+    blocked: int = 0
+    estimated_bytes_saved: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+    blocked_by_domain: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_by_domain": dict(self.blocked_by_domain.most_common(10)),
+        }
+
+    def reset(self) -> None:
+        self.allowed = self.blocked = self.estimated_bytes_saved = 0
+        self.blocked_by_type.clear()
+        self.blocked_by_domain.clear()
+
+
+def _domain_matches(host: str, domain: str) -> bool:
+    return host == domain or host.endswith("." + domain)
+
+
+class NetworkPolicy:
+    """Правила allow/block из секции `network:` config.yaml."""
+
+    def __init__(self, config: NetworkPolicyConfig) -> None:
+        self.config = config
+
+    def match(self, url: str, resource_type: str) -> Optional[NetworkRule]:
+        """Первое правило, под которое попадает запрос (None — правил нет, запрос разрешён)."""
+
+        host = (urlsplit(url).hostname or "").lower()
+        for rule in self.config.rules:
+            if rule.domains and not any(_domain_matches(host, d) for d in rule.domains):
+                continue
+            if rule.resource_types and resource_type not in rule.resource_types:
+                continue
+            return rule
+        return None
+
+    def is_blocked(self, url: str, resource_type: str) -> bool:
+        rule = self.match(url, resource_type)
+        return rule is not None and rule.action == "block"
+
+    def estimated_size(self, resource_type: str) -> int:
+        return self.config.estimated_bytes.get(resource_type, self.config.default_estimated_bytes)
+
+
+_stats: "weakref.WeakKeyDictionary[BrowserContext, NetworkPolicyStats]" = weakref.WeakKeyDictionary()
+
+
+def install_network_policy(context: BrowserContext, policy: NetworkPolicy) -> NetworkPolicyStats:
+    """Вешает политику на все запросы контекста через context.route.
+
+    Разрешённые запросы передаются дальше через route.fallback(), чтобы другие
+    обработчики (например, HAR-replay) продолжали работать. Учтите: пока на
+    контексте есть роутинг, Playwright отключает HTTP-кэш браузера.
+    """
+
+    stats = _stats.get(context)
+    if stats is None:
+        stats = _stats[context] = NetworkPolicyStats()
+
+    def handle(route: Route) -> None:
+        request = route.request
+        if policy.is_blocked(request.url, request.resource_type):
+            stats.blocked += 1
+            stats.estimated_bytes_saved += policy.estimated_size(request.resource_type)
+            stats.blocked_by_type[request.resource_type] += 1
+            stats.blocked_by_domain[urlsplit(request.url).hostname or ""] += 1
+            route.abort("blockedbyclient")
+            return
+        stats.allowed += 1
+        route.fallback()
+
+    context.route("**/*", handle)
+    return stats
+
+
+def network_stats(context: BrowserContext) -> Optional[NetworkPolicyStats]:
+    """Счётчики политики для контекста (None, если политика на нём не установлена)."""
+
+    return _stats.get(context)
+
+
+def default_network_policy() -> Optional[NetworkPolicy]:
+    """NetworkPolicy по секции `network:` config.yaml (None, если она выключена)."""
+
+    cfg = load_app_config().network
+    if not cfg.enabled or not cfg.rules:
+        return None
+    return NetworkPolicy(cfg)
@@ -0,0 +1,133 @@
+"""Цепочки стратегий поиска элементов Supercell Store и Google Pay.
+
+Стратегии перечислены в порядке приоритета и используются LocatorResolver.
+Имена стратегий попадают в дисковый кэш, поэтому их стоит менять только вместе
+со смыслом самой стратегии.
+
+Здесь же объявлены сигналы завершения стадий (*_DONE) для wait_for_completion.
+"""
+
+import re
+
+from src.infrastructure.browser.completion import ElementVisible, PopupClosed, ResponseReceived, UrlChanged
+from src.infrastructure.browser.locator_resolver import LocatorStrategy
+
+
+# -------------------- Supercell Store: логин --------------------
+STORE_EMAIL_INPUT = (
+    LocatorStrategy(
+        "role:textbox[email]",
+        lambda root: root.get_by_role("textbox", name=re.compile("email", re.IGNORECASE)),
+    ),
+    LocatorStrategy("css:input[type=email]", lambda root: root.locator("input[type='email']")),
+)
+
+STORE_OTP_INPUT = (
+    LocatorStrategy(
+        "role:textbox[code]",
+        lambda root: root.get_by_role("textbox", name=re.compile("code|код", re.IGNORECASE)),
+    ),
+    # Fallback: поле ввода кода часто имеет тип tel или специальный autocomplete.
+    LocatorStrategy(
+        "css:input[tel|one-time-code]",
+        lambda root: root.locator("input[type='tel'], input[autocomplete*='one-time-code']"),
+    ),
+)
+
+# -------------------- Supercell Store: товар --------------------
+PRODUCT_80_GEMS_NAME = re.compile(r"80.*gem|80\s+гем", re.IGNORECASE)
+
+STORE_PRODUCT_80_GEMS = (
+    LocatorStrategy("role:link[80 gems]", lambda root: root.get_by_role("link", name=PRODUCT_80_GEMS_NAME)),
+    # Fallback: ищем по тексту без роли.
+    LocatorStrategy("text:80 gems", lambda root: root.get_by_text(PRODUCT_80_GEMS_NAME)),
+)
+
+# Поиск карточки на странице игры, если SKU не нашёлся в индексе каталога (ключ — sku_key).
+STORE_PRODUCT_FALLBACKS = {
+    "80_gems": STORE_PRODUCT_80_GEMS,
+}
+
+# -------------------- Supercell Store: checkout --------------------
+CHECKOUT_HEADING_NAME = re.compile("Checkout|Review your order|Оформление заказа", re.IGNORECASE)
+
+CHECKOUT_DONE = (
+    UrlChanged(re.compile(r"/checkout", re.IGNORECASE)),
+    ElementVisible("checkout_heading", lambda root: root.get_by_role("heading", name=CHECKOUT_HEADING_NAME)),
+)
+
+# -------------------- Supercell Store: аккаунт --------------------
+STORE_REMOVE_PAYMENT_BUTTON = (
+    LocatorStrategy(
+        "role:button[remove]",
+        lambda root: root.get_by_role(
+            "button",
+            name=re.compile("Remove|Удалить|Detach|Удалить карту", re.IGNORECASE),
+        ),
+    ),
+    # Fallback: любая кнопка с опасным действием внутри секции.
+    LocatorStrategy("role:button", lambda root: root.get_by_role("button")),
+)
+
+STORE_LOGOUT = (
+    LocatorStrategy(
+        "role:link[log out]",
+        lambda root: root.get_by_role(
+            "link",
+            name=re.compile("Log out|Выйти из аккаунта Supercell|Log Out", re.IGNORECASE),
+        ),
+    ),
+    # Fallback: кнопка вместо ссылки.
+    LocatorStrategy(
+        "role:button[log out]",
+        lambda root: root.get_by_role("button", name=re.compile("Log out|Выйти", re.IGNORECASE)),
+    ),
+)
+
+STORE_LOGIN_LINK_NAME = re.compile("Log in|Войти", re.IGNORECASE)
+# Признак активной сессии в шапке магазина (вместо ссылки входа).
+STORE_ACCOUNT_LINK_NAME = re.compile("Account|My account|Аккаунт|Profile|Профиль", re.IGNORECASE)
+
+# Логаут завершён, когда снова видна ссылка входа; редирект на страницу игры
+# объявляется в самом клиенте, т.к. зависит от slug.
+LOGOUT_DONE = (
+    ElementVisible("login_link", lambda root: root.get_by_role("link", name=STORE_LOGIN_LINK_NAME)),
+)
+
+# -------------------- Google login / Google Pay --------------------
+GOOGLE_EMAIL_INPUT = (
+    # Gmail / Google login обычно имеет label "Email or phone" и id="identifierId".
+    LocatorStrategy("label:email|phone", lambda root: root.get_by_label(re.compile("Email|Phone", re.IGNORECASE))),
+    LocatorStrategy("css:#identifierId", lambda root: root.locator("input#identifierId")),
+)
+
+GOOGLE_PASSWORD_INPUT = (
+    LocatorStrategy(
+        "label:password",
+        lambda root: root.get_by_label(re.compile("Password|Пароль", re.IGNORECASE)),
+    ),
+    LocatorStrategy("css:input[type=password]", lambda root: root.locator("input[type='password']")),
+)
+
+GOOGLE_BACKUP_CODE_INPUT = (
+    # Экран резервного кода может иметь текст "Enter code" или аналогичный.
+    LocatorStrategy(
+        "role:textbox[code]",
+        lambda root: root.get_by_role("textbox", name=re.compile("code|Код", re.IGNORECASE)),
+    ),
+    LocatorStrategy("css:input[type=tel]", lambda root: root.locator("input[type='tel']")),
+)
+
+GOOGLE_PAY_ERROR_TEXT = re.compile("error|ошибка|declined", re.IGNORECASE)
+
+# Оплата завершена, когда закрылся попап, пришёл успешный ответ на подтверждение
+# или появился текст успеха; payment_error — тоже завершение, но с ошибкой.
+GOOGLE_PAY_DONE = (
+    PopupClosed(),
+    ResponseReceived(re.compile(r"/(gpay|payments?)/.*confirm", re.IGNORECASE), status=200, name="confirm_response"),
+    ElementVisible(
+        "payment_complete",
+        lambda root: root.get_by_text(re.compile("Payment complete|Payment successful|Оплата прошла", re.IGNORECASE)),
+    ),
+    ElementVisible("payment_error", lambda root: root.get_by_text(GOOGLE_PAY_ERROR_TEXT)),
+)
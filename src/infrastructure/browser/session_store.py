@@ -0,0 +1,93 @@
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config
+
+
+class SessionStore:
+    """Дисковый кэш авторизованных сессий Supercell (Playwright storage_state).
+
+    Ключ — origin магазина (supercell.base_url) + аккаунт + slug игры: сессия stand-in
+    не подставляется в прогон против боевого магазина и наоборот. В имени файла
+    хранится только хэш origin и email, сами файлы содержат куки сессии и лежат в
+    .cache (не под git).
+    """
+
+    def __init__(self, directory: Path, ttl_s: float) -> None:
+        self.directory = Path(directory)
+        self.ttl_s = ttl_s
+
+    def _path(self, base_url: str, account: str, game_slug: str) -> Path:
+        parts = urlsplit(base_url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        key = f"{origin}|{account.strip().lower()}"
+        account_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        slug = re.sub(r"[^a-z0-9_-]+", "_", game_slug.lower())
+        return self.directory / f"{account_hash}_{slug}.json"
+
+    def load(self, base_url: str, account: str, game_slug: str) -> Optional[Dict[str, Any]]:
+        """Возвращает сохранённый storage_state или None, если его нет или истёк TTL."""
+
+        path = self._path(base_url, account, game_slug)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if time.time() - float(payload.get("saved_at", 0)) > self.ttl_s:
+            path.unlink(missing_ok=True)
+            return None
+        return payload.get("storage_state")
+
+    def save(self, context: BrowserContext, base_url: str, account: str, game_slug: str) -> None:
+        """Сохраняет текущий storage_state контекста после успешного логина."""
+
+        self.save_state(base_url, account, game_slug, context.storage_state())
+
+    def save_state(self, base_url: str, account: str, game_slug: str, state: Dict[str, Any]) -> None:
+        """Сохраняет уже полученный storage_state (используется и async-flow-ами)."""
+
+        path = self._path(base_url, account, game_slug)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "base_url": base_url,
+            "game_slug": game_slug,
+            "saved_at": time.time(),
+            "storage_state": state,
+        }
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def restore(self, context: BrowserContext, base_url: str, account: str, game_slug: str) -> bool:
+        """Применяет сохранённую сессию к контексту. Возвращает False, если применять нечего."""
+
+        state = self.load(base_url, account, game_slug)
+        if state is None:
+            return False
+
+        if hasattr(context, "set_storage_state"):
+            context.set_storage_state(state)
+        else:
+            # Старые версии Playwright: переносим только куки, их достаточно для авторизации.
+            context.add_cookies(state.get("cookies", []))
+        return True
+
+    def invalidate(self, base_url: str, account: str, game_slug: str) -> None:
+        self._path(base_url, account, game_slug).unlink(missing_ok=True)
+
+
+def default_session_store() -> Optional[SessionStore]:
+    """SessionStore по секции `sessions:` config.yaml (None, если переиспользование выключено)."""
+
+    cfg = load_app_config().sessions
+    if not cfg.enabled:
+        return None
+    return SessionStore(PROJECT_ROOT / cfg.directory, ttl_s=cfg.ttl_s)
@@ -1,7 +1,27 @@
 import re
-from typing import Optional
+from typing import Dict, Optional
 
+from playwright.sync_api import Error as PlaywrightError
 from playwright.sync_api import Page, Locator, expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.infrastructure.browser import selectors
+from src.infrastructure.browser.catalog_index import (
+    PRODUCT_LINKS_JS,
+    PRODUCT_LINKS_SELECTOR,
+    CatalogIndex,
+    build_catalog,
+    default_catalog_index,
+    match_sku,
+    sku_key,
+)
+from src.infrastructure.browser.completion import UrlChanged, wait_for_completion
+from src.infrastructure.browser.deadlines import adaptive_deadline
+from src.infrastructure.browser.locator_resolver import LocatorResolver
+from src.infrastructure.browser.teardown import CLEAR_STORAGE_JS, is_logged_out_status
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import traced
 
 
 class SupercellStoreClient:
@@ -13,10 +33,19 @@ class SupercellStoreClient:
     паттерны по ролям/текстам, насколько это возможно.
     """
 
-    def __init__(self, page: Page, base_url: str, game_slug: str) -> None:
+    def __init__(
+        self,
+        page: Page,
+        base_url: str,
+        game_slug: str,
+        resolver: Optional[LocatorResolver] = None,
+        catalog: Optional[CatalogIndex] = None,
+    ) -> None:
         self.page = page
         self.base_url = base_url.rstrip("/")
         self.game_slug = game_slug.strip("/")
+        self.resolver = resolver or LocatorResolver(page)
+        self.catalog = catalog if catalog is not None else default_catalog_index()
 
     # -------------------- Общие URL --------------------
     @property
@@ -24,6 +53,8 @@ class SupercellStoreClient:
         return f"{self.base_url}/{self.game_slug}"
 
     # -------------------- Открытие магазина --------------------
+    @traced()
+    @adaptive_deadline()
     def open_store(self) -> None:
         """Открывает страницу игры в Supercell Store и ждёт загрузки."""
 
@@ -35,11 +66,31 @@ class SupercellStoreClient:
     def _login_button(self) -> Locator:
         """Возвращает локатор кнопки/ссылки входа."""
 
-        return self.page.get_by_role(
-            "link",
-            name=re.compile("Log in|Войти", re.IGNORECASE),
-        )
+        return self.page.get_by_role("link", name=selectors.STORE_LOGIN_LINK_NAME)
+
+    def _account_link(self) -> Locator:
+        return self.page.get_by_role("link", name=selectors.STORE_ACCOUNT_LINK_NAME)
+
+    @traced()
+    @adaptive_deadline()
+    def is_logged_in(self, timeout_ms: float = 3_000) -> bool:
+        """Дешёвая проверка сессии: открывает страницу игры и ждёт первый из маркеров.
 
+        Ссылка аккаунта — сессия активна, ссылка "Log in" — нет; решение принимается,
+        как только появился любой из них. Если за timeout_ms не появился ни один
+        (пустая страница, ошибка, долгая загрузка), сессия активной не считается.
+        """
+
+        self.open_store()
+        account = self._account_link().first
+        try:
+            self._login_button().first.or_(account).first.wait_for(state="visible", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            return False
+        return account.is_visible()
+
+    @traced()
+    @adaptive_deadline()
     def start_login(self, email: str) -> None:
         """Запускает процесс логина по email: открывает стор и запрашивает ОТП."""
 
@@ -47,17 +98,12 @@ class SupercellStoreClient:
         # Кликаем по кнопке входа Supercell ID.
         self._login_button().click()
 
-        # Ждём появления поля ввода email (label или placeholder).
-        email_input: Optional[Locator] = None
-
-        candidate = self.page.get_by_role("textbox", name=re.compile("email", re.IGNORECASE))
-        if candidate.count() > 0:
-            email_input = candidate
-        else:
-            candidate = self.page.locator("input[type='email']")
-            if candidate.count() > 0:
-                email_input = candidate
-
+        # Ищем поле ввода email (по роли или по типу input) за один запрос к браузеру.
+        email_input = self.resolver.find(
+            "store.email_input",
+            selectors.STORE_EMAIL_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
         if email_input is None:
             raise RuntimeError("Не удалось найти поле ввода email на странице логина Supercell Store")
 
@@ -70,24 +116,20 @@ class SupercellStoreClient:
         )
         next_button.click()
 
+    @traced()
+    @adaptive_deadline()
     def complete_login_with_otp(self, otp_code: str) -> None:
         """Вводит ОТП-код из письма и завершает логин.
 
         Предполагается, что на экране уже открыта форма ввода кода после start_login.
         """
 
-        # Пытаемся найти поле кода по label/названию.
-        otp_input: Optional[Locator] = None
-
-        candidate = self.page.get_by_role("textbox", name=re.compile("code|код", re.IGNORECASE))
-        if candidate.count() > 0:
-            otp_input = candidate
-        else:
-            # Fallback: поле ввода кода часто имеет тип tel или специальный autocomplete.
-            candidate = self.page.locator("input[type='tel'], input[autocomplete*='one-time-code']")
-            if candidate.count() > 0:
-                otp_input = candidate
-
+        # Ищем поле кода по label/названию, с fallback на tel/one-time-code.
+        otp_input = self.resolver.find(
+            "store.otp_input",
+            selectors.STORE_OTP_INPUT,
+            timeout_ms=load_app_config().locators.wait_timeout_ms,
+        )
         if otp_input is None:
             raise RuntimeError("Не удалось найти поле ввода одноразового кода на странице логина Supercell Store")
 
@@ -104,43 +146,86 @@ class SupercellStoreClient:
         expect(self.page).to_have_url(re.compile(self.game_slug, re.IGNORECASE))
 
     # -------------------- Этап 3: выбор товара и корзина --------------------
-    def go_to_product_80_gems(self, product_url: Optional[str] = None) -> None:
-        """Переходит к странице товара "80 гемов".
+    def _crawl_catalog(self) -> Dict[str, str]:
+        """Открывает страницу игры, одним запросом собирает ссылки товаров и обновляет индекс."""
+
+        self.open_store()
+        links = self.page.eval_on_selector_all(PRODUCT_LINKS_SELECTOR, PRODUCT_LINKS_JS)
+        products = build_catalog(links, self.game_url)
+        if self.catalog is not None:
+            self.catalog.put(self.game_url, products)
+        log_event(
+            stage="catalog",
+            status="ok",
+            message="Store catalog indexed",
+            data={"game_slug": self.game_slug, "products": len(products)},
+        )
+        return products
+
+    def _open_product_url(self, url: str) -> bool:
+        try:
+            response = self.page.goto(url)
+        except PlaywrightError:
+            return False
+        return response is None or response.ok
+
+    @traced()
+    @adaptive_deadline()
+    def go_to_product(self, sku_name: str, product_url: Optional[str] = None) -> None:
+        """Переходит к странице товара sku_name (из Order / секции `order:`).
 
         - Если указан product_url (из config.yaml), используем его.
-        - Иначе ищем карточку товара по названию/тексту на странице игры.
+        - Иначе берём URL из индекса каталога; если переход по нему не удался,
+          индекс игры сбрасывается.
+        - При промахе страница игры обходится один раз и индекс сохраняется на диск;
+          для SKU из selectors.STORE_PRODUCT_FALLBACKS остаётся поиск карточки по тексту.
         """
 
         if product_url:
             self.page.goto(product_url)
             return
 
-        # Если явного URL нет — убеждаемся, что мы на странице игры.
-        self.open_store()
+        url = self.catalog.lookup(self.game_url, sku_name) if self.catalog is not None else None
+        if url is not None:
+            if self._open_product_url(url):
+                return
+            self.catalog.invalidate(self.game_url)
+            log_event(
+                stage="catalog",
+                status="info",
+                message="Indexed product URL failed, re-indexing",
+                data={"game_slug": self.game_slug, "sku": sku_name, "url": url},
+            )
+
+        url = match_sku(self._crawl_catalog(), sku_name)
+        if url is not None:
+            self.page.goto(url)
+            return
 
-        # Пытаемся найти ссылку/кнопку товара по тексту, содержащему "80" и "gems".
-        name_pattern = re.compile(r"80.*gem|80\s+гем", re.IGNORECASE)
+        # Мы уже на странице игры: ищем карточку товара по названию/тексту.
+        fallback = selectors.STORE_PRODUCT_FALLBACKS.get(sku_key(sku_name))
+        product_link = self.resolver.find(f"store.product_{sku_key(sku_name)}", fallback) if fallback else None
+        if product_link is None:
+            raise RuntimeError(f"Не удалось найти товар {sku_name!r} на странице магазина Supercell")
 
-        product_link = self.page.get_by_role("link", name=name_pattern)
-        if product_link.count() == 0:
-            # Fallback: ищем по тексту без роли.
-            product_link = self.page.get_by_text(name_pattern)
+        product_link.click()
 
-        if product_link.count() == 0:
-            raise RuntimeError("Не удалось найти товар '80 гемов' на странице магазина Supercell")
+    def go_to_product_80_gems(self, product_url: Optional[str] = None) -> None:
+        """Переходит к странице товара "80 гемов" (см. go_to_product)."""
 
-        product_link.first.click()
+        self.go_to_product("80_gems", product_url=product_url)
 
-    def _ensure_quantity_one(self) -> None:
-        """Пытается гарантировать, что количество товара в корзине = 1.
+    def _ensure_quantity(self, quantity: int = 1) -> None:
+        """Пытается гарантировать нужное количество товара в корзине.
 
         Реализация максимально универсальна: сначала ищем input[type=number] и
-        ставим '1'; если его нет — несколько раз нажимаем на кнопку уменьшения.
+        ставим количество; если его нет — несколько раз нажимаем на кнопку
+        уменьшения, а затем quantity - 1 раз на кнопку увеличения.
         """
 
         qty_input = self.page.locator("input[type='number']")
         if qty_input.count() > 0:
-            qty_input.first.fill("1")
+            qty_input.first.fill(str(quantity))
             return
 
         minus_button = self.page.get_by_role(
@@ -153,8 +238,15 @@ class SupercellStoreClient:
                 break
             minus_button.first.click()
 
-    def add_to_cart_single_quantity(self) -> None:
-        """Нажимает Buy и приводит количество к 1.
+        if quantity > 1:
+            plus_button = self.page.get_by_role("button", name=re.compile(r"\+|plus|Increase", re.IGNORECASE))
+            for _ in range(quantity - 1):
+                plus_button.first.click()
+
+    @traced()
+    @adaptive_deadline()
+    def add_to_cart(self, quantity: int = 1) -> None:
+        """Нажимает Buy и приводит количество к quantity.
 
         Ожидается, что мы уже на странице товара.
         """
@@ -165,31 +257,38 @@ class SupercellStoreClient:
         )
         buy_button.click()
 
-        self._ensure_quantity_one()
+        self._ensure_quantity(quantity)
+
+    def add_to_cart_single_quantity(self) -> None:
+        """Нажимает Buy и приводит количество к 1."""
+
+        self.add_to_cart(1)
 
+    @traced()
+    @adaptive_deadline()
     def proceed_to_checkout(self) -> None:
-        """Переходит к странице Checkout и ждёт её загрузки."""
+        """Переходит к странице Checkout и ждёт первый сигнал её готовности (URL или заголовок)."""
 
-        with self.page.expect_navigation():
-            checkout_button = self.page.get_by_role(
-                "button",
-                name=re.compile("Checkout|Перейти к оплате", re.IGNORECASE),
-            )
+        checkout_button = self.page.get_by_role(
+            "button",
+            name=re.compile("Checkout|Перейти к оплате", re.IGNORECASE),
+        )
+        with wait_for_completion(self.page, "store.checkout", selectors.CHECKOUT_DONE) as done:
             checkout_button.click()
 
-        # Базовая проверка, что мы на странице оформления заказа.
-        heading = self.page.get_by_role(
-            "heading",
-            name=re.compile("Checkout|Review your order|Оформление заказа", re.IGNORECASE),
-        )
-        expect(heading).to_be_visible()
+        # Если первым сработал URL, убеждаемся, что страница оформления заказа отрисовалась.
+        if done.signal != "checkout_heading":
+            heading = self.page.get_by_role("heading", name=selectors.CHECKOUT_HEADING_NAME)
+            expect(heading).to_be_visible()
 
     # -------------------- Этап 5: аккаунт, отвязка оплаты и логаут --------------------
-    def open_account_page(self, account_url: Optional[str] = None) -> None:
+    @traced()
+    @adaptive_deadline()
+    def open_account_page(self, account_url: Optional[str] = None, timeout_ms: Optional[float] = None) -> None:
         """Открывает страницу аккаунта Supercell Store.
 
         Если account_url передан из конфига, используется он, иначе собирается
-        из base_url.
+        из base_url. timeout_ms ограничивает и expect-проверки (иначе — `expect_timeout_ms`).
         """
 
         url = account_url or f"{self.base_url}/account"
@@ -202,34 +301,34 @@ class SupercellStoreClient:
         )
         if heading.count() == 0:
             payment_label = self.page.get_by_text(re.compile("Payment information", re.IGNORECASE))
-            expect(payment_label).to_be_visible()
+            expect(payment_label).to_be_visible(timeout=timeout_ms)
         else:
-            expect(heading.first).to_be_visible()
+            expect(heading.first).to_be_visible(timeout=timeout_ms)
 
-    def detach_payment_method(self) -> None:
+    @traced()
+    @adaptive_deadline()
+    def detach_payment_method(self) -> bool:
         """Отвязывает способ оплаты в разделе Payment information (best-effort).
 
         Реализация обобщённая: ищем блок с текстом Payment information, затем в нём
         кнопку удаления/отвязки. Если ничего не нашли, не падаем жёстко.
+        Возвращает True, если кнопка отвязки была нажата.
         """
 
         section = self.page.get_by_text(re.compile("Payment information", re.IGNORECASE))
         if section.count() == 0:
             # Ничего не нашли — возможно, способ оплаты уже не привязан.
-            return
+            return False
 
         container = section.nth(0).locator("xpath=ancestor::section | xpath=ancestor::div")
 
-        remove_button = container.get_by_role(
-            "button",
-            name=re.compile("Remove|Удалить|Detach|Удалить карту", re.IGNORECASE),
+        remove_button = self.resolver.find(
+            "store.remove_payment_button",
+            selectors.STORE_REMOVE_PAYMENT_BUTTON,
+            root=container,
         )
-        if remove_button.count() == 0:
-            # Fallback: любая кнопка с опасным действием внутри секции.
-            remove_button = container.get_by_role("button")
-
-        if remove_button.count() > 0:
-            remove_button.first.click()
+        if remove_button is not None:
+            remove_button.click()
 
             # Подтверждение в модальном окне, если есть.
             confirm = self.page.get_by_role(
@@ -238,29 +337,52 @@ class SupercellStoreClient:
             )
             if confirm.count() > 0:
                 confirm.first.click()
+            return True
+        return False
 
-    def logout_supercell(self) -> None:
+    @traced()
+    @adaptive_deadline()
+    def logout_supercell(self, timeout_ms: Optional[float] = None) -> bool:
         """Выходит из аккаунта Supercell через ссылку/кнопку Log out.
 
         После выхода ожидаем появления кнопки входа на странице магазина.
+        Возвращает False, если кнопки выхода на странице нет.
         """
 
-        logout = self.page.get_by_role(
-            "link",
-            name=re.compile("Log out|Выйти из аккаунта Supercell|Log Out", re.IGNORECASE),
-        )
-        if logout.count() == 0:
-            # Fallback: кнопка вместо ссылки.
-            logout = self.page.get_by_role(
-                "button",
-                name=re.compile("Log out|Выйти", re.IGNORECASE),
-            )
-
-        if logout.count() == 0:
-            return
-
-        logout.first.click()
+        logout = self.resolver.find("store.logout", selectors.STORE_LOGOUT)
+        if logout is None:
+            return False
+
+        # Готово, когда снова видна кнопка "Log in" или произошёл редирект на страницу игры.
+        signals = (*selectors.LOGOUT_DONE, UrlChanged(self.game_url, name="game_page"))
+        with wait_for_completion(self.page, "store.logout", signals, timeout_ms=timeout_ms):
+            logout.click()
+        return True
+
+    @traced()
+    @adaptive_deadline()
+    def clear_session(self) -> None:
+        """Быстрый логаут без UI: cookies контекста и web storage текущего origin."""
+
+        self.page.context.clear_cookies()
+        try:
+            self.page.evaluate(CLEAR_STORAGE_JS)
+        except PlaywrightError:
+            # about:blank или закрытая страница: storage недоступен, cookies уже очищены.
+            pass
+
+    @traced()
+    @adaptive_deadline()
+    def is_logged_out(self, account_url: Optional[str] = None, timeout_ms: Optional[float] = None) -> bool:
+        """Проверяет логаут одним запросом к странице аккаунта, без навигации вкладки.
+
+        Запрос идёт с cookies контекста и без редиректов: разлогиненного пользователя
+        магазин перенаправляет на вход (3xx) или отказывает (401/403).
+        """
 
-        # Ожидаем, что снова появится кнопка "Log in".
-        login_btn = self._login_button()
-        expect(login_btn).to_be_visible()
+        url = account_url or f"{self.base_url}/account"
+        response = self.page.context.request.get(url, max_redirects=0, timeout=timeout_ms)
+        try:
+            return is_logged_out_status(response.status)
+        finally:
+            response.dispose()
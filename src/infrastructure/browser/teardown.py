@@ -0,0 +1,12 @@
+# Очистка web storage текущего origin; cookies чистятся через context.clear_cookies().
+CLEAR_STORAGE_JS = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+
+def is_logged_out_status(status: int) -> bool:
+    """Ответ страницы аккаунта без редиректов означает, что сессии нет.
+
+    Разлогиненного пользователя магазин (и stand-in) отправляет на вход 3xx-редиректом;
+    401/403 — тот же результат без редиректа. 200 — сессия ещё жива.
+    """
+
+    return 300 <= status < 400 or status in (401, 403)
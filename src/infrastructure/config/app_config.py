@@ -0,0 +1,500 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, replace
+import threading
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+CONFIG_PATH = PROJECT_ROOT / "config.yaml"
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SupercellConfig:
+    """Секция `supercell:` — базовые URL и slug игры."""
+
+    base_url: str = "https://store.supercell.com"
+    game_slug: str = "brawlstars"
+    account_url: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class OrderConfig:
+    """Секция `order:` — целевой SKU и (опционально) прямая ссылка на товар."""
+
+    sku_name: str = "80_gems"
+    product_url: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PlaywrightConfig:
+    """Секция `playwright:` — таймауты ожиданий Playwright в миллисекундах."""
+
+    page_timeout_ms: int = 30_000
+    navigation_timeout_ms: int = 45_000
+    expect_timeout_ms: int = 10_000
+    # Шаг ожидания сигналов завершения стадии (см. browser/completion.py).
+    completion_slice_ms: int = 100
+    # Ожидание результата оплаты после нажатия Pay в Google Pay (подтверждение банком долгое).
+    payment_confirm_timeout_ms: int = 120_000
+
+
+@dataclass(frozen=True)
+class TimeoutPolicyConfig:
+    """Секция `timeouts:` — адаптивные таймауты методов клиентов по истории событий.
+
+    Срок метода = quantile-перцентиль его успешных и прерванных таймаутом span-ов
+    × factor в пределах [floor_ms, cap_ms]. Без истории (меньше min_samples)
+    действуют значения `playwright:`.
+    """
+
+    enabled: bool = True
+    quantile: float = 99
+    factor: float = 3.0
+    floor_ms: int = 2_000
+    cap_ms: int = 90_000
+    min_samples: int = 20
+    history_days: float = 14
+    cache_path: str = ".cache/timeouts.json"
+    cache_ttl_s: float = 60 * 60
+
+
+@dataclass(frozen=True)
+class EventLogConfig:
+    """Секция `logging:` — режим записи logs/events.ndjson.
+
+    writer: sync (open/write/close на каждое событие) | buffered (фоновый поток).
+    fsync: never | batch (fsync после каждой записанной пачки).
+    """
+
+    writer: str = "sync"
+    queue_size: int = 10_000
+    batch_size: int = 256
+    flush_interval_ms: int = 200
+    fsync: str = "never"
+    max_bytes: int = 50 * 1024 * 1024
+    backup_count: int = 5
+    compress_rotated: bool = True
+
+
+@dataclass(frozen=True)
+class LocatorConfig:
+    """Секция `locators:` — дисковый кэш выигравших стратегий поиска элементов."""
+
+    cache_enabled: bool = True
+    cache_path: str = ".cache/locators.json"
+    # Сколько ждать появления поля ввода после навигации (логин, экраны Google).
+    wait_timeout_ms: int = 10_000
+
+
+@dataclass(frozen=True)
+class CatalogConfig:
+    """Секция `catalog:` — дисковый индекс SKU -> URL товара по каждой игре."""
+
+    enabled: bool = True
+    path: str = ".cache/catalog.json"
+    # Через сколько секунд индекс игры считается устаревшим и страница магазина обходится заново.
+    ttl_s: float = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    """Секция `sessions:` — переиспользование авторизованной сессии Supercell между запусками."""
+
+    enabled: bool = True
+    directory: str = ".cache/sessions"
+    ttl_s: int = 12 * 60 * 60
+    probe_timeout_ms: int = 3_000
+
+
+@dataclass(frozen=True)
+class OtpConfig:
+    """Секция `otp:` — чтение ОТП из тестового почтового ящика (OTP_MODE=email).
+
+    source: imap (IDLE, без поддержки IDLE — опрос) | maildir (локальный каталог).
+    Логин и пароль IMAP — в .env (OTP_IMAP_USER / OTP_IMAP_PASSWORD).
+    """
+
+    source: str = "imap"
+    imap_host: str = "127.0.0.1"
+    imap_port: int = 993
+    imap_ssl: bool = True
+    imap_mailbox: str = "INBOX"
+    idle: bool = True
+    poll_interval_ms: int = 2_000
+    maildir_path: str = ".cache/maildir"
+    maildir_poll_ms: int = 100
+    sender_pattern: str = "supercell"
+    code_pattern: str = r"\b(\d{6})\b"
+    wait_timeout_s: float = 120
+    # Письмо старше старта логина (с поправкой на расхождение часов) считается устаревшим.
+    clock_skew_s: float = 30
+
+
+@dataclass(frozen=True)
+class CheckpointConfig:
+    """Секция `checkpoints:` — продолжение сценария покупки с последней контрольной точки."""
+
+    enabled: bool = True
+    directory: str = ".cache/checkpoints"
+    ttl_s: float = 30 * 60
+    # Сколько ждать пробного перехода на URL контрольной точки.
+    probe_timeout_ms: int = 5_000
+    # Не разлогиниваться после падения, если есть точка для продолжения: логаут сделал
+    # бы сохранённую сессию бесполезной. Отвязка оплаты выполняется в любом случае.
+    defer_finalize_on_failure: bool = False
+
+
+@dataclass(frozen=True)
+class FinalizeConfig:
+    """Секция `finalize:` — финализация сессии: жёсткие сроки шагов и способ логаута."""
+
+    account_timeout_ms: int = 5_000
+    detach_timeout_ms: int = 3_000
+    # "fast" — очистка cookies/storage контекста с проверкой одним запросом
+    # (UI-логаут остаётся запасным путём); "ui" — только через кнопку Log out.
+    logout: str = "fast"
+    verify_timeout_ms: int = 2_000
+    ui_logout_timeout_ms: int = 5_000
+
+
+@dataclass(frozen=True)
+class StandInConfig:
+    """Секция `standin:` — локальный stand-in Supercell Store / Google Pay."""
+
+    host: str = "127.0.0.1"
+    port: int = 8765
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    # Каталог Maildir, куда stand-in кладёт письмо с ОТП (None — не отправлять).
+    maildir: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    """Секция `profiling:` — память и CPU на границах span-ов (по умолчанию выключено).
+
+    На каждом span-е: tracemalloc текущего процесса и RSS/CPU дерева процессов
+    (драйвер Playwright, браузер); на span-ах прогонов и flow — ещё топ аллокаций
+    и сторож утечек по повторным прогонам.
+    """
+
+    enabled: bool = False
+    traceback_frames: int = 1
+    top_n: int = 5
+    process_tree: bool = True
+    # Сколько последних прогонов одного flow сравнивает сторож утечек.
+    leak_window: int = 6
+    leak_rss_mb: float = 150
+    leak_python_mb: float = 20
+
+
+@dataclass(frozen=True)
+class BenchConfig:
+    """Секция `bench:` — параметры пер-стейдж бенчмарков (tests/bench)."""
+
+    iterations: int = 10
+    threshold_pct: float = 20
+    min_delta_ms: float = 50
+    baseline_path: str = "tests/bench/baseline.json"
+    standin_latency_ms: float = 20
+
+
+@dataclass(frozen=True)
+class SmokeConfig:
+    """Секция `smoke:` — smoke-матрица страниц магазина по нескольким играм.
+
+    Пустой game_slugs — проверяется только `supercell.game_slug`. deadline_ms — срок
+    на одну игру, отсчитывается с момента, когда её проверка получила слот.
+    """
+
+    game_slugs: Tuple[str, ...] = ()
+    concurrency: int = 4
+    deadline_ms: int = 20_000
+
+
+@dataclass(frozen=True)
+class PreflightConfig:
+    """Секция `preflight:` — проверка магазина HTTP-запросами без браузера.
+
+    gate — pytest пропускает e2e-тесты, если pre-flight признал магазин недоступным.
+    Ответ медленнее slow_ms считается подозрительным (odd), а не падением.
+    """
+
+    gate: bool = True
+    timeout_ms: int = 3_000
+    slow_ms: int = 1_500
+    max_redirects: int = 5
+    max_idle_per_origin: int = 4
+    user_agent: str = "Mozilla/5.0 (X11; Linux x86_64) store-preflight"
+
+
+@dataclass(frozen=True)
+class BrowserPoolConfig:
+    """Секция `pool:` — пул браузерных контекстов поверх одного Browser на процесс-воркер."""
+
+    enabled: bool = True
+    # Сколько контекстов создать заранее при старте воркера.
+    warm_size: int = 1
+    # Сколько простаивающих контекстов держать между тестами.
+    max_idle: int = 2
+    # После скольких тестов контекст закрывается и заменяется новым.
+    max_uses: int = 20
+
+
+@dataclass(frozen=True)
+class NetworkRule:
+    """Одно правило сетевой политики: action применяется к запросу, если совпали
+    домен (или его поддомен) и тип ресурса; пустой список означает «любой»."""
+
+    action: str = "block"  # allow | block
+    domains: Tuple[str, ...] = ()
+    resource_types: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class NetworkPolicyConfig:
+    """Секция `network:` — какие запросы страницы блокировать через роутинг контекста."""
+
+    enabled: bool = False
+    # Правила проверяются по порядку, срабатывает первое совпавшее; без совпадений запрос разрешён.
+    rules: Tuple[NetworkRule, ...] = ()
+    # Оценка размера заблокированного ответа по типу ресурса (реальный размер неизвестен).
+    estimated_bytes: Dict[str, int] = field(
+        default_factory=lambda: {"image": 40_000, "media": 500_000, "font": 30_000, "script": 50_000}
+    )
+    default_estimated_bytes: int = 5_000
+
+
+@dataclass(frozen=True)
+class ArtifactConfig:
+    """Секция `artifacts:` — что сохранять при падении теста и сколько места под это отдавать."""
+
+    mode: str = "on_failure"  # on_failure | off
+    # Trace Playwright пишется чанком на каждый тест и сохраняется только при падении.
+    trace: bool = True
+    trace_snapshots: bool = True
+    # Screencast в trace снимается и у зелёных тестов, поэтому только явно
+    # (или с pytest --tracing=on|retain-on-failure).
+    trace_screenshots: bool = False
+    screenshot: bool = True
+    full_page: bool = False
+    # Видео кодируется всегда, даже для зелёных тестов, поэтому включается явно.
+    video: bool = False
+    directory: str = "artifacts"
+    # Квота на каталог: при превышении удаляются самые старые артефакты.
+    max_bytes: int = 512 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class HarConfig:
+    """Секция `har:` — запись живого прогона в HAR по стейджам и офлайн-воспроизведение."""
+
+    mode: str = "off"  # off | record | replay
+    directory: str = ".cache/har"
+    # Что делать с запросом, которого нет в HAR при replay: fail | passthrough | log.
+    on_miss: str = "fail"
+    # Стейдж -> glob URL ({game_slug} подставляется); всё остальное пишется в common.har.
+    stages: Dict[str, str] = field(
+        default_factory=lambda: {
+            "store_page": "**/{game_slug}",
+            "product_page": "**/{game_slug}/product/**",
+            "checkout": "**/checkout*",
+            "account_page": "**/account*",
+        }
+    )
+
+
+@dataclass(frozen=True)
+class BrowserServerConfig:
+    """Секция `browser_server:` — тёплый браузер-сервер между сессиями pytest."""
+
+    enabled: bool = True
+    host: str = "127.0.0.1"
+    port: int = 9323
+    ws_path: str = "/pay-brawl-star"
+    browser: str = "chromium"
+    headless: bool = True
+    # Сервер завершается, если к нему столько секунд никто не подключён.
+    idle_timeout_s: float = 15 * 60
+    max_connections: int = 4
+    # Сколько ждать ответа health-проверки, прежде чем запускать браузер самим.
+    probe_timeout_ms: int = 300
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Типизированное представление всего config.yaml."""
+
+    supercell: SupercellConfig = field(default_factory=SupercellConfig)
+    order: OrderConfig = field(default_factory=OrderConfig)
+    playwright: PlaywrightConfig = field(default_factory=PlaywrightConfig)
+    logging: EventLogConfig = field(default_factory=EventLogConfig)
+    locators: LocatorConfig = field(default_factory=LocatorConfig)
+    catalog: CatalogConfig = field(default_factory=CatalogConfig)
+    sessions: SessionConfig = field(default_factory=SessionConfig)
+    otp: OtpConfig = field(default_factory=OtpConfig)
+    checkpoints: CheckpointConfig = field(default_factory=CheckpointConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    finalize: FinalizeConfig = field(default_factory=FinalizeConfig)
+    timeouts: TimeoutPolicyConfig = field(default_factory=TimeoutPolicyConfig)
+    standin: StandInConfig = field(default_factory=StandInConfig)
+    bench: BenchConfig = field(default_factory=BenchConfig)
+    smoke: SmokeConfig = field(default_factory=SmokeConfig)
+    preflight: PreflightConfig = field(default_factory=PreflightConfig)
+    pool: BrowserPoolConfig = field(default_factory=BrowserPoolConfig)
+    network: NetworkPolicyConfig = field(default_factory=NetworkPolicyConfig)
+    artifacts: ArtifactConfig = field(default_factory=ArtifactConfig)
+    har: HarConfig = field(default_factory=HarConfig)
+    browser_server: BrowserServerConfig = field(default_factory=BrowserServerConfig)
+
+
+def _section(cls: Type[T], raw: Optional[Dict[str, Any]]) -> T:
+    """Собирает dataclass секции из словаря, игнорируя неизвестные ключи.
+
+    Отсутствующие ключи получают значения по умолчанию из dataclass.
+    """
+
+    known = {f.name for f in fields(cls)}
+    values = {k: v for k, v in (raw or {}).items() if k in known}
+    return cls(**values)
+
+
+def _network_section(raw: Optional[Dict[str, Any]]) -> NetworkPolicyConfig:
+    """Секция `network:`: списки правил из YAML превращаются в кортежи NetworkRule."""
+
+    raw = dict(raw or {})
+    rules = []
+    for rule in raw.pop("rules", None) or []:
+        rule = _section(NetworkRule, rule)
+        if rule.action not in ("allow", "block"):
+            raise RuntimeError(f"Неизвестное действие сетевого правила: {rule.action!r}")
+        rules.append(
+            NetworkRule(
+                action=rule.action,
+                domains=tuple(d.lower().lstrip(".") for d in rule.domains),
+                resource_types=tuple(rule.resource_types),
+            )
+        )
+    return replace(_section(NetworkPolicyConfig, raw), rules=tuple(rules))
+
+
+def _smoke_section(raw: Optional[Dict[str, Any]]) -> SmokeConfig:
+    smoke = _section(SmokeConfig, raw)
+    if smoke.concurrency < 1:
+        raise RuntimeError(f"smoke.concurrency должен быть не меньше 1, получено {smoke.concurrency!r}")
+    slugs = dict.fromkeys(str(slug).strip("/") for slug in smoke.game_slugs or ())
+    return replace(smoke, game_slugs=tuple(slug for slug in slugs if slug))
+
+
+def _har_section(raw: Optional[Dict[str, Any]]) -> HarConfig:
+    har = _section(HarConfig, raw)
+    if har.mode not in ("off", "record", "replay"):
+        raise RuntimeError(f"Неизвестный режим HAR: {har.mode!r}")
+    if har.on_miss not in ("fail", "passthrough", "log"):
+        raise RuntimeError(f"Неизвестная политика промахов HAR: {har.on_miss!r}")
+    return har
+
+
+def parse_app_config(raw: Optional[Dict[str, Any]]) -> AppConfig:
+    """Преобразует результат yaml.safe_load в AppConfig."""
+
+    raw = raw or {}
+    return AppConfig(
+        supercell=_section(SupercellConfig, raw.get("supercell")),
+        order=_section(OrderConfig, raw.get("order")),
+        playwright=_section(PlaywrightConfig, raw.get("playwright")),
+        logging=_section(EventLogConfig, raw.get("logging")),
+        locators=_section(LocatorConfig, raw.get("locators")),
+        catalog=_section(CatalogConfig, raw.get("catalog")),
+        sessions=_section(SessionConfig, raw.get("sessions")),
+        otp=_section(OtpConfig, raw.get("otp")),
+        checkpoints=_section(CheckpointConfig, raw.get("checkpoints")),
+        profiling=_section(ProfilingConfig, raw.get("profiling")),
+        finalize=_section(FinalizeConfig, raw.get("finalize")),
+        timeouts=_section(TimeoutPolicyConfig, raw.get("timeouts")),
+        standin=_section(StandInConfig, raw.get("standin")),
+        bench=_section(BenchConfig, raw.get("bench")),
+        smoke=_smoke_section(raw.get("smoke")),
+        preflight=_section(PreflightConfig, raw.get("preflight")),
+        pool=_section(BrowserPoolConfig, raw.get("pool")),
+        network=_network_section(raw.get("network")),
+        artifacts=_section(ArtifactConfig, raw.get("artifacts")),
+        har=_har_section(raw.get("har")),
+        browser_server=_section(BrowserServerConfig, raw.get("browser_server")),
+    )
+
+
+class ConfigRegistry:
+    """Кэширующий загрузчик config.yaml.
+
+    Файл парсится один раз; при последующих обращениях выполняется только stat(),
+    и повторный разбор происходит лишь при изменении mtime файла.
+    """
+
+    def __init__(self, path: Path = CONFIG_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._mtime_ns: Optional[int] = None
+        self._config: Optional[AppConfig] = None
+        self._override: Optional[AppConfig] = None
+
+    def get(self) -> AppConfig:
+        if self._override is not None:
+            return self._override
+
+        try:
+            mtime_ns: Optional[int] = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+
+        config = self._config
+        if config is not None and mtime_ns == self._mtime_ns:
+            return config
+
+        with self._lock:
+            if self._config is None or mtime_ns != self._mtime_ns:
+                raw: Dict[str, Any] = {}
+                if mtime_ns is not None:
+                    # PyYAML импортируется только при первом чтении файла, не при импорте модуля.
+                    import yaml
+
+                    with self.path.open(encoding="utf-8") as f:
+                        raw = yaml.safe_load(f) or {}
+                self._config = parse_app_config(raw)
+                self._mtime_ns = mtime_ns
+            return self._config
+
+    def invalidate(self) -> None:
+        """Сбрасывает кэш: следующий get() перечитает файл."""
+
+        with self._lock:
+            self._config = None
+            self._mtime_ns = None
+
+    @contextmanager
+    def override(self, config: AppConfig) -> Iterator[AppConfig]:
+        """Временно подменяет конфигурацию (бенчмарки, прогоны против stand-in)."""
+
+        previous, self._override = self._override, config
+        try:
+            yield config
+        finally:
+            self._override = previous
+
+
+_registry = ConfigRegistry()
+
+
+def load_app_config() -> AppConfig:
+    """Возвращает актуальную конфигурацию из config.yaml (с кэшированием по mtime)."""
+
+    return _registry.get()
+
+
+def override_app_config(config: AppConfig) -> ContextManager[AppConfig]:
+    """Подменяет результат load_app_config() на время блока `with`."""
+
+    return _registry.override(config)
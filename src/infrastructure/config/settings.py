@@ -1,14 +1,72 @@
 from dataclasses import dataclass
 import os
+import threading
 from pathlib import Path
 from typing import Optional
 
-from dotenv import load_dotenv
 
+# .env из корня репозитория (src/infrastructure/config -> корень)
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+DOTENV_PATH = PROJECT_ROOT / ".env"
 
-# Загружаем .env из корня репозитория
-PROJECT_ROOT = Path(__file__).resolve().parents[4]
-load_dotenv(PROJECT_ROOT / ".env")
+_dotenv_loaded = False
+_dotenv_lock = threading.Lock()
+
+
+def ensure_dotenv() -> None:
+    """Подгружает .env в окружение при первом обращении к настройкам, а не при импорте.
+
+    python-dotenv импортируется здесь же: CLI и воркеры, которым секреты не нужны,
+    не платят за него при старте.
+    """
+
+    global _dotenv_loaded
+
+    if _dotenv_loaded:
+        return
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv(DOTENV_PATH)
+            _dotenv_loaded = True
+
+
+@dataclass
+class SupercellSettings:
+    """Учётные данные Supercell, нужные flow логина."""
+
+    brawl_email: str
+
+    # Режим получения ОТП: manual (ввод в консоли) | email (из почтового ящика, секция `otp:`)
+    otp_mode: str = "manual"
+
+
+@dataclass
+class MailboxSettings:
+    """Учётные данные тестового почтового ящика для OTP_MODE=email (IMAP)."""
+
+    imap_user: str
+    imap_password: str
+
+
+@dataclass
+class GooglePaySettings:
+    """Учётные данные Google, нужные только flow оплаты."""
+
+    google_email: str
+    google_password: str
+    google_backup_code: str
+
+
+@dataclass
+class ProxySettings:
+    http_proxy: Optional[str] = None
+    https_proxy: Optional[str] = None
+
+    @property
+    def server(self) -> Optional[str]:
+        return self.http_proxy or self.https_proxy
 
 
 @dataclass
@@ -16,7 +74,8 @@ class Settings:
     """Глобальные настройки проекта, загружаемые из окружения/конфигов.
 
     Секреты (логины/пароли/backup-коды, прокси) берём из .env, остальные параметры
-    могут быть заданы в коде или отдельном не-секретном конфиге.
+    могут быть заданы в коде или отдельном не-секретном конфиге. Flow-ам, которым
+    нужна только часть секретов, лучше запрашивать её через load_*_settings().
     """
 
     # Supercell / Brawl Stars
@@ -31,30 +90,67 @@ class Settings:
     http_proxy: Optional[str] = None
     https_proxy: Optional[str] = None
 
-    # Режим получения ОТП: manual | email (пока используется manual)
+    # Режим получения ОТП: manual | email
     otp_mode: str = "manual"
 
 
 def _require(name: str) -> str:
+    ensure_dotenv()
     value = os.environ.get(name)
     if not value:
         raise RuntimeError(f"Required environment variable {name} is not set")
     return value
 
 
+def _optional(name: str, default: Optional[str] = None) -> Optional[str]:
+    ensure_dotenv()
+    return os.environ.get(name) or default
+
+
+def load_supercell_settings() -> SupercellSettings:
+    return SupercellSettings(
+        brawl_email=_require("BS_EMAIL"),
+        otp_mode=_optional("OTP_MODE", "manual"),
+    )
+
+
+def load_mailbox_settings() -> MailboxSettings:
+    return MailboxSettings(
+        imap_user=_require("OTP_IMAP_USER"),
+        imap_password=_require("OTP_IMAP_PASSWORD"),
+    )
+
+
+def load_google_pay_settings() -> GooglePaySettings:
+    return GooglePaySettings(
+        google_email=_require("GOOGLE_EMAIL"),
+        google_password=_require("GOOGLE_PASSWORD"),
+        google_backup_code=_require("GOOGLE_BACKUP_CODE"),
+    )
+
+
+def load_proxy_settings() -> ProxySettings:
+    """Прокси необязателен: без переменных окружения возвращает пустые настройки."""
+
+    return ProxySettings(http_proxy=_optional("HTTP_PROXY"), https_proxy=_optional("HTTPS_PROXY"))
+
+
 def load_settings() -> Settings:
-    """Загружает настройки из переменных окружения.
+    """Загружает все настройки из переменных окружения.
 
     Использует .env (через python-dotenv) и жёстко требует наличия критичных полей,
     чтобы как можно раньше упасть с понятной ошибкой.
     """
 
+    supercell = load_supercell_settings()
+    google = load_google_pay_settings()
+    proxy = load_proxy_settings()
     return Settings(
-        brawl_email=_require("BS_EMAIL"),
-        google_email=_require("GOOGLE_EMAIL"),
-        google_password=_require("GOOGLE_PASSWORD"),
-        google_backup_code=_require("GOOGLE_BACKUP_CODE"),
-        http_proxy=os.environ.get("HTTP_PROXY") or None,
-        https_proxy=os.environ.get("HTTPS_PROXY") or None,
-        otp_mode=os.environ.get("OTP_MODE", "manual"),
+        brawl_email=supercell.brawl_email,
+        google_email=google.google_email,
+        google_password=google.google_password,
+        google_backup_code=google.google_backup_code,
+        http_proxy=proxy.http_proxy,
+        https_proxy=proxy.https_proxy,
+        otp_mode=supercell.otp_mode,
     )
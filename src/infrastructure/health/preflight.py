@@ -0,0 +1,382 @@
+"""Pre-flight магазина без браузера: keep-alive HTTP-запросы к base_url, странице игры и аккаунту.
+
+    python -m src.infrastructure.health.preflight [--slug clashroyale] [--format json]
+
+Каждая проверка смотрит статус, цепочку редиректов и маркер в <title> и получает
+вердикт: ok; odd — магазин отвечает, но не как обычно (4xx, лишние редиректы,
+нет маркера, ответ медленнее `preflight.slow_ms`); down — нет соединения,
+таймаут или 5xx. Соединения живут в ConnectionPool и переиспользуются между
+проверками и повторными прогонами; прокси — тот же HTTP_PROXY/HTTPS_PROXY из .env,
+что и у браузерного контекста.
+
+Браузерная smoke-матрица (store_smoke --preflight) запускается, только если
+вердикт не ok; tests/conftest.py при вердикте down пропускает e2e-тесты.
+"""
+
+import argparse
+import base64
+import html
+import json
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from http.client import HTTPConnection, HTTPException, HTTPMessage, HTTPSConnection
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from src.infrastructure.browser.teardown import is_logged_out_status
+from src.infrastructure.config.app_config import AppConfig, PreflightConfig, load_app_config
+from src.infrastructure.config.settings import load_proxy_settings
+from src.infrastructure.logging.events import log_event
+
+
+PREFLIGHT_OK = "ok"
+PREFLIGHT_ODD = "odd"
+PREFLIGHT_DOWN = "down"
+
+_SEVERITY = {PREFLIGHT_OK: 0, PREFLIGHT_ODD: 1, PREFLIGHT_DOWN: 2}
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+# Заголовок ищется только в начале документа.
+_TITLE_SCAN_BYTES = 64 * 1024
+
+Origin = Tuple[str, str, int]
+
+
+def title_pattern(slug: str) -> Pattern[str]:
+    """Название игры по slug: brawlstars совпадает с «Brawl Stars», clashofclans — с «Clash of Clans»."""
+
+    letters = re.sub(r"[^0-9a-z]", "", slug.lower())
+    return re.compile(r"\W*".join(map(re.escape, letters)), re.IGNORECASE)
+
+
+def page_title(body: bytes) -> Optional[str]:
+    match = _TITLE.search(body[:_TITLE_SCAN_BYTES])
+    if match is None:
+        return None
+    return " ".join(html.unescape(match.group(1).decode("utf-8", "replace")).split())
+
+
+# -------------------- Пул соединений --------------------
+@dataclass
+class ConnectionStats:
+    created: int = 0
+    reused: int = 0
+
+
+@dataclass
+class PoolResponse:
+    status: int
+    headers: HTTPMessage
+    body: bytes
+    reused: bool
+
+
+class ConnectionPool:
+    """Keep-alive соединения http.client по origin (схема, хост, порт); потокобезопасен.
+
+    С прокси http-запросы идут на прокси с абсолютным URL, https — через CONNECT-туннель.
+    """
+
+    def __init__(
+        self,
+        timeout_s: float,
+        proxy: Optional[str] = None,
+        max_idle_per_origin: int = 4,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.timeout_s = timeout_s
+        self.proxy = urlsplit(proxy if "://" in proxy else f"http://{proxy}") if proxy else None
+        self.max_idle_per_origin = max_idle_per_origin
+        self.headers = dict(headers or {})
+        self.stats = ConnectionStats()
+        self._idle: Dict[Origin, List[HTTPConnection]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _connect(self, origin: Origin) -> HTTPConnection:
+        scheme, host, port = origin
+        connection_cls = HTTPSConnection if scheme == "https" else HTTPConnection
+        if self.proxy is None:
+            connection = connection_cls(host, port, timeout=self.timeout_s)
+        else:
+            connection = connection_cls(self.proxy.hostname, self.proxy.port or 80, timeout=self.timeout_s)
+            if scheme == "https":
+                connection.set_tunnel(host, port, headers=self._proxy_headers())
+        with self._lock:
+            self.stats.created += 1
+        return connection
+
+    def _proxy_headers(self) -> Dict[str, str]:
+        if self.proxy is None or not self.proxy.username:
+            return {}
+        credentials = f"{self.proxy.username}:{self.proxy.password or ''}".encode("utf-8")
+        return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials).decode("ascii")}
+
+    def _acquire(self, origin: Origin) -> Tuple[HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle[origin]
+            if idle:
+                self.stats.reused += 1
+                return idle.pop(), True
+        return self._connect(origin), False
+
+    def _release(self, origin: Origin, connection: HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle[origin]
+            if len(idle) < self.max_idle_per_origin:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def get(self, url: str) -> PoolResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Неподдерживаемый URL: {url!r}")
+        origin = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = dict(self.headers)
+        if self.proxy is not None and parts.scheme == "http":
+            target = url
+            headers.update(self._proxy_headers())
+
+        while True:
+            connection, reused = self._acquire(origin)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, HTTPException):
+                connection.close()
+                # Сервер мог закрыть простаивавшее keep-alive соединение — повтор на новом.
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(origin, connection)
+            return PoolResponse(status=response.status, headers=response.headers, body=body, reused=reused)
+
+    def close(self) -> None:
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+# -------------------- Проверки --------------------
+@dataclass(frozen=True)
+class PreflightTarget:
+    """Что ожидается от URL: статус конечной страницы не выше max_status и маркер в <title>.
+
+    logged_out — страница аккаунта без сессии: первый ответ должен вести на вход
+    (3xx или 401/403, см. is_logged_out_status).
+    """
+
+    name: str
+    url: str
+    title: Optional[Pattern[str]] = None
+    max_status: int = 399
+    logged_out: bool = False
+
+
+@dataclass
+class PreflightCheck:
+    name: str
+    url: str
+    verdict: str
+    elapsed_ms: float
+    status: Optional[int] = None
+    redirects: List[str] = field(default_factory=list)
+    title: Optional[str] = None
+    reused: bool = False
+    detail: Optional[str] = None
+
+
+def check_target(pool: ConnectionPool, target: PreflightTarget, cfg: PreflightConfig) -> PreflightCheck:
+    started = time.perf_counter()
+    check = PreflightCheck(name=target.name, url=target.url, verdict=PREFLIGHT_OK, elapsed_ms=0.0)
+    problems: List[str] = []
+    first_status: Optional[int] = None
+    url = target.url
+    try:
+        while True:
+            response = pool.get(url)
+            check.reused = check.reused or response.reused
+            first_status = response.status if first_status is None else first_status
+            location = response.headers.get("Location")
+            if not (300 <= response.status < 400 and location):
+                break
+            if len(check.redirects) >= cfg.max_redirects:
+                problems.append(f"more than {cfg.max_redirects} redirects")
+                break
+            url = urljoin(url, location)
+            check.redirects.append(url)
+    except (OSError, HTTPException, ValueError) as exc:
+        check.verdict = PREFLIGHT_DOWN
+        check.detail = f"{type(exc).__name__}: {exc}"
+        check.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        return check
+
+    check.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    check.status = response.status
+    check.title = page_title(response.body)
+    if response.status >= 500:
+        check.verdict = PREFLIGHT_DOWN
+        check.detail = f"HTTP {response.status}"
+        return check
+
+    if target.logged_out and first_status is not None and not is_logged_out_status(first_status):
+        problems.append(f"account page answered {first_status} without a session")
+    elif response.status > target.max_status and not (target.logged_out and is_logged_out_status(response.status)):
+        problems.append(f"HTTP {response.status}")
+    if target.title is not None and not (check.title and target.title.search(check.title)):
+        problems.append(f"title {check.title!r} does not match {target.title.pattern!r}")
+    if check.elapsed_ms > cfg.slow_ms:
+        problems.append(f"slow: {check.elapsed_ms:.0f} ms > {cfg.slow_ms} ms")
+    if problems:
+        check.verdict = PREFLIGHT_ODD
+        check.detail = "; ".join(problems)
+    return check
+
+
+@dataclass
+class PreflightReport:
+    checks: List[PreflightCheck] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def verdict(self) -> str:
+        return max((check.verdict for check in self.checks), key=_SEVERITY.__getitem__, default=PREFLIGHT_OK)
+
+    @property
+    def ok(self) -> bool:
+        return self.verdict == PREFLIGHT_OK
+
+    def summary(self) -> str:
+        bad = [f"{check.name}: {check.detail}" for check in self.checks if check.verdict != PREFLIGHT_OK]
+        return "; ".join(bad) or "all checks ok"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "verdict": self.verdict,
+            "elapsed_ms": self.elapsed_ms,
+            "checks": [
+                {
+                    "name": check.name,
+                    "url": check.url,
+                    "verdict": check.verdict,
+                    "status": check.status,
+                    "elapsed_ms": check.elapsed_ms,
+                    "redirects": check.redirects,
+                    "title": check.title,
+                    "reused": check.reused,
+                    "detail": check.detail,
+                }
+                for check in self.checks
+            ],
+        }
+
+    def format_text(self) -> str:
+        header = f"{'check':<24} {'verdict':<8} {'status':>6} {'ms':>9}  detail"
+        lines = [header, "-" * len(header)]
+        for check in self.checks:
+            status = str(check.status) if check.status is not None else "-"
+            lines.append(
+                f"{check.name[:24]:<24} {check.verdict:<8} {status:>6} {check.elapsed_ms:>9.1f}  {check.detail or ''}".rstrip()
+            )
+        lines.append(f"{self.verdict.upper()} in {self.elapsed_ms:.1f} ms")
+        return "\n".join(lines)
+
+    def log(self) -> None:
+        log_event(
+            stage="preflight",
+            status={PREFLIGHT_OK: "ok", PREFLIGHT_ODD: "warning", PREFLIGHT_DOWN: "error"}[self.verdict],
+            message=f"Store pre-flight: {self.verdict}",
+            data=self.as_dict(),
+        )
+
+
+def default_targets(config: AppConfig, slugs: Sequence[str] = ()) -> List[PreflightTarget]:
+    """base_url, страницы игр (по умолчанию `supercell.game_slug`) и страница аккаунта."""
+
+    base_url = config.supercell.base_url.rstrip("/")
+    # Корень магазина может отвечать чем угодно, кроме 5xx: важно, что origin жив.
+    targets = [PreflightTarget("home", f"{base_url}/", max_status=499)]
+    for slug in dict.fromkeys(slugs or (config.supercell.game_slug,)):
+        slug = slug.strip("/")
+        targets.append(PreflightTarget(f"game:{slug}", f"{base_url}/{slug}", title=title_pattern(slug)))
+    targets.append(PreflightTarget("account", config.supercell.account_url or f"{base_url}/account", logged_out=True))
+    return targets
+
+
+def run_preflight(targets: Sequence[PreflightTarget], pool: ConnectionPool, cfg: PreflightConfig) -> PreflightReport:
+    """Проверяет цели параллельно; порядок проверок в отчёте — порядок targets."""
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(targets)), thread_name_prefix="preflight") as executor:
+        checks = list(executor.map(lambda target: check_target(pool, target, cfg), targets))
+    return PreflightReport(checks=checks, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+def new_connection_pool(cfg: PreflightConfig, proxy: Optional[str] = None) -> ConnectionPool:
+    return ConnectionPool(
+        timeout_s=cfg.timeout_ms / 1000,
+        proxy=proxy,
+        max_idle_per_origin=cfg.max_idle_per_origin,
+        headers={"User-Agent": cfg.user_agent, "Accept": "text/html,*/*", "Accept-Encoding": "identity"},
+    )
+
+
+_default_pool: Optional[ConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def default_connection_pool() -> ConnectionPool:
+    """Пул процесса по секции `preflight:` и прокси из .env: повторные pre-flight идут по тем же соединениям."""
+
+    global _default_pool
+
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = new_connection_pool(load_app_config().preflight, load_proxy_settings().server)
+    return _default_pool
+
+
+def preflight(slugs: Sequence[str] = (), base_url: Optional[str] = None) -> PreflightReport:
+    """Pre-flight по config.yaml (base_url — вместо `supercell.base_url`); пишется в лог событий."""
+
+    config = load_app_config()
+    if base_url:
+        # Свой base_url (например, stand-in) — и страница аккаунта собирается от него.
+        config = replace(config, supercell=replace(config.supercell, base_url=base_url, account_url=None))
+    report = run_preflight(default_targets(config, slugs), default_connection_pool(), config.preflight)
+    report.log()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI: код выхода 0 — ok, 1 — odd, 2 — down."""
+
+    parser = argparse.ArgumentParser(description="Проверка Supercell Store HTTP-запросами без браузера")
+    parser.add_argument("--slug", action="append", default=[], help="slug игры, можно несколько (по умолчанию supercell.game_slug)")
+    parser.add_argument("--base-url", help="адрес магазина вместо supercell.base_url (например, stand-in)")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    args = parser.parse_args(argv)
+
+    report = preflight(args.slug, base_url=args.base_url)
+    if args.format == "json":
+        json.dump(report.as_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(report.format_text())
+    sys.exit(_SEVERITY[report.verdict])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,37 @@
+import asyncio
+import atexit
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, Token
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.logging.writer import BufferedEventWriter, rotate_segments
 
+
+# Каталог создаётся при первой записи, а не при импорте модуля.
 LOGS_DIR = Path(__file__).resolve().parents[3] / "logs"
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOGS_DIR / "events.ndjson"
 
 
+def log_file() -> Path:
+    """Файл лога этого процесса: LOG_FILE, а под pytest-xdist — свой у каждого воркера.
+
+    Ротация переименовывает и сжимает файл, поэтому процессы не должны делить один
+    файл: events.gw0.ndjson, events.gw1.ndjson... (report.log_segments читает все).
+    """
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return LOG_FILE
+    return LOG_FILE.with_name(f"{LOG_FILE.stem}.{worker}{LOG_FILE.suffix}")
+
+
 @dataclass
 class Event:
     stage: str
@@ -18,10 +40,122 @@ class Event:
     data: Optional[Dict[str, Any]] = None
 
 
+# Идентификатор текущего прогона; проставляется в каждое событие (см. tracing.run).
+_run_id: ContextVar[Optional[str]] = ContextVar("run_id", default=None)
+
+
+def current_run_id() -> Optional[str]:
+    return _run_id.get()
+
+
+def bind_run_id(run_id: str) -> "Token[Optional[str]]":
+    """Делает run_id текущим для контекста; вернуть прежний — reset_run_id(token)."""
+
+    return _run_id.set(run_id)
+
+
+def reset_run_id(token: "Token[Optional[str]]") -> None:
+    _run_id.reset(token)
+
+
+_writer: Optional[BufferedEventWriter] = None
+_writer_resolved = False
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> Optional[BufferedEventWriter]:
+    """Возвращает фоновый писатель, если в config.yaml выбран `logging.writer: buffered`.
+
+    Решение принимается один раз при первом событии; в режиме sync возвращает None.
+    """
+
+    global _writer, _writer_resolved
+
+    if _writer_resolved:
+        return _writer
+
+    with _writer_lock:
+        if not _writer_resolved:
+            cfg = load_app_config().logging
+            if cfg.writer == "buffered":
+                _writer = BufferedEventWriter(
+                    log_file(),
+                    queue_size=cfg.queue_size,
+                    batch_size=cfg.batch_size,
+                    flush_interval_s=cfg.flush_interval_ms / 1000,
+                    fsync=cfg.fsync,
+                    max_bytes=cfg.max_bytes,
+                    backup_count=cfg.backup_count,
+                    compress_rotated=cfg.compress_rotated,
+                )
+                atexit.register(shutdown_event_writer)
+            _writer_resolved = True
+    return _writer
+
+
+# Поток для sync-записи событий из event loop-а (см. log_event).
+_loop_writes: Optional[ThreadPoolExecutor] = None
+_loop_writes_lock = threading.Lock()
+
+
+def _loop_writes_executor() -> ThreadPoolExecutor:
+    global _loop_writes
+
+    with _loop_writes_lock:
+        if _loop_writes is None:
+            # Один поток: события пишутся в порядке вызова log_event.
+            _loop_writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-log")
+        return _loop_writes
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def flush_events(timeout: Optional[float] = 5.0) -> None:
+    """Дожидается записи всех событий, поставленных в очередь до вызова."""
+
+    if _writer is not None:
+        _writer.flush(timeout)
+    loop_writes = _loop_writes
+    if loop_writes is not None:
+        try:
+            loop_writes.submit(lambda: None).result(timeout)
+        except RuntimeError:
+            pass  # поток остановлен shutdown_event_writer: он дописал очередь
+
+
+def shutdown_event_writer() -> None:
+    """Дописывает очередь и останавливает фоновый писатель (atexit / конец pytest-сессии).
+
+    Следующий log_event снова выберет режим по config.yaml.
+    """
+
+    global _writer, _writer_resolved, _loop_writes
+
+    with _writer_lock:
+        writer, _writer = _writer, None
+        _writer_resolved = False
+    if writer is not None:
+        writer.close()
+    with _loop_writes_lock:
+        loop_writes, _loop_writes = _loop_writes, None
+    if loop_writes is not None:
+        loop_writes.shutdown(wait=True)
+
+
 def log_event(stage: str, status: str, message: str, data: Optional[Dict[str, Any]] = None) -> None:
     """Пишет одну строку NDJSON с информацией о шаге сценария.
 
     Формат близкий к agent_log из reference-репозитория: timestamp + поля события.
+    Если событие пишется внутри прогона (tracing.run), добавляется его run_id.
+    В режиме `logging.writer: buffered` запись лишь ставится в очередь фонового писателя.
+    В sync-режиме внутри event loop-а open/write/close уходит в отдельный поток, чтобы
+    не останавливать остальные задачи loop-а на диске.
     """
 
     payload = Event(stage=stage, status=status, message=message, data=data or {})
@@ -29,6 +163,47 @@ def log_event(stage: str, status: str, message: str, data: Optional[Dict[str, An
         "ts": datetime.now(timezone.utc).isoformat(),
         **asdict(payload),
     }
+    run_id = _run_id.get()
+    if run_id is not None:
+        record["run_id"] = run_id
+
+    writer = _get_writer()
+    if writer is not None and writer.write(record):
+        return
+    if _in_event_loop():
+        _loop_writes_executor().submit(_write_sync, record)
+        return
+    loop_writes = _loop_writes
+    if loop_writes is not None:
+        # Та же очередь, что у событий из loop-а: запись не обгонит поставленные раньше.
+        try:
+            loop_writes.submit(_write_sync, record).result()
+            return
+        except RuntimeError:
+            pass  # поток остановлен shutdown_event_writer
+    _write_sync(record)
+
+
+_sync_lock = threading.Lock()
+
+
+def _write_sync(record: Dict[str, Any]) -> None:
+    """Sync-режим (и запасной путь после остановки фонового писателя): open/write/close.
+
+    Ротация по `logging.max_bytes` та же, что у фонового писателя.
+    """
 
-    with LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    cfg = load_app_config().logging
+    path = log_file()
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _sync_lock:
+        try:
+            f = path.open("a", encoding="utf-8")
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            f = path.open("a", encoding="utf-8")
+        with f:
+            f.write(line)
+            rotate = cfg.max_bytes > 0 and f.tell() >= cfg.max_bytes
+        if rotate:
+            rotate_segments(path, cfg.backup_count, cfg.compress_rotated)
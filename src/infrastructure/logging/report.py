@@ -0,0 +1,195 @@
+"""Отчёт по logs/events.ndjson: количество, доля ошибок и перцентили длительности по стейджам.
+
+Файлы читаются построчно (включая ротированные .N и .N.gz сегменты), на стейдж
+хранится только QuantileSketch, поэтому память не зависит от размера лога.
+
+    python -m src.infrastructure.logging.report --since 2026-01-01T00:00:00 --stage "store.*"
+"""
+
+import argparse
+import fnmatch
+import gzip
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.infrastructure.logging.events import LOG_FILE
+from src.infrastructure.perf.sketch import QuantileSketch
+
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Статусы событий, которые считаются неуспехом стейджа.
+FAILURE_STATUSES = frozenset({"error", "failed"})
+
+
+def log_segments(path: Path) -> List[Path]:
+    """Активный файл и его ротированные сегменты, от самого старого к самому новому.
+
+    Файлы воркеров pytest-xdist (events.gw0.ndjson и их сегменты, см. events.log_file)
+    читаются вместе с основным.
+    """
+
+    pattern = re.compile(re.escape(path.stem) + r"(\.gw\d+)?" + re.escape(path.suffix) + r"(?:\.(\d+)(\.gz)?)?$")
+    found = []
+    if path.parent.is_dir():
+        for candidate in path.parent.iterdir():
+            match = pattern.match(candidate.name)
+            if match:
+                index = int(match.group(2)) if match.group(2) else 0
+                found.append((-index, match.group(1) or "", candidate))
+    return [p for _, _, p in sorted(found)]
+
+
+def _open(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open(encoding="utf-8")
+
+
+def iter_records(paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    """Построчно отдаёт события из файлов; битые строки (обрыв записи) пропускаются."""
+
+    for path in paths:
+        with _open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+def parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+@dataclass
+class RecordFilter:
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    run_ids: Sequence[str] = ()
+    stages: Sequence[str] = ()  # fnmatch-шаблоны
+
+    def accepts(self, record: Dict[str, Any]) -> bool:
+        if self.run_ids and record.get("run_id") not in self.run_ids:
+            return False
+        if self.stages and not any(fnmatch.fnmatchcase(str(record.get("stage")), s) for s in self.stages):
+            return False
+        if self.since is not None or self.until is not None:
+            try:
+                ts = parse_ts(record["ts"])
+            except (KeyError, TypeError, ValueError):
+                return False
+            if self.since is not None and ts < self.since:
+                return False
+            if self.until is not None and ts >= self.until:
+                return False
+        return True
+
+
+def record_duration_ms(record: Dict[str, Any]) -> Optional[float]:
+    """Длительность события: duration_ms у span-ов, elapsed_ms у сигналов завершения."""
+
+    data = record.get("data") or {}
+    for key in ("duration_ms", "elapsed_ms"):
+        value = data.get(key)
+        if isinstance(value, (int, float)):
+            return float(value)
+    return None
+
+
+@dataclass
+class StageReport:
+    count: int = 0
+    failures: int = 0
+    durations: QuantileSketch = field(default_factory=QuantileSketch)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.count += 1
+        if record.get("status") in FAILURE_STATUSES:
+            self.failures += 1
+        duration = record_duration_ms(record)
+        if duration is not None:
+            self.durations.add(duration)
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "failures": self.failures,
+            "failure_rate": self.failures / self.count if self.count else 0.0,
+            "timed": self.durations.count,
+        }
+        if self.durations.count:
+            result["mean_ms"] = self.durations.mean
+            result["max_ms"] = self.durations.max
+            for q in PERCENTILES:
+                result[f"p{q}_ms"] = self.durations.quantile(q)
+        return result
+
+
+def build_report(records: Iterable[Dict[str, Any]], record_filter: Optional[RecordFilter] = None) -> Dict[str, StageReport]:
+    record_filter = record_filter or RecordFilter()
+    stages: Dict[str, StageReport] = {}
+    for record in records:
+        if not record_filter.accepts(record):
+            continue
+        stage = str(record.get("stage"))
+        report = stages.get(stage)
+        if report is None:
+            report = stages[stage] = StageReport()
+        report.add(record)
+    return stages
+
+
+def format_text(stages: Dict[str, StageReport]) -> str:
+    header = f"{'stage':<40} {'count':>8} {'fail%':>6}" + "".join(f" {'p%d' % q:>9}" for q in PERCENTILES)
+    lines = [header, "-" * len(header)]
+    for name, report in sorted(stages.items()):
+        row = report.as_dict()
+        cells = "".join(
+            f" {row[f'p{q}_ms']:>9.1f}" if f"p{q}_ms" in row else f" {'-':>9}" for q in PERCENTILES
+        )
+        lines.append(f"{name[:40]:<40} {row['count']:>8} {row['failure_rate'] * 100:>6.1f}{cells}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI: `python -m src.infrastructure.logging.report [paths...]`."""
+
+    parser = argparse.ArgumentParser(description="Отчёт по стейджам из logs/events.ndjson")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="файлы лога (.ndjson / .gz); по умолчанию logs/events.ndjson и его ротированные сегменты",
+    )
+    parser.add_argument("--since", type=parse_ts, help="ISO-время начала (включительно), без зоны — UTC")
+    parser.add_argument("--until", type=parse_ts, help="ISO-время конца (не включительно)")
+    parser.add_argument("--run-id", action="append", default=[], help="только события этих прогонов")
+    parser.add_argument("--stage", action="append", default=[], help="шаблон имени стейджа (fnmatch), можно несколько")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or log_segments(LOG_FILE)
+    record_filter = RecordFilter(since=args.since, until=args.until, run_ids=args.run_id, stages=args.stage)
+    stages = build_report(iter_records(paths), record_filter)
+
+    if args.format == "json":
+        payload = {name: report.as_dict() for name, report in sorted(stages.items())}
+        json.dump(payload, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(format_text(stages))
+
+
+if __name__ == "__main__":
+    main()
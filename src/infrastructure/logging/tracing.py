@@ -0,0 +1,152 @@
+"""Иерархические span-ы: прогон -> flow -> метод клиента.
+
+Каждый span по завершении пишет одно событие в logs/events.ndjson:
+stage = имя span-а, status = ok | error, в data — span_id/parent_id, вид span-а,
+время начала/конца и длительность. run_id прогона распространяется через
+contextvars и попадает во все события, в том числе не связанные со span-ами.
+
+Наблюдатели (add_span_observer) вызываются на входе в span и на выходе из него,
+до записи события, и могут дописать в span.attrs свои данные (см. perf/resources.py).
+"""
+
+import functools
+import inspect
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from src.infrastructure.logging import events
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    span_id: str
+    parent_id: Optional[str]
+    started_at: datetime
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    _started_perf: float = field(default_factory=time.perf_counter, repr=False)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# Наблюдатель получает span и фазу: "start" | "end".
+SpanObserver = Callable[[Span, str], None]
+_observers: List[SpanObserver] = []
+
+
+def add_span_observer(observer: SpanObserver) -> None:
+    _observers.append(observer)
+
+
+def remove_span_observer(observer: SpanObserver) -> None:
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "step", **attrs: Any) -> Iterator[Span]:
+    """Открывает вложенный span; по выходу пишет событие с исходом и длительностью.
+
+    Если span открыт вне прогона, для него заводится собственный run_id.
+    """
+
+    run_token = events.bind_run_id(new_run_id()) if events.current_run_id() is None else None
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        kind=kind,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        started_at=datetime.now(timezone.utc),
+        attrs=attrs,
+    )
+    span_token = _current_span.set(current)
+    if _observers:
+        for observer in list(_observers):
+            observer(current, "start")
+        # Работа наблюдателей не входит в длительность span-а.
+        current._started_perf = time.perf_counter()
+
+    status = "ok"
+    error: Optional[str] = None
+    try:
+        yield current
+    except BaseException as exc:
+        status = "error"
+        error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - current._started_perf) * 1000
+        for observer in list(_observers):
+            observer(current, "end")
+        data: Dict[str, Any] = {
+            "kind": kind,
+            "span_id": current.span_id,
+            "parent_id": current.parent_id,
+            "start_ts": current.started_at.isoformat(),
+            "end_ts": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            **current.attrs,
+        }
+        if error is not None:
+            data["error"] = error
+        events.log_event(stage=name, status=status, message=f"{kind} {name}", data=data)
+
+        _current_span.reset(span_token)
+        if run_token is not None:
+            events.reset_run_id(run_token)
+
+
+@contextmanager
+def run(name: str = "run", run_id: Optional[str] = None, **attrs: Any) -> Iterator[str]:
+    """Корневой span прогона: задаёт run_id для всех вложенных span-ов и событий."""
+
+    current_id = run_id or new_run_id()
+    token = events.bind_run_id(current_id)
+    try:
+        with span(name, kind="run", **attrs):
+            yield current_id
+    finally:
+        events.reset_run_id(token)
+
+
+def traced(name: Optional[str] = None, kind: str = "client") -> Callable[[F], F]:
+    """Декоратор: оборачивает вызов функции/метода (sync или async) в span."""
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(span_name, kind=kind):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(span_name, kind=kind):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
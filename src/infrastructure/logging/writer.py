@@ -0,0 +1,203 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+
+class _FlushMarker:
+    """Служебный элемент очереди: поток-писатель выставляет event после записи всего, что было до него."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+def segment_path(path: Path, index: int, compress: bool) -> Path:
+    suffix = f".{index}.gz" if compress else f".{index}"
+    return path.with_name(path.name + suffix)
+
+
+def rotate_segments(path: Path, backup_count: int, compress: bool) -> None:
+    """Ротация по размеру закрытого файла path: сдвигаем старые сегменты и сжимаем новый.
+
+    Общая для фонового писателя и sync-режима events.log_event.
+    """
+
+    if backup_count <= 0:
+        path.unlink(missing_ok=True)
+        return
+
+    segment_path(path, backup_count, compress).unlink(missing_ok=True)
+    for index in range(backup_count - 1, 0, -1):
+        src = segment_path(path, index, compress)
+        if src.exists():
+            src.replace(segment_path(path, index + 1, compress))
+
+    if compress:
+        with path.open("rb") as src_f, gzip.open(segment_path(path, 1, compress), "wb") as dst_f:
+            shutil.copyfileobj(src_f, dst_f)
+        path.unlink()
+    else:
+        path.replace(segment_path(path, 1, compress))
+
+
+class BufferedEventWriter:
+    """Фоновый писатель NDJSON: очередь в памяти + запись пачками в отдельном потоке.
+
+    - вызывающий код сериализует запись и кладёт строку в ограниченную очередь
+      (без файлового I/O); ошибка сериализации достаётся вызывающему, как в sync-режиме;
+    - поток-писатель держит файл открытым, пишет пачками до batch_size записей
+      или по истечении flush_interval_s;
+    - fsync="batch" — fsync после каждой пачки, "never" — только flush в ОС;
+    - при превышении max_bytes файл ротируется (events.ndjson.1[.gz] ... .N[.gz]).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval_s: float = 0.2,
+        fsync: str = "never",
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 5,
+        compress_rotated: bool = True,
+        put_timeout_s: float = 1.0,
+    ) -> None:
+        if fsync not in ("never", "batch"):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress_rotated = compress_rotated
+        self.put_timeout_s = put_timeout_s
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._file: Optional[TextIO] = None
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="events-writer", daemon=True)
+        self._thread.start()
+
+    # -------------------- API вызывающей стороны --------------------
+    def write(self, record: Dict[str, Any]) -> bool:
+        """Сериализует запись и ставит строку в очередь.
+
+        Если очередь заполнена, ждёт освобождения места не дольше put_timeout_s.
+        Возвращает False, если писатель закрыт, его поток остановился или место в
+        очереди так и не освободилось: запись не принята, и вызывающий код пишет её
+        сам (events.log_event переходит на sync-запись).
+        """
+
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._close_lock:
+            if self._closed or not self._thread.is_alive():
+                return False
+            try:
+                self._queue.put(line, timeout=self.put_timeout_s)
+            except queue.Full:
+                return False
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дожидается записи на диск всех событий, поставленных до вызова."""
+
+        if self._closed or not self._thread.is_alive():
+            return True
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Дописывает очередь, закрывает файл и останавливает поток. Идемпотентен."""
+
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                return
+            self._thread.join(timeout)
+
+    # -------------------- Поток-писатель --------------------
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                continue
+
+            batch: List[Any] = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines: List[str] = []
+            markers: List[_FlushMarker] = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _FlushMarker):
+                    markers.append(item)
+                else:
+                    lines.append(item)
+
+            try:
+                if lines:
+                    self._write_lines(lines)
+            except OSError:
+                # Логирование не должно ронять сценарий: пачку теряем, файл переоткроем.
+                self._close_file()
+            finally:
+                for marker in markers:
+                    marker.done.set()
+
+        self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        finally:
+            self._file = None
+
+    def _write_lines(self, lines: List[str]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self.fsync == "batch":
+            os.fsync(self._file.fileno())
+
+        if self.max_bytes > 0 and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        assert self._file is not None
+        self._file.close()
+        self._file = None
+        rotate_segments(self.path, self.backup_count, self.compress_rotated)
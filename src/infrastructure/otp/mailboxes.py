@@ -0,0 +1,231 @@
+"""Почтовые ящики для чтения ОТП: Maildir и IMAP (IDLE с откатом на опрос).
+
+У ящика два метода: messages(since) — письма, пришедшие не раньше since
+(уже разобранные повторно не читаются), и wait(timeout_s) — ждать изменения
+ящика не дольше timeout_s. wait_for_code объединяет их в ожидание кода.
+"""
+
+import imaplib
+import mailbox
+import os
+import re
+import select
+import time
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.infrastructure.otp.messages import MailMessage, OtpMatcher, newest_code, parse_message
+
+
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+_FETCH_UID = re.compile(rb"UID (\d+)")
+
+
+class MaildirMailbox:
+    """Maildir (new/ + cur/): время получения письма — mtime его файла.
+
+    Доставка в Maildir — переименование файла из tmp/ в new/, при этом меняется
+    mtime каталога; в stdlib нет inotify, поэтому wait() опрашивает его stat раз в
+    poll_interval_s (для локального каталога это дёшево).
+    """
+
+    def __init__(self, path: Path, poll_interval_s: float = 0.1) -> None:
+        self.path = Path(path)
+        self.poll_interval_s = poll_interval_s
+        self._parsed: Dict[str, MailMessage] = {}
+
+    def messages(self, since: float) -> List[MailMessage]:
+        result = []
+        for folder in ("new", "cur"):
+            try:
+                entries = list(os.scandir(self.path / folder))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                # Имя до ":" не меняется при переносе письма из new/ в cur/.
+                key = entry.name.split(":", 1)[0]
+                message = self._parsed.get(key)
+                if message is None:
+                    try:
+                        mtime = entry.stat().st_mtime
+                        if mtime < since:
+                            continue
+                        raw = Path(entry.path).read_bytes()
+                    except FileNotFoundError:
+                        continue
+                    message = self._parsed[key] = parse_message(raw, received_at=mtime)
+                result.append(message)
+        return result
+
+    def _signature(self) -> Tuple[int, ...]:
+        signature = []
+        for folder in ("new", "cur"):
+            try:
+                signature.append(os.stat(self.path / folder).st_mtime_ns)
+            except FileNotFoundError:
+                signature.append(0)
+        return tuple(signature)
+
+    def wait(self, timeout_s: float) -> None:
+        deadline = time.monotonic() + timeout_s
+        before = self._signature()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(self.poll_interval_s, remaining))
+            if self._signature() != before:
+                return
+
+    def deliver(self, message: EmailMessage) -> None:
+        """Кладёт письмо в new/ (так же, как это делает MDA); используется stand-in-ами."""
+
+        mailbox.Maildir(str(self.path), create=True).add(message)
+
+    def close(self) -> None:
+        pass
+
+
+class ImapMailbox:
+    """IMAP-ящик, открытый только на чтение (EXAMINE): письма не помечаются прочитанными.
+
+    Если сервер объявляет IDLE, wait() ждёт push-уведомления (* N EXISTS), иначе
+    делает NOOP раз в poll_interval_s. Время получения — INTERNALDATE письма.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        folder: str = "INBOX",
+        ssl: bool = True,
+        idle: bool = True,
+        poll_interval_s: float = 2.0,
+        timeout_s: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.folder = folder
+        self.ssl = ssl
+        self.idle = idle
+        self.poll_interval_s = poll_interval_s
+        self.timeout_s = timeout_s
+        self._conn: Optional[imaplib.IMAP4] = None
+        self._parsed: Dict[bytes, MailMessage] = {}
+
+    def _connect(self) -> imaplib.IMAP4:
+        if self._conn is None:
+            cls = imaplib.IMAP4_SSL if self.ssl else imaplib.IMAP4
+            conn = cls(self.host, self.port, timeout=self.timeout_s)
+            conn.login(self.user, self.password)
+            typ, _ = conn.select(self.folder, readonly=True)
+            if typ != "OK":
+                conn.logout()
+                raise RuntimeError(f"IMAP: не удалось открыть папку {self.folder!r}")
+            self._conn = conn
+        return self._conn
+
+    @property
+    def supports_idle(self) -> bool:
+        return self.idle and "IDLE" in self._connect().capabilities
+
+    def messages(self, since: float) -> List[MailMessage]:
+        conn = self._connect()
+        # SINCE в IMAP — дата без времени в часовом поясе сервера, поэтому берём день с запасом.
+        day = time.gmtime(since - 24 * 60 * 60)
+        typ, data = conn.uid("SEARCH", "SINCE", f"{day.tm_mday}-{MONTHS[day.tm_mon - 1]}-{day.tm_year}")
+        if typ != "OK":
+            raise RuntimeError(f"IMAP: поиск писем не удался: {data!r}")
+        uids = data[0].split() if data and data[0] else []
+
+        new_uids = [uid for uid in uids if uid not in self._parsed]
+        if new_uids:
+            typ, fetched = conn.uid("FETCH", b",".join(new_uids).decode(), "(INTERNALDATE BODY.PEEK[])")
+            if typ != "OK":
+                raise RuntimeError(f"IMAP: не удалось получить письма: {fetched!r}")
+            for item in fetched:
+                if not isinstance(item, tuple):
+                    continue
+                header, raw = item
+                match = _FETCH_UID.search(header)
+                internal = imaplib.Internaldate2tuple(header)
+                received_at = time.mktime(internal) if internal is not None else None
+                self._parsed[match.group(1) if match else header] = parse_message(raw, received_at=received_at)
+
+        return [message for message in self._parsed.values() if (message.received_at or since) >= since]
+
+    def wait(self, timeout_s: float) -> None:
+        conn = self._connect()
+        if self.supports_idle:
+            self._idle(conn, min(timeout_s, self.poll_interval_s * 15))
+        else:
+            time.sleep(min(timeout_s, self.poll_interval_s))
+            conn.noop()
+
+    def _idle(self, conn: imaplib.IMAP4, timeout_s: float) -> None:
+        """IDLE (RFC 2177): imaplib до Python 3.14 его не умеет, команда шлётся вручную.
+
+        Уведомление, успевшее попасть в буфер imaplib вместе с ответом "+",
+        select() не увидит — такое письмо найдётся по окончании отрезка IDLE,
+        поэтому отрезок ограничен (15 интервалов опроса).
+        """
+
+        tag = conn._new_tag()
+        conn.send(tag + b" IDLE\r\n")
+        if not conn.readline().startswith(b"+"):
+            raise RuntimeError("IMAP-сервер не принял IDLE")
+
+        sock = conn.socket()
+        deadline = time.monotonic() + timeout_s
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                pending = getattr(sock, "pending", lambda: 0)()
+                if not pending and not select.select([sock], [], [], remaining)[0]:
+                    break
+                line = conn.readline()
+                if not line:
+                    raise RuntimeError("IMAP-сервер закрыл соединение во время IDLE")
+                if line.startswith(b"*"):
+                    break
+        finally:
+            conn.send(b"DONE\r\n")
+            while True:
+                line = conn.readline()
+                if not line or line.startswith(tag):
+                    break
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.logout()
+            except (imaplib.IMAP4.error, OSError):
+                pass
+            self._conn = None
+
+
+Mailbox = Union[MaildirMailbox, ImapMailbox]
+
+
+def wait_for_code(source: Mailbox, matcher: OtpMatcher, since: float, timeout_s: float) -> str:
+    """Ждёт письмо с кодом, пришедшее не раньше since; проверка — сразу после изменения ящика."""
+
+    deadline = time.monotonic() + timeout_s
+    while True:
+        code = newest_code(source.messages(since), matcher, since)
+        if code is not None:
+            return code
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(f"Письмо с ОТП-кодом не пришло за {timeout_s:.0f} с")
+        source.wait(remaining)
@@ -0,0 +1,112 @@
+import email
+import html
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email import policy
+from email.message import EmailMessage
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+
+_TAGS = re.compile(r"<[^>]+>")
+
+# Заголовки, в которых ищется адрес получателя (у пересылок он часто не в To).
+RECIPIENT_HEADERS = ("To", "Delivered-To", "X-Original-To", "Cc")
+
+
+@dataclass(frozen=True)
+class MailMessage:
+    """Письмо в том виде, в каком его проверяет OtpMatcher.
+
+    received_at — время получения ящиком (IMAP INTERNALDATE, mtime файла в Maildir),
+    а без него — заголовок Date; None — время неизвестно.
+    """
+
+    sender: str
+    recipients: str
+    subject: str
+    text: str
+    received_at: Optional[float]
+
+
+def _header_timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def parse_message(raw: bytes, received_at: Optional[float] = None) -> MailMessage:
+    """Разбирает RFC 822-письмо; из HTML-тела (если нет text/plain) убираются теги."""
+
+    message = email.message_from_bytes(raw, policy=policy.default)
+    body = message.get_body(preferencelist=("plain", "html"))
+    text = ""
+    if body is not None:
+        try:
+            text = body.get_content()
+        except (KeyError, LookupError):
+            text = ""
+        if body.get_content_type() == "text/html":
+            text = html.unescape(_TAGS.sub(" ", text))
+
+    return MailMessage(
+        sender=str(message.get("From", "")),
+        recipients=", ".join(str(value) for name in RECIPIENT_HEADERS for value in message.get_all(name, [])),
+        subject=str(message.get("Subject", "")),
+        text=text,
+        received_at=received_at if received_at is not None else _header_timestamp(message.get("Date")),
+    )
+
+
+@dataclass(frozen=True)
+class OtpMatcher:
+    """Отбор писем с кодом: отправитель, получатель (если задан), свежесть и сам код."""
+
+    sender_pattern: str
+    code_pattern: str
+    recipient: Optional[str] = None
+
+    def code(self, message: MailMessage, since: float) -> Optional[str]:
+        if message.received_at is None or message.received_at < since:
+            return None
+        if not re.search(self.sender_pattern, message.sender, re.IGNORECASE):
+            return None
+        if self.recipient and self.recipient.lower() not in message.recipients.lower():
+            return None
+        for text in (message.subject, message.text):
+            match = re.search(self.code_pattern, text)
+            if match:
+                return match.group(1) if match.groups() else match.group(0)
+        return None
+
+
+def newest_code(messages: Iterable[MailMessage], matcher: OtpMatcher, since: float) -> Optional[str]:
+    """Код из самого свежего подходящего письма: повторный запрос кода присылает новое."""
+
+    best: Optional[MailMessage] = None
+    best_code: Optional[str] = None
+    for message in messages:
+        code = matcher.code(message, since)
+        if code is not None and (best is None or (message.received_at or 0) >= (best.received_at or 0)):
+            best, best_code = message, code
+    return best_code
+
+
+def otp_mail(recipient: str, code: str, sent_at: Optional[datetime] = None) -> EmailMessage:
+    """Письмо с кодом в формате Supercell ID — его отправляют stand-in-ы."""
+
+    message = EmailMessage()
+    message["From"] = "Supercell ID <noreply@id.supercell.com>"
+    message["To"] = recipient
+    message["Subject"] = "Supercell ID verification code"
+    message["Date"] = format_datetime(sent_at or datetime.now(timezone.utc))
+    message.set_content(f"Your verification code is {code}.\n\nThe code is valid for 10 minutes.\n")
+    message.add_alternative(f"<p>Your verification code is <b>{code}</b>.</p>", subtype="html")
+    return message
@@ -0,0 +1,83 @@
+import time
+from typing import Callable, Optional
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, OtpConfig, load_app_config
+from src.infrastructure.config.settings import MailboxSettings, SupercellSettings, load_mailbox_settings
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.otp.mailboxes import ImapMailbox, Mailbox, MaildirMailbox, wait_for_code
+from src.infrastructure.otp.messages import OtpMatcher
+
+
+OTP_MODE_MANUAL = "manual"
+OTP_MODE_EMAIL = "email"
+
+OtpProvider = Callable[[], str]
+
+
+def manual_otp_provider() -> str:
+    return input("Введите ОТП-код из письма Supercell: ")
+
+
+def open_mailbox(cfg: OtpConfig, settings: Optional[MailboxSettings] = None) -> Mailbox:
+    """Ящик по секции `otp:`; для IMAP учётные данные берутся из .env, если не переданы."""
+
+    if cfg.source == "maildir":
+        return MaildirMailbox(PROJECT_ROOT / cfg.maildir_path, poll_interval_s=cfg.maildir_poll_ms / 1000)
+    if cfg.source == "imap":
+        settings = settings or load_mailbox_settings()
+        return ImapMailbox(
+            host=cfg.imap_host,
+            port=cfg.imap_port,
+            user=settings.imap_user,
+            password=settings.imap_password,
+            folder=cfg.imap_mailbox,
+            ssl=cfg.imap_ssl,
+            idle=cfg.idle,
+            poll_interval_s=cfg.poll_interval_ms / 1000,
+        )
+    raise RuntimeError(f"Неизвестный источник ОТП {cfg.source!r} (ожидается imap или maildir)")
+
+
+class MailboxOtpProvider:
+    """ОТП из почтового ящика: код из самого свежего письма Supercell, пришедшего не раньше since.
+
+    Провайдер создаётся до запроса кода (start_login), поэтому since по умолчанию —
+    момент создания (с точностью до секунды, как IMAP INTERNALDATE): письма от
+    прошлых логинов отбрасываются как устаревшие.
+    """
+
+    def __init__(self, source: Mailbox, matcher: OtpMatcher, timeout_s: float, since: Optional[float] = None) -> None:
+        self.source = source
+        self.matcher = matcher
+        self.timeout_s = timeout_s
+        self.since = float(int(time.time())) if since is None else since
+
+    def __call__(self) -> str:
+        started = time.perf_counter()
+        try:
+            code = wait_for_code(self.source, self.matcher, self.since, self.timeout_s)
+        finally:
+            self.source.close()
+        log_event(
+            stage="otp",
+            status="ok",
+            message="OTP code received from mailbox",
+            data={"source": type(self.source).__name__, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)},
+        )
+        return code
+
+
+def default_otp_provider(settings: SupercellSettings) -> OtpProvider:
+    """Провайдер по OTP_MODE: manual — ввод в консоли, email — почтовый ящик из секции `otp:`."""
+
+    if settings.otp_mode == OTP_MODE_MANUAL:
+        return manual_otp_provider
+    if settings.otp_mode == OTP_MODE_EMAIL:
+        cfg = load_app_config().otp
+        return MailboxOtpProvider(
+            open_mailbox(cfg),
+            OtpMatcher(cfg.sender_pattern, cfg.code_pattern, recipient=settings.brawl_email),
+            timeout_s=cfg.wait_timeout_s,
+            since=time.time() - cfg.clock_skew_s,
+        )
+    raise RuntimeError(f"Неизвестный OTP_MODE {settings.otp_mode!r} (ожидается manual или email)")
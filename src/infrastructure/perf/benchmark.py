@@ -0,0 +1,181 @@
+"""Утилиты пер-стейдж бенчмарков: замер времени, подсчёт обращений к браузеру, baseline.
+
+Используются набором tests/bench, но не зависят от pytest.
+"""
+
+import inspect
+import json
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0..100) с линейной интерполяцией между соседними рангами."""
+
+    if not values:
+        raise ValueError("percentile() of empty sequence")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[int(rank)]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+# Проверенная сигнатура Connection._send_message_to_server (playwright 1.4x–1.6x):
+# (self, object, method, params, timeout, no_reply=False).
+_PATCHED_PARAMS = ("self", "object", "method")
+
+
+def _send_message_patchable(original: Any) -> bool:
+    try:
+        params = tuple(inspect.signature(original).parameters)
+    except (TypeError, ValueError):
+        return False
+    return params[: len(_PATCHED_PARAMS)] == _PATCHED_PARAMS
+
+
+class RoundTripCounter:
+    """Считает сообщения, отправленные из Python в драйвер Playwright.
+
+    Каждое такое сообщение — отдельный IPC-запрос к браузеру (round trip).
+    Хрупко: у Playwright нет публичного API для этого, и подсчёт делается через
+    обёртку над внутренним Connection._send_message_to_server. Обёртка ставится
+    только на время бенчмарка и только если сигнатура метода совпадает с
+    проверенной (_PATCHED_PARAMS); иначе active=False и счётчик остаётся нулевым,
+    а round trip-ы в сравнении с baseline не растут.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.by_method: Dict[str, int] = defaultdict(int)
+        self.active = False
+
+    @contextmanager
+    def installed(self) -> Iterator["RoundTripCounter"]:
+        try:
+            from playwright._impl._connection import Connection
+        except ImportError:
+            yield self
+            return
+
+        original: Optional[Callable[..., Any]] = getattr(Connection, "_send_message_to_server", None)
+        if original is None or not _send_message_patchable(original):
+            yield self
+            return
+
+        counter = self
+
+        def counting(connection: Any, object: Any, method: str, *args: Any, **kwargs: Any) -> Any:  # noqa: A002
+            counter.total += 1
+            counter.by_method[method] += 1
+            return original(connection, object, method, *args, **kwargs)
+
+        Connection._send_message_to_server = counting  # type: ignore[method-assign]
+        self.active = True
+        try:
+            yield self
+        finally:
+            Connection._send_message_to_server = original  # type: ignore[method-assign]
+            self.active = False
+
+
+@dataclass
+class StageStats:
+    """Распределение времени и round trip-ов одного стейджа."""
+
+    samples: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    round_trips_p50: float
+
+
+class StageRecorder:
+    """Копит замеры по стейджам: `with recorder.stage("proceed_to_checkout"): ...`."""
+
+    def __init__(self, counter: Optional[RoundTripCounter] = None) -> None:
+        self.counter = counter or RoundTripCounter()
+        self.durations_ms: Dict[str, List[float]] = defaultdict(list)
+        self.round_trips: Dict[str, List[int]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        trips_before = self.counter.total
+        started = time.perf_counter()
+        yield
+        self.durations_ms[name].append((time.perf_counter() - started) * 1000)
+        self.round_trips[name].append(self.counter.total - trips_before)
+
+    def summary(self) -> Dict[str, StageStats]:
+        result: Dict[str, StageStats] = {}
+        for name, durations in self.durations_ms.items():
+            result[name] = StageStats(
+                samples=len(durations),
+                p50_ms=percentile(durations, 50),
+                p95_ms=percentile(durations, 95),
+                p99_ms=percentile(durations, 99),
+                mean_ms=sum(durations) / len(durations),
+                round_trips_p50=percentile([float(x) for x in self.round_trips[name]], 50),
+            )
+        return result
+
+
+@dataclass
+class Regression:
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change_pct(self) -> float:
+        if self.baseline == 0:
+            return math.inf
+        return (self.current - self.baseline) / self.baseline * 100
+
+
+def save_baseline(path: Path, summary: Dict[str, StageStats]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {name: asdict(stats) for name, stats in sorted(summary.items())}
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, StageStats]]:
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return {name: StageStats(**stats) for name, stats in raw.items()}
+
+
+def compare_to_baseline(
+    current: Dict[str, StageStats],
+    baseline: Dict[str, StageStats],
+    threshold_pct: float,
+    min_delta_ms: float = 0,
+) -> List[Regression]:
+    """Возвращает стейджи, у которых p95 или медиана round trip-ов выросли сверх порога.
+
+    min_delta_ms отсекает «регрессии» в единицы миллисекунд на очень быстрых стейджах.
+    """
+
+    regressions: List[Regression] = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        limit = base.p95_ms * (1 + threshold_pct / 100)
+        if stats.p95_ms > limit and stats.p95_ms - base.p95_ms > min_delta_ms:
+            regressions.append(Regression(name, "p95_ms", base.p95_ms, stats.p95_ms))
+
+        if stats.round_trips_p50 > base.round_trips_p50:
+            regressions.append(Regression(name, "round_trips_p50", base.round_trips_p50, stats.round_trips_p50))
+    return regressions
@@ -0,0 +1,252 @@
+"""Профилирование памяти и CPU на границах span-ов (секция `profiling:` config.yaml).
+
+ResourceProfiler — наблюдатель span-ов (tracing.add_span_observer): на входе и
+выходе из span-а снимает память Python (tracemalloc) и RSS/CPU дерева процессов
+(тест, драйвер Playwright, Chromium), а в событие span-а пишет data.resources
+со значениями на выходе и приростом за span. На span-ах прогонов и flow к ним
+добавляется топ аллокаций, а LeakWatchdog сравнивает повторные прогоны flow.
+
+Дерево процессов читается из /proc без сторонних зависимостей; вне Linux
+остаются только данные tracemalloc.
+"""
+
+import os
+import threading
+import tracemalloc
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence
+
+from src.infrastructure.config.app_config import ProfilingConfig, load_app_config
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.logging.tracing import Span, add_span_observer, remove_span_observer
+
+
+PROC = Path("/proc")
+MB = 1024 * 1024
+
+# Span-ы, на которых снимается топ аллокаций и работает сторож утечек (снимок tracemalloc дорогой).
+SNAPSHOT_KINDS = frozenset({"run", "flow"})
+
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+@dataclass(frozen=True)
+class ProcessSample:
+    pid: int
+    ppid: int
+    name: str
+    rss_bytes: int
+    cpu_s: float
+
+
+def _page_size() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+def _clock_ticks() -> int:
+    try:
+        return os.sysconf("SC_CLK_TCK")
+    except (AttributeError, ValueError, OSError):
+        return 100
+
+
+def parse_proc_stat(raw: str, page_size: int, clock_ticks: int) -> ProcessSample:
+    """Строка /proc/<pid>/stat; имя процесса в скобках может содержать пробелы и скобки."""
+
+    lpar, rpar = raw.index("("), raw.rindex(")")
+    # После имени идут поля с 3-го: state, ppid, ... (см. proc(5)).
+    fields = raw[rpar + 2 :].split()
+    return ProcessSample(
+        pid=int(raw[:lpar]),
+        ppid=int(fields[1]),
+        name=raw[lpar + 1 : rpar],
+        rss_bytes=int(fields[21]) * page_size,
+        cpu_s=(int(fields[11]) + int(fields[12])) / clock_ticks,
+    )
+
+
+def process_tree(roots: Sequence[int], proc: Path = PROC) -> List[ProcessSample]:
+    """Процессы roots и все их потомки; пусто, если /proc недоступен."""
+
+    if not proc.is_dir():
+        return []
+    page_size, clock_ticks = _page_size(), _clock_ticks()
+    samples: Dict[int, ProcessSample] = {}
+    for entry in os.scandir(proc):
+        if not entry.name.isdigit():
+            continue
+        try:
+            raw = Path(entry.path, "stat").read_text(encoding="utf-8", errors="replace")
+            sample = parse_proc_stat(raw, page_size, clock_ticks)
+        except (OSError, ValueError, IndexError):
+            # Процесс завершился между scandir и чтением.
+            continue
+        samples[sample.pid] = sample
+
+    children: Dict[int, List[int]] = defaultdict(list)
+    for sample in samples.values():
+        children[sample.ppid].append(sample.pid)
+
+    tree: List[ProcessSample] = []
+    pending = [pid for pid in dict.fromkeys(roots) if pid in samples]
+    seen = set(pending)
+    while pending:
+        pid = pending.pop()
+        tree.append(samples[pid])
+        for child in children.get(pid, ()):
+            if child not in seen:
+                seen.add(child)
+                pending.append(child)
+    return tree
+
+
+def summarize_processes(processes: Iterable[ProcessSample]) -> Dict[str, Any]:
+    by_name: Dict[str, Dict[str, float]] = {}
+    rss = 0
+    cpu = 0.0
+    for process in processes:
+        rss += process.rss_bytes
+        cpu += process.cpu_s
+        entry = by_name.setdefault(process.name, {"count": 0, "rss_mb": 0.0})
+        entry["count"] += 1
+        entry["rss_mb"] += process.rss_bytes / MB
+    for entry in by_name.values():
+        entry["rss_mb"] = round(entry["rss_mb"], 1)
+    return {"rss_mb": round(rss / MB, 1), "cpu_s": round(cpu, 2), "by_name": by_name}
+
+
+def top_allocations(limit: int) -> List[Dict[str, Any]]:
+    """Крупнейшие места аллокаций по строкам кода (нужен включённый tracemalloc)."""
+
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+    return [
+        {
+            "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+class LeakWatchdog:
+    """Флаг утечки, если рост метрики устойчив на окне из window последних прогонов.
+
+    Рост устойчив, когда минимум второй половины окна выше максимума первой больше,
+    чем на порог: разовые всплески и шум GC так не срабатывают.
+    """
+
+    def __init__(self, window: int, thresholds: Dict[str, float]) -> None:
+        self.window = max(2, window)
+        self.thresholds = thresholds
+        self.history: Dict[str, Deque[Dict[str, float]]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def observe(self, name: str, sample: Dict[str, float]) -> List[str]:
+        history = self.history[name]
+        history.append(sample)
+        if len(history) < self.window:
+            return []
+
+        half = self.window // 2
+        flagged = []
+        for metric, threshold in self.thresholds.items():
+            values = [entry[metric] for entry in history if metric in entry]
+            if len(values) < self.window:
+                continue
+            growth = min(values[half:]) - max(values[:half])
+            if growth > threshold:
+                flagged.append(metric)
+                log_event(
+                    stage="resources.watchdog",
+                    status="warning",
+                    message=f"Sustained {metric} growth across {name} runs: recycle the browser context",
+                    data={"span": name, "metric": metric, "growth": round(growth, 1), "threshold": threshold, "values": values},
+                )
+        return flagged
+
+
+class ResourceProfiler:
+    """Наблюдатель span-ов: см. описание модуля."""
+
+    def __init__(self, cfg: ProfilingConfig, roots: Sequence[int]) -> None:
+        self.cfg = cfg
+        self.roots = list(roots)
+        self.watchdog = LeakWatchdog(cfg.leak_window, {"rss_mb": cfg.leak_rss_mb, "python_mb": cfg.leak_python_mb})
+        self._starts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def sample(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        result: Dict[str, Any] = {"python_mb": round(current / MB, 2), "python_peak_mb": round(peak / MB, 2)}
+        if self.cfg.process_tree:
+            result.update(summarize_processes(process_tree(self.roots)))
+        return result
+
+    def __call__(self, span: Span, phase: str) -> None:
+        if phase == "start":
+            sample = self.sample()
+            with self._lock:
+                self._starts[span.span_id] = sample
+            return
+
+        end = self.sample()
+        with self._lock:
+            start = self._starts.pop(span.span_id, None)
+        resources = dict(end)
+        if start is not None:
+            resources["delta"] = {
+                key: round(end[key] - start[key], 2)
+                for key in ("python_mb", "rss_mb", "cpu_s")
+                if key in end and key in start
+            }
+        if span.kind in SNAPSHOT_KINDS:
+            resources["top_allocations"] = top_allocations(self.cfg.top_n)
+            resources["leaks"] = self.watchdog.observe(span.name, end)
+        span.attrs["resources"] = resources
+
+
+_installed: Optional[ResourceProfiler] = None
+_started_tracemalloc = False
+
+
+def install_profiler(cfg: Optional[ProfilingConfig] = None, extra_roots: Sequence[int] = ()) -> Optional[ResourceProfiler]:
+    """Подключает профилировщик к span-ам, если он включён (None — выключен).
+
+    extra_roots — процессы вне дерева теста, например тёплый сервер браузера.
+    """
+
+    global _installed, _started_tracemalloc
+
+    cfg = cfg or load_app_config().profiling
+    if not cfg.enabled:
+        return None
+    if _installed is not None:
+        return _installed
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(cfg.traceback_frames)
+        _started_tracemalloc = True
+    _installed = ResourceProfiler(cfg, roots=[os.getpid(), *extra_roots])
+    add_span_observer(_installed)
+    return _installed
+
+
+def uninstall_profiler() -> None:
+    global _installed, _started_tracemalloc
+
+    if _installed is not None:
+        remove_span_observer(_installed)
+        _installed = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
@@ -0,0 +1,112 @@
+"""Потоковая оценка перцентилей с ограниченной памятью (логарифмические корзины, как в DDSketch).
+
+Значение v > 0 попадает в корзину ceil(log_gamma(v)); оценка перцентиля отличается
+от истинного значения не более чем на relative_accuracy (относительно). Память —
+не больше max_buckets корзин независимо от числа значений: при переполнении
+сливаются самые младшие корзины, т.е. страдает точность только нижних перцентилей.
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        """Добавляет неотрицательное значение (длительность); отрицательные считаются нулём."""
+
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        ordered = sorted(self.buckets)
+        lowest, next_key = ordered[0], ordered[1]
+        self.buckets[next_key] += self.buckets.pop(lowest)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other._gamma != self._gamma:
+            raise ValueError("cannot merge sketches with different relative_accuracy")
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка перцентиля q (0..100), как у benchmark.percentile; None для пустого скетча."""
+
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 100:
+            return self.max
+
+        # Ближайший ранг к позиции, которую интерполирует benchmark.percentile.
+        rank = round(q / 100 * (self.count - 1))
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Середина корзины (gamma^(k-1), gamma^k] в смысле относительной ошибки.
+                estimate = 2 * self._gamma ** key / (1 + self._gamma)
+                return min(max(estimate, self.min or 0.0), self.max or estimate)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(k): n for k, n in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(raw["relative_accuracy"], raw["max_buckets"])
+        sketch.buckets = {int(k): int(n) for k, n in raw["buckets"].items()}
+        sketch.zero_count = raw["zero_count"]
+        sketch.count = raw["count"]
+        sketch.total = raw["total"]
+        sketch.min = raw["min"]
+        sketch.max = raw["max"]
+        return sketch
@@ -0,0 +1,174 @@
+"""Адаптивные таймауты методов клиентов по истории span-ов в logs/events.ndjson.
+
+Для каждого метода (stage span-а kind=client) берётся перцентиль длительности
+успешных вызовов и вызовов, прерванных таймаутом; срок = перцентиль × factor в
+пределах [floor_ms, cap_ms]. Таймаут — цензурированное наблюдение: вызов длился бы
+не меньше применённого срока, поэтому он учитывается со сроком, а не выпадает
+(иначе слишком тесный срок удерживал бы сам себя). Прочие ошибки не учитываются.
+История ведётся по паре origin + метод (data.origin span-а): сроки stand-in или
+локального магазина не смешиваются со сроками боевого.
+Выученные перцентили кэшируются в .cache и пересчитываются раз в cache_ttl_s.
+
+    python -m src.infrastructure.perf.timeout_policy --rebuild
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, TimeoutPolicyConfig, load_app_config
+from src.infrastructure.logging import events
+from src.infrastructure.logging.report import iter_records, log_segments, parse_ts, record_duration_ms
+from src.infrastructure.perf.sketch import QuantileSketch
+
+
+LEARNED_KIND = "client"
+# Имя типа ошибки в data.error span-а: TimeoutError Playwright/asyncio, CompletionTimeoutError.
+TIMEOUT_ERROR_MARKER = "Timeout"
+
+
+def learned_key(stage: str, origin: Optional[str] = None) -> str:
+    """Ключ истории: метод, а если известен origin, к которому обращался клиент, — `origin stage`."""
+
+    return f"{origin} {stage}" if origin else stage
+
+
+def learned_sample_ms(record: Dict[str, Any]) -> Optional[float]:
+    """Длительность вызова для истории: успешного — как есть, прерванного таймаутом —
+    не меньше применённого срока (data.timeout_ms); прочие ошибки — None."""
+
+    duration = record_duration_ms(record)
+    if duration is None or record.get("status") == "ok":
+        return duration
+    data = record.get("data") or {}
+    error_type = str(data.get("error", "")).split(":", 1)[0]
+    if TIMEOUT_ERROR_MARKER not in error_type:
+        return None
+    timeout_ms = data.get("timeout_ms")
+    return max(duration, float(timeout_ms)) if isinstance(timeout_ms, (int, float)) else duration
+
+
+def learn_quantiles(
+    records: Iterable[Dict[str, Any]],
+    cfg: TimeoutPolicyConfig,
+    now: Optional[datetime] = None,
+) -> Dict[str, Dict[str, float]]:
+    """learned_key -> {"count": учтённых вызовов, "quantile_ms": перцентиль длительности}."""
+
+    since = (now or datetime.now(timezone.utc)) - timedelta(days=cfg.history_days)
+    sketches: Dict[str, QuantileSketch] = {}
+    for record in records:
+        data = record.get("data") or {}
+        if data.get("kind") != LEARNED_KIND:
+            continue
+        duration = learned_sample_ms(record)
+        if duration is None:
+            continue
+        try:
+            if parse_ts(record["ts"]) < since:
+                continue
+        except (KeyError, TypeError, ValueError):
+            continue
+        stage = learned_key(str(record.get("stage")), data.get("origin"))
+        sketch = sketches.get(stage)
+        if sketch is None:
+            sketch = sketches[stage] = QuantileSketch()
+        sketch.add(duration)
+
+    return {
+        stage: {"count": sketch.count, "quantile_ms": sketch.quantile(cfg.quantile)}
+        for stage, sketch in sketches.items()
+    }
+
+
+class TimeoutPolicy:
+    def __init__(self, learned: Dict[str, Dict[str, float]], cfg: TimeoutPolicyConfig) -> None:
+        self.learned = learned
+        self.cfg = cfg
+
+    def timeout_ms(self, stage: str, origin: Optional[str] = None) -> Optional[int]:
+        """Срок метода для origin или None, если истории мало (тогда действуют значения `playwright:`)."""
+
+        entry = self.learned.get(learned_key(stage, origin))
+        if entry is None or entry["count"] < self.cfg.min_samples:
+            return None
+        return round(min(max(entry["quantile_ms"] * self.cfg.factor, self.cfg.floor_ms), self.cfg.cap_ms))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            key: {**entry, "timeout_ms": self.timeout_ms(key)}
+            for key, entry in sorted(self.learned.items())
+        }
+
+
+def load_timeout_policy(
+    cfg: TimeoutPolicyConfig,
+    log_file: Optional[Path] = None,
+    cache_path: Optional[Path] = None,
+    rebuild: bool = False,
+) -> TimeoutPolicy:
+    """Политика из кэша, если он свежий и посчитан с теми же параметрами, иначе — по логу."""
+
+    cache_path = cache_path or PROJECT_ROOT / cfg.cache_path
+    params = {"quantile": cfg.quantile, "history_days": cfg.history_days, "keyed_by": "origin"}
+    if not rebuild:
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            cached = None
+        if (
+            cached is not None
+            and cached.get("params") == params
+            and time.time() - float(cached.get("built_at", 0)) <= cfg.cache_ttl_s
+        ):
+            return TimeoutPolicy(cached.get("learned", {}), cfg)
+
+    learned = learn_quantiles(iter_records(log_segments(log_file or events.LOG_FILE)), cfg)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    payload = {"built_at": time.time(), "params": params, "learned": learned}
+    tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(cache_path)
+    return TimeoutPolicy(learned, cfg)
+
+
+_default_policy: Optional[TimeoutPolicy] = None
+_default_lock = threading.Lock()
+
+
+def default_timeout_policy() -> Optional[TimeoutPolicy]:
+    """Общая политика процесса по секции `timeouts:` (None, если она выключена).
+
+    Лог читается один раз на процесс (и не чаще раза в cache_ttl_s между процессами).
+    """
+
+    global _default_policy
+
+    cfg = load_app_config().timeouts
+    if not cfg.enabled:
+        return None
+    with _default_lock:
+        if _default_policy is None or _default_policy.cfg != cfg:
+            _default_policy = load_timeout_policy(cfg)
+        return _default_policy
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """CLI: выученные сроки методов клиентов в JSON."""
+
+    parser = argparse.ArgumentParser(description="Адаптивные таймауты методов по logs/events.ndjson")
+    parser.add_argument("--rebuild", action="store_true", help="пересчитать по логу, не глядя на кэш")
+    args = parser.parse_args(argv)
+
+    policy = load_timeout_policy(load_app_config().timeouts, rebuild=args.rebuild)
+    json.dump(policy.as_dict(), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Локальный IMAP stand-in: один ящик INBOX в памяти для проверки OTP_MODE=email.
+
+Реализовано ровно то подмножество IMAP4rev1, которым пользуется ImapMailbox:
+CAPABILITY, LOGIN, SELECT/EXAMINE, NOOP, UID SEARCH (критерии игнорируются —
+отбор делает клиент), UID FETCH (UID, INTERNALDATE, BODY[]), IDLE и LOGOUT.
+Без TLS: ImapMailbox подключается к нему с ssl=False. Письма добавляются deliver().
+"""
+
+import imaplib
+import re
+import select
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import List, Optional, Tuple, Union
+
+
+_TOKENS = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+
+
+@dataclass
+class StoredMail:
+    uid: int
+    raw: bytes
+    received_at: float
+
+
+@dataclass
+class ImapStandInState:
+    messages: List[StoredMail] = field(default_factory=list)
+    changed: threading.Condition = field(default_factory=threading.Condition)
+
+
+def _tokens(line: str) -> List[str]:
+    return [plain or quoted for quoted, plain in _TOKENS.findall(line)]
+
+
+def _uid_set(spec: str, last_uid: int) -> List[int]:
+    uids: List[int] = []
+    for part in spec.split(","):
+        if ":" in part:
+            low, high = (last_uid if value == "*" else int(value) for value in part.split(":", 1))
+            uids.extend(range(min(low, high), max(low, high) + 1))
+        else:
+            uids.append(last_uid if part == "*" else int(part))
+    return uids
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_ImapServer"
+
+    def _write(self, line: Union[str, bytes]) -> None:
+        self.wfile.write((line.encode("utf-8") if isinstance(line, str) else line) + b"\r\n")
+        self.wfile.flush()
+
+    def _capabilities(self) -> str:
+        return "IMAP4rev1 IDLE" if self.server.idle else "IMAP4rev1"
+
+    def handle(self) -> None:
+        self._write(f"* OK [CAPABILITY {self._capabilities()}] IMAP stand-in ready")
+        authenticated = False
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            tokens = _tokens(raw.decode("utf-8", "replace").strip())
+            if len(tokens) < 2:
+                self._write("* BAD empty command")
+                continue
+            tag, command, args = tokens[0], tokens[1].upper(), tokens[2:]
+
+            if command == "CAPABILITY":
+                self._write(f"* CAPABILITY {self._capabilities()}")
+            elif command == "LOGIN":
+                authenticated = args == [self.server.user, self.server.password]
+                if not authenticated:
+                    self._write(f"{tag} NO [AUTHENTICATIONFAILED] invalid credentials")
+                    continue
+            elif command == "LOGOUT":
+                self._write("* BYE logging out")
+                self._write(f"{tag} OK LOGOUT completed")
+                return
+            elif not authenticated:
+                self._write(f"{tag} NO not authenticated")
+                continue
+            elif command in ("SELECT", "EXAMINE", "NOOP"):
+                self._write(f"* {self._count()} EXISTS")
+                if command != "NOOP":
+                    self._write("* OK [UIDVALIDITY 1] UIDs valid")
+            elif command == "UID" and args and args[0].upper() == "SEARCH":
+                self._write("* SEARCH " + " ".join(str(mail.uid) for mail in self._messages()))
+            elif command == "UID" and len(args) >= 2 and args[0].upper() == "FETCH":
+                self._fetch(args[1])
+            elif command == "IDLE" and self.server.idle:
+                self._idle()
+            else:
+                self._write(f"{tag} BAD unsupported command")
+                continue
+            self._write(f"{tag} OK {command} completed")
+
+    def _messages(self) -> List[StoredMail]:
+        with self.server.state.changed:
+            return list(self.server.state.messages)
+
+    def _count(self) -> int:
+        return len(self._messages())
+
+    def _fetch(self, spec: str) -> None:
+        messages = self._messages()
+        wanted = set(_uid_set(spec, messages[-1].uid if messages else 0))
+        for seq, mail in enumerate(messages, start=1):
+            if mail.uid not in wanted:
+                continue
+            internal = imaplib.Time2Internaldate(mail.received_at)
+            prefix = f"* {seq} FETCH (UID {mail.uid} INTERNALDATE {internal} BODY[] {{{len(mail.raw)}}}"
+            self.wfile.write(prefix.encode("ascii") + b"\r\n" + mail.raw + b")\r\n")
+        self.wfile.flush()
+
+    def _idle(self) -> None:
+        """Ждёт DONE от клиента; новые письма тем временем анонсируются как * N EXISTS."""
+
+        announced = self._count()
+        self._write("+ idling")
+        state = self.server.state
+        while True:
+            if select.select([self.connection], [], [], 0)[0]:
+                line = self.rfile.readline()
+                if not line or line.strip().upper() == b"DONE":
+                    return
+            with state.changed:
+                state.changed.wait(timeout=0.05)
+                count = len(state.messages)
+            if count != announced:
+                announced = count
+                self._write(f"* {count} EXISTS")
+
+
+class _ImapServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], user: str, password: str, idle: bool) -> None:
+        super().__init__(address, _Handler)
+        self.user = user
+        self.password = password
+        self.idle = idle
+        self.state = ImapStandInState()
+
+
+class ImapStandIn:
+    """Запускает IMAP stand-in в фоновом потоке. Порт 0 — выбрать свободный порт.
+
+    idle=False — сервер не объявляет IDLE (проверка отката клиента на опрос).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        user: str = "otp",
+        password: str = "otp",
+        idle: bool = True,
+    ) -> None:
+        self._server = _ImapServer((host, port), user=user, password=password, idle=idle)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return host, port
+
+    def deliver(self, message: Union[EmailMessage, bytes], received_at: Optional[float] = None) -> None:
+        raw = message if isinstance(message, bytes) else message.as_bytes()
+        state = self._server.state
+        with state.changed:
+            uid = state.messages[-1].uid + 1 if state.messages else 1
+            state.messages.append(StoredMail(uid=uid, raw=raw, received_at=received_at or time.time()))
+            state.changed.notify_all()
+
+    def start(self) -> "ImapStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="imap-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ImapStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
@@ -0,0 +1,458 @@
+"""Локальный stand-in Supercell Store + Google Pay для детерминированных офлайн-прогонов.
+
+Сервер отдаёт страницы, устроенные так, как их ожидают SupercellStoreClient и
+GooglePayClient: страница игры, форма логина и ОТП, карточки товаров, корзина,
+Checkout, попап Google Pay и страница аккаунта с Payment information и Log out.
+
+Переключение сценария на stand-in — через `supercell.base_url` / `account_url`
+в config.yaml. Искусственная задержка ответа — `standin.latency_ms` / `jitter_ms`.
+
+Служебные эндпоинты (не используются клиентами):
+- GET /__standin/health — проверка живости;
+- GET /__standin/otp?email=... — последний выданный ОТП-код (для автоматического ввода);
+- GET /__standin/state — JSON с заказами и привязанными способами оплаты.
+
+Выданный ОТП можно ещё и «отправить письмом»: add_mail_sink() (например,
+MaildirMailbox.deliver или ImapStandIn.deliver), а в CLI — --maildir.
+"""
+
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config
+from src.infrastructure.otp.mailboxes import MaildirMailbox
+from src.infrastructure.otp.messages import otp_mail
+
+
+GAME_TITLES: Dict[str, str] = {
+    "brawlstars": "Brawl Stars",
+    "clashroyale": "Clash Royale",
+    "clashofclans": "Clash of Clans",
+    "hayday": "Hay Day",
+    "squadbusters": "Squad Busters",
+}
+
+# slug товара -> отображаемое имя
+PRODUCTS: Dict[str, str] = {
+    "80-gems": "80 Gems",
+    "170-gems": "170 Gems",
+    "360-gems": "360 Gems",
+    "950-gems": "950 Gems",
+}
+
+SESSION_COOKIE = "standin_sid"
+GAME_COOKIE = "standin_game"
+
+
+def game_title(slug: str) -> str:
+    return GAME_TITLES.get(slug, slug.replace("-", " ").title())
+
+
+@dataclass
+class StandInState:
+    """Состояние stand-in: сессии, выданные ОТП, заказы, привязанные карты."""
+
+    sessions: Dict[str, str] = field(default_factory=dict)  # sid -> email
+    pending_email: Dict[str, str] = field(default_factory=dict)  # pre-login sid -> email
+    otp_codes: Dict[str, str] = field(default_factory=dict)  # email -> code
+    payment_attached: Dict[str, bool] = field(default_factory=dict)  # email -> есть карта
+    orders: List[Dict[str, object]] = field(default_factory=list)
+    # Куда отправлять письмо с ОТП (как почтовый сервер Supercell).
+    mail_sinks: List[Callable[[EmailMessage], None]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        "<!doctype html><html lang='en'><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title></head><body>{body}</body></html>"
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_StandInHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    # -------------------- Утилиты --------------------
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002 - сигнатура базового класса
+        return
+
+    def _delay(self) -> None:
+        latency_ms = self.server.latency_ms
+        if self.server.jitter_ms:
+            latency_ms += random.uniform(0, self.server.jitter_ms)
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+    def _cookies(self) -> Dict[str, str]:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return {key: morsel.value for key, morsel in cookie.items()}
+
+    def _current_email(self) -> Optional[str]:
+        sid = self._cookies().get(SESSION_COOKIE)
+        with self.server.state.lock:
+            return self.server.state.sessions.get(sid or "")
+
+    def _form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        return {key: values[0] for key, values in parse_qs(raw).items()}
+
+    def _send(
+        self,
+        status: int,
+        body: str = "",
+        content_type: str = "text/html; charset=utf-8",
+        headers: Optional[List[Tuple[str, str]]] = None,
+    ) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers or []:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _redirect(self, location: str, headers: Optional[List[Tuple[str, str]]] = None) -> None:
+        self._send(303, headers=[("Location", location), *(headers or [])])
+
+    # -------------------- Маршрутизация --------------------
+    def do_GET(self) -> None:  # noqa: N802 - имя задаёт BaseHTTPRequestHandler
+        self._delay()
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if parts[:1] == ["__standin"]:
+            return self._service(parts[1:], query)
+        if parts == ["login"]:
+            return self._send(200, self._login_page())
+        if parts == ["login", "code"]:
+            return self._send(200, self._otp_page())
+        if parts == ["checkout"]:
+            return self._send(200, self._checkout_page())
+        if parts == ["gpay"]:
+            return self._send(200, self._gpay_page())
+        if parts == ["account"]:
+            return self._account()
+        if parts == ["logout"]:
+            return self._logout()
+        if len(parts) == 1:
+            return self._game_page(parts[0])
+        if len(parts) == 3 and parts[1] == "product" and parts[2] in PRODUCTS:
+            return self._send(200, self._product_page(parts[0], parts[2]))
+        self._send(404, _page("Not found", "<h1>Page not found</h1>"))
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._delay()
+        path = urlsplit(self.path).path
+        form = self._form()
+
+        if path == "/login":
+            return self._login_submit(form)
+        if path == "/login/code":
+            return self._otp_submit(form)
+        if path == "/gpay/confirm":
+            return self._gpay_confirm()
+        if path == "/account/payment/remove":
+            return self._remove_payment()
+        self._send(404, "", content_type="text/plain")
+
+    # -------------------- Служебные эндпоинты --------------------
+    def _service(self, parts: List[str], query: Dict[str, str]) -> None:
+        state = self.server.state
+        if parts == ["health"]:
+            return self._send(200, "ok", content_type="text/plain")
+        if parts == ["otp"]:
+            with state.lock:
+                code = state.otp_codes.get(query.get("email", "").lower())
+            if code is None:
+                return self._send(404, "", content_type="text/plain")
+            return self._send(200, code, content_type="text/plain")
+        if parts == ["state"]:
+            with state.lock:
+                snapshot = {
+                    "sessions": len(state.sessions),
+                    "orders": list(state.orders),
+                    "payment_attached": dict(state.payment_attached),
+                }
+            return self._send(200, json.dumps(snapshot), content_type="application/json")
+        self._send(404, "", content_type="text/plain")
+
+    # -------------------- Магазин игры и товары --------------------
+    def _header(self) -> str:
+        if self._current_email() is None:
+            return "<nav><a href='/login'>Log in</a></nav>"
+        return "<nav><a href='/account'>Account</a></nav>"
+
+    def _game_page(self, slug: str) -> None:
+        title = game_title(slug)
+        products = "".join(
+            f"<li><a href='/{slug}/product/{product}'>{html.escape(name)}</a></li>"
+            for product, name in PRODUCTS.items()
+        )
+        body = (
+            f"{self._header()}<main><h1>Discover {html.escape(title)} Store</h1>"
+            f"<ul class='products'>{products}</ul></main>"
+        )
+        self._send(
+            200,
+            _page(f"{title} Store", body),
+            headers=[("Set-Cookie", f"{GAME_COOKIE}={slug}; Path=/")],
+        )
+
+    def _product_page(self, slug: str, product: str) -> str:
+        name = PRODUCTS[product]
+        body = (
+            f"{self._header()}<main><h1>{html.escape(name)}</h1>"
+            "<button id='buy' type='button'>Buy</button>"
+            "<form id='cart' action='/checkout' method='get' hidden>"
+            f"<input type='hidden' name='product' value='{product}'>"
+            "<button type='button' aria-label='Decrease' "
+            "onclick=\"const q=document.getElementById('qty');q.value=Math.max(1,q.value-1)\">-</button>"
+            "<input id='qty' type='number' name='quantity' value='2' min='1' aria-label='Quantity'>"
+            "<button type='submit'>Checkout</button></form>"
+            "<script>document.getElementById('buy').addEventListener('click',()=>{"
+            "document.getElementById('cart').hidden=false;});</script></main>"
+        )
+        return _page(f"{name} – {game_title(slug)} Store", body)
+
+    def _checkout_page(self) -> str:
+        body = (
+            "<main><h1>Checkout</h1><p>Select a payment method</p>"
+            "<button type='button' onclick=\"window.open('/gpay','gpay','popup,width=480,height=640')\">"
+            "Google Pay</button></main>"
+        )
+        return _page("Checkout", body)
+
+    # -------------------- Логин по email + ОТП --------------------
+    def _login_page(self) -> str:
+        body = (
+            "<main><h1>Supercell ID</h1><form method='post' action='/login'>"
+            "<label for='email'>Email</label><input id='email' name='email' type='email'>"
+            "<button type='submit'>Continue</button></form></main>"
+        )
+        return _page("Supercell ID", body)
+
+    def _otp_page(self) -> str:
+        body = (
+            "<main><h1>Check your email</h1><form method='post' action='/login/code'>"
+            "<label for='code'>Verification code</label>"
+            "<input id='code' name='code' type='tel' autocomplete='one-time-code'>"
+            "<button type='submit'>Log in</button></form></main>"
+        )
+        return _page("Supercell ID", body)
+
+    def _login_submit(self, form: Dict[str, str]) -> None:
+        email = form.get("email", "").strip().lower()
+        if not email:
+            return self._send(400, self._login_page())
+
+        pre_sid = self._cookies().get(SESSION_COOKIE) or secrets.token_hex(16)
+        code = f"{secrets.randbelow(1_000_000):06d}"
+        state = self.server.state
+        with state.lock:
+            state.pending_email[pre_sid] = email
+            state.otp_codes[email] = code
+            sinks = list(state.mail_sinks)
+        for sink in sinks:
+            sink(otp_mail(email, code))
+        self._redirect("/login/code", headers=[("Set-Cookie", f"{SESSION_COOKIE}={pre_sid}; Path=/")])
+
+    def _otp_submit(self, form: Dict[str, str]) -> None:
+        cookies = self._cookies()
+        pre_sid = cookies.get(SESSION_COOKIE, "")
+        state = self.server.state
+        with state.lock:
+            email = state.pending_email.get(pre_sid)
+            valid = email is not None and state.otp_codes.get(email) == form.get("code", "").strip()
+            if valid:
+                assert email is not None
+                del state.pending_email[pre_sid]
+                del state.otp_codes[email]
+                sid = secrets.token_hex(16)
+                state.sessions[sid] = email
+                # Каждый логин начинается с привязанной картой, чтобы прогоны были одинаковыми.
+                state.payment_attached[email] = True
+        if not valid:
+            return self._send(401, self._otp_page().replace("</form>", "<p role='alert'>Invalid code</p></form>"))
+
+        slug = cookies.get(GAME_COOKIE, "brawlstars")
+        self._redirect(f"/{slug}", headers=[("Set-Cookie", f"{SESSION_COOKIE}={sid}; Path=/; HttpOnly")])
+
+    def _logout(self) -> None:
+        cookies = self._cookies()
+        with self.server.state.lock:
+            self.server.state.sessions.pop(cookies.get(SESSION_COOKIE, ""), None)
+        slug = cookies.get(GAME_COOKIE, "brawlstars")
+        self._redirect(f"/{slug}", headers=[("Set-Cookie", f"{SESSION_COOKIE}=; Path=/; Max-Age=0")])
+
+    # -------------------- Google Pay --------------------
+    def _gpay_page(self) -> str:
+        # Шаги рендерятся по одному, чтобы на странице был только текущий input (как у Google).
+        script = """
+const steps = [
+  "<label for='identifierId'>Email or phone</label><input id='identifierId' type='email'>",
+  "<label for='password'>Password</label><input id='password' type='password'>",
+  "<label for='backup'>Enter code</label><input id='backup' type='tel'>",
+];
+let step = 0;
+const root = document.getElementById('step');
+function render() {
+  if (step < steps.length) {
+    root.innerHTML = steps[step] + "<button type='button' id='next'>Next</button>";
+    document.getElementById('next').addEventListener('click', () => { step += 1; render(); });
+  } else {
+    root.innerHTML = "<p>Confirm your purchase</p><button type='button' id='pay'>Pay</button>";
+    document.getElementById('pay').addEventListener('click', async () => {
+      await fetch('/gpay/confirm', {method: 'POST'});
+      root.innerHTML = "<p id='result'>Payment complete</p>";
+    });
+  }
+}
+render();
+"""
+        body = f"<main><h1>Sign in with Google</h1><div id='step'></div><script>{script}</script></main>"
+        return _page("Google Pay", body)
+
+    def _gpay_confirm(self) -> None:
+        email = self._current_email()
+        with self.server.state.lock:
+            self.server.state.orders.append({"email": email, "ts": time.time()})
+        self._send(200, json.dumps({"status": "ok"}), content_type="application/json")
+
+    # -------------------- Аккаунт --------------------
+    def _account(self) -> None:
+        email = self._current_email()
+        if email is None:
+            slug = self._cookies().get(GAME_COOKIE, "brawlstars")
+            return self._redirect(f"/{slug}")
+
+        with self.server.state.lock:
+            attached = self.server.state.payment_attached.get(email, False)
+        payment = (
+            "<p>Visa •••• 4242</p>"
+            "<button type='button' id='remove' onclick=\"this.hidden=true;document.getElementById('confirm').hidden=false\">"
+            "Remove</button>"
+            "<div id='confirm' role='dialog' hidden><p>Remove this card?</p>"
+            "<form method='post' action='/account/payment/remove'><button type='submit'>Confirm</button></form>"
+            "</div>"
+            if attached
+            else "<p>No saved payment methods</p>"
+        )
+        body = (
+            f"<main><h1>Account</h1><p>{html.escape(email)}</p>"
+            f"<section><h2>Payment information</h2>{payment}</section>"
+            "<a href='/logout'>Log out</a></main>"
+        )
+        self._send(200, _page("Account", body))
+
+    def _remove_payment(self) -> None:
+        email = self._current_email()
+        if email is not None:
+            with self.server.state.lock:
+                self.server.state.payment_attached[email] = False
+        self._redirect("/account")
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency_ms: float, jitter_ms: float) -> None:
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.state = StandInState()
+
+
+class SupercellStoreStandIn:
+    """Запускает stand-in в фоновом потоке. Порт 0 — выбрать свободный порт."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0, jitter_ms: float = 0) -> None:
+        self._server = _StandInHTTPServer((host, port), latency_ms=latency_ms, jitter_ms=jitter_ms)
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls) -> "SupercellStoreStandIn":
+        cfg = load_app_config().standin
+        standin = cls(host=cfg.host, port=cfg.port, latency_ms=cfg.latency_ms, jitter_ms=cfg.jitter_ms)
+        if cfg.maildir:
+            standin.add_mail_sink(MaildirMailbox(PROJECT_ROOT / cfg.maildir).deliver)
+        return standin
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def state(self) -> StandInState:
+        return self._server.state
+
+    def set_latency(self, latency_ms: float, jitter_ms: float = 0) -> None:
+        self._server.latency_ms = latency_ms
+        self._server.jitter_ms = jitter_ms
+
+    def add_mail_sink(self, sink: Callable[[EmailMessage], None]) -> None:
+        with self.state.lock:
+            self.state.mail_sinks.append(sink)
+
+    def latest_otp(self, email: str) -> Optional[str]:
+        with self.state.lock:
+            return self.state.otp_codes.get(email.lower())
+
+    def start(self) -> "SupercellStoreStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="supercell-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "SupercellStoreStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    cfg = load_app_config().standin
+    parser = argparse.ArgumentParser(description="Локальный stand-in Supercell Store + Google Pay")
+    parser.add_argument("--host", default=cfg.host)
+    parser.add_argument("--port", type=int, default=cfg.port)
+    parser.add_argument("--latency-ms", type=float, default=cfg.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=cfg.jitter_ms)
+    parser.add_argument("--maildir", default=cfg.maildir, help="класть письма с ОТП в этот Maildir")
+    args = parser.parse_args(argv)
+
+    server = _StandInHTTPServer((args.host, args.port), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    if args.maildir:
+        server.state.mail_sinks.append(MaildirMailbox(PROJECT_ROOT / args.maildir).deliver)
+    host, port = server.server_address[:2]
+    print(f"Supercell Store stand-in: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
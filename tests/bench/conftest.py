@@ -0,0 +1,91 @@
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+import pytest
+
+from src.infrastructure.config.app_config import AppConfig, load_app_config, override_app_config
+from src.infrastructure.config.settings import SupercellSettings
+from src.infrastructure.logging import events
+from src.infrastructure.standin.supercell_store_standin import SupercellStoreStandIn
+
+
+BENCH_EMAIL = "bench@standin.test"
+
+
+@pytest.fixture(scope="session")
+def standin() -> Iterator[SupercellStoreStandIn]:
+    """Локальный stand-in Supercell Store с задержкой из секции `bench:` config.yaml."""
+
+    server = SupercellStoreStandIn.from_config()
+    server.set_latency(load_app_config().bench.standin_latency_ms)
+    with server:
+        yield server
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_event_log(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """События и span-ы бенчмарка пишутся во временный лог, а не в logs/events.ndjson.
+
+    Миллисекундные span-ы stand-in иначе попали бы в историю TimeoutPolicy живых прогонов.
+    """
+
+    # Фоновый писатель мог уже открыть logs/events.ndjson: следующее событие создаст новый.
+    events.shutdown_event_writer()
+    patcher = pytest.MonkeyPatch()
+    patcher.setattr(events, "LOG_FILE", tmp_path_factory.mktemp("bench-events") / "events.ndjson")
+    yield events.log_file()
+    events.shutdown_event_writer()
+    patcher.undo()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_app_config(standin: SupercellStoreStandIn) -> Iterator[AppConfig]:
+    """Направляем все flow-ы на stand-in, отключаем переиспользование сессий и адаптивные таймауты.
+
+    Без этого логин после первой итерации брался бы из кэша и бенчмарк мерил бы пробу,
+    а сроки из истории живых прогонов (и их кэш в .cache) смешивались бы с замерами.
+    """
+
+    base = load_app_config()
+    config = replace(
+        base,
+        supercell=replace(base.supercell, base_url=standin.base_url, account_url=f"{standin.base_url}/account"),
+        sessions=replace(base.sessions, enabled=False),
+        timeouts=replace(base.timeouts, enabled=False),
+    )
+    with override_app_config(config):
+        yield config
+
+
+@pytest.fixture(scope="session")
+def supercell_settings() -> SupercellSettings:
+    """Синтетический аккаунт: stand-in принимает любой email."""
+
+    return SupercellSettings(brawl_email=BENCH_EMAIL)
+
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args: Dict) -> Dict:
+    """Без записи видео: кодирование видео добавляет шум в замеры."""
+
+    extra = dict(browser_context_args)
+    extra.pop("record_video_dir", None)
+    return extra
+
+
+@pytest.fixture
+def standin_otp(standin: SupercellStoreStandIn) -> Callable[[], str]:
+    """Автоматический ОТП: ждём, пока stand-in выдаст код для BENCH_EMAIL."""
+
+    def provider() -> str:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            code = standin.latest_otp(BENCH_EMAIL)
+            if code is not None:
+                return code
+            time.sleep(0.01)
+        raise RuntimeError("Stand-in не выдал ОТП-код за 10 секунд")
+
+    return provider
@@ -0,0 +1,119 @@
+from dataclasses import asdict
+from typing import Callable, Dict
+
+import pytest
+from playwright.sync_api import Browser
+
+from src.application.flows.finalize_supercell_session import finalize_supercell_session
+from src.application.flows.login_supercell import login_supercell_with_manual_otp
+from src.infrastructure.browser.har_replay import default_har_routing
+from src.infrastructure.browser.supercell_store_client import SupercellStoreClient
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config
+from src.infrastructure.config.settings import SupercellSettings
+from src.infrastructure.logging.events import log_event
+from src.infrastructure.perf.benchmark import (
+    RoundTripCounter,
+    StageRecorder,
+    compare_to_baseline,
+    load_baseline,
+    save_baseline,
+)
+
+
+pytestmark = pytest.mark.bench
+
+
+def _run_iteration(
+    browser: Browser,
+    context_args: Dict,
+    recorder: StageRecorder,
+    settings: SupercellSettings,
+    otp_provider: Callable[[], str],
+) -> None:
+    """Один проход всех стейджей в свежем контексте браузера."""
+
+    config = load_app_config()
+    context = browser.new_context(**context_args)
+    context.set_default_timeout(config.playwright.page_timeout_ms)
+    context.set_default_navigation_timeout(config.playwright.navigation_timeout_ms)
+    # С --har-mode replay стейджи меряются по записанным HAR, без сети и её разброса.
+    default_har_routing(context)
+    page = context.new_page()
+
+    try:
+        client = SupercellStoreClient(page=page, base_url=config.supercell.base_url, game_slug=config.supercell.game_slug)
+
+        with recorder.stage("login_supercell_with_manual_otp"):
+            login_supercell_with_manual_otp(page, settings, otp_provider=otp_provider)
+
+        with recorder.stage("open_store"):
+            client.open_store()
+        with recorder.stage("go_to_product_80_gems"):
+            client.go_to_product_80_gems()
+        with recorder.stage("add_to_cart_single_quantity"):
+            client.add_to_cart_single_quantity()
+        with recorder.stage("proceed_to_checkout"):
+            client.proceed_to_checkout()
+
+        with recorder.stage("open_account_page"):
+            client.open_account_page(account_url=config.supercell.account_url)
+        with recorder.stage("detach_payment_method"):
+            client.detach_payment_method()
+        with recorder.stage("logout_supercell"):
+            client.logout_supercell()
+
+        # Финализация целиком логаутит пользователя, поэтому меряем её после повторного логина.
+        with recorder.stage("login_supercell_with_manual_otp"):
+            login_supercell_with_manual_otp(page, settings, otp_provider=otp_provider)
+        with recorder.stage("finalize_supercell_session"):
+            finalize_supercell_session(page)
+    finally:
+        context.close()
+
+
+def test_stage_benchmarks(
+    request: pytest.FixtureRequest,
+    browser: Browser,
+    browser_context_args: Dict,
+    supercell_settings: SupercellSettings,
+    standin_otp: Callable[[], str],
+) -> None:
+    """Пер-стейдж бенчмарк против stand-in с гейтом по baseline.
+
+    Запускается явно (`pytest -m bench`). Baseline записывается только с опцией
+    --bench-update-baseline; без неё отсутствующий baseline — ошибка, а не зелёный прогон.
+    """
+
+    bench_cfg = load_app_config().bench
+    counter = RoundTripCounter()
+    recorder = StageRecorder(counter)
+
+    with counter.installed():
+        for _ in range(bench_cfg.iterations):
+            _run_iteration(browser, browser_context_args, recorder, supercell_settings, standin_otp)
+
+    summary = recorder.summary()
+    log_event(
+        stage="bench",
+        status="ok",
+        message=f"Stage benchmark: {bench_cfg.iterations} iterations",
+        data={name: asdict(stats) for name, stats in summary.items()},
+    )
+
+    baseline_path = PROJECT_ROOT / bench_cfg.baseline_path
+    if request.config.getoption("--bench-update-baseline"):
+        save_baseline(baseline_path, summary)
+        return
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        pytest.fail(f"Нет baseline {bench_cfg.baseline_path}: запишите его запуском с --bench-update-baseline")
+
+    regressions = compare_to_baseline(
+        summary,
+        baseline,
+        threshold_pct=bench_cfg.threshold_pct,
+        min_delta_ms=bench_cfg.min_delta_ms,
+    )
+    assert not regressions, "Регрессии относительно baseline:\n" + "\n".join(
+        f"  {r.stage}.{r.metric}: {r.baseline:.1f} -> {r.current:.1f} ({r.change_pct:+.0f}%)" for r in regressions
+    )
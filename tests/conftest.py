@@ -1,17 +1,76 @@
 import os
+import tempfile
+import uuid
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterator, Optional
 
 import pytest
-from playwright.sync_api import BrowserContext, Page
+from playwright.sync_api import Browser, BrowserContext, Page
 from playwright.sync_api import expect as playwright_expect
 
-from src.infrastructure.config.settings import load_settings
-from src.infrastructure.logging.events import log_event
+from src.infrastructure.browser.browser_server import probe as probe_browser_server
+from src.infrastructure.browser.browser_server import warm_connect_options
+from src.infrastructure.browser.context_pool import BrowserContextPool, default_context_pool
+from src.infrastructure.browser.failure_artifacts import (
+    ArtifactStore,
+    default_artifact_store,
+    start_test_trace,
+    stop_test_trace,
+)
+from src.infrastructure.browser.har_replay import default_har_routing
+from src.infrastructure.browser.network_policy import (
+    default_network_policy,
+    install_network_policy,
+    network_stats,
+)
+from src.infrastructure.config.app_config import PROJECT_ROOT, load_app_config, override_app_config
+from src.infrastructure.config.settings import (
+    GooglePaySettings,
+    ProxySettings,
+    SupercellSettings,
+    load_google_pay_settings,
+    load_proxy_settings,
+    load_settings,
+    load_supercell_settings,
+)
+from src.infrastructure.logging.events import log_event, shutdown_event_writer
+from src.infrastructure.logging.tracing import run as trace_run
+from src.infrastructure.perf.resources import install_profiler, uninstall_profiler
 
 
-ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts"
-ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        "--bench-update-baseline",
+        action="store_true",
+        default=False,
+        help="Перезаписать baseline бенчмарков (tests/bench) текущими замерами",
+    )
+    parser.addoption(
+        "--har-mode",
+        choices=("off", "record", "replay"),
+        default=None,
+        help="Режим HAR вместо `har.mode` из config.yaml: record — записать живой прогон, replay — без сети",
+    )
+    parser.addoption(
+        "--no-preflight",
+        action="store_true",
+        default=False,
+        help="Не проверять магазин HTTP pre-flight перед e2e-тестами (секция `preflight:`)",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _har_mode_option(request) -> Iterator[None]:
+    """Применяет --har-mode поверх config.yaml на всю сессию."""
+
+    mode = request.config.getoption("--har-mode")
+    if mode is None:
+        yield
+        return
+    config = load_app_config()
+    with override_app_config(replace(config, har=replace(config.har, mode=mode))):
+        yield
 
 
 @pytest.fixture(scope="session")
@@ -21,43 +80,171 @@ def settings():
     return load_settings()
 
 
+# Flow-ы запрашивают только нужные им секреты: smoke-тесту не нужен ни один,
+# и отсутствие GOOGLE_* в .env не мешает логину.
+@pytest.fixture(scope="session")
+def supercell_settings() -> SupercellSettings:
+    return load_supercell_settings()
+
+
+@pytest.fixture(scope="session")
+def google_pay_settings() -> GooglePaySettings:
+    return load_google_pay_settings()
+
+
+@pytest.fixture(scope="session")
+def proxy_settings() -> ProxySettings:
+    return load_proxy_settings()
+
+
+@pytest.fixture(scope="session")
+def connect_options(browser_name: str) -> Optional[Dict]:
+    """Подключение к тёплому браузер-серверу, если он запущен; иначе pytest-playwright запускает браузер сам."""
+
+    return warm_connect_options(browser_name)
+
+
 @pytest.fixture(scope="session")
-def browser_context_args(browser_context_args: Dict, settings) -> Dict:
+def browser_context_args(browser_context_args: Dict, proxy_settings: ProxySettings) -> Dict:
     """Дополняем опции браузерного контекста прокси и базовыми настройками.
 
     По аналогии с Nx-конфигами runner'а, здесь храним все e2e-настройки окружения,
     а доменный код об этом ничего не знает.
     """
 
-    proxy_server = settings.http_proxy or settings.https_proxy
+    proxy_server = proxy_settings.server
 
     extra: Dict = {**browser_context_args}
     if proxy_server:
         extra["proxy"] = {"server": proxy_server}
 
-    # Включаем запись видео на уровне контекста, чтобы при падении иметь артефакты.
-    extra.setdefault("record_video_dir", str(ARTIFACTS_DIR / "video"))
+    # Видео — только по явному `artifacts.video: true`: кодирование нагружает каждый тест,
+    # а для разбора падений обычно хватает trace и скриншота.
+    artifacts = load_app_config().artifacts
+    if artifacts.video:
+        extra.setdefault("record_video_dir", str(PROJECT_ROOT / artifacts.directory / "video"))
 
     return extra
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _resource_profiling() -> Iterator[None]:
+    """Профилирование памяти/CPU на границах span-ов, если включено в `profiling:`."""
+
+    if not load_app_config().profiling.enabled:
+        yield
+        return
+
+    # Браузер тёплого сервера — не потомок процесса теста, его дерево добавляется отдельно.
+    health = probe_browser_server() if load_app_config().browser_server.enabled else None
+    install_profiler(extra_roots=[health["pid"]] if health and "pid" in health else ())
+    try:
+        yield
+    finally:
+        uninstall_profiler()
+
+
 @pytest.fixture(autouse=True)
+def _trace_run(request):
+    """Каждый тест — отдельный прогон со своим run_id во всех событиях и span-ах."""
+
+    with trace_run(name="test", test=request.node.nodeid):
+        yield
+
+
 def _configure_timeouts(context: BrowserContext) -> None:
-    """Глобально настраиваем таймауты для всех тестов.
+    """Глобально настраиваем таймауты контекста из секции `playwright:` config.yaml."""
+
+    timeouts = load_app_config().playwright
+    context.set_default_timeout(timeouts.page_timeout_ms)
+    context.set_default_navigation_timeout(timeouts.navigation_timeout_ms)
+
 
-    Используем значения по умолчанию; при необходимости можно связать с config.yaml.
+def _configure_context(context: BrowserContext) -> None:
+    """Общая настройка каждого контекста: таймауты и сетевая политика (секция `network:`).
+
+    Роутинг нельзя передать через browser_context_args (это опции new_context),
+    поэтому он ставится здесь, сразу после создания или сброса контекста в пуле.
     """
 
-    # 30 cекунд на любые действия и 45 секунд на навигацию
-    context.set_default_timeout(30_000)
-    context.set_default_navigation_timeout(45_000)
+    _configure_timeouts(context)
+    policy = default_network_policy()
+    if policy is not None:
+        install_network_policy(context, policy)
+    # HAR-маршруты ставятся после сетевой политики и поэтому проверяются раньше неё.
+    default_har_routing(context)
+
+
+def _log_network_stats(context: BrowserContext) -> None:
+    """Пишет в events.ndjson, сколько запросов отсекла сетевая политика за тест."""
+
+    stats = network_stats(context)
+    if stats is None or not (stats.allowed or stats.blocked):
+        return
+    log_event(
+        stage="network_policy",
+        status="info",
+        message=f"Blocked {stats.blocked} requests",
+        data=stats.as_dict(),
+    )
+    stats.reset()
+
+
+@pytest.fixture(scope="session")
+def context_pool(browser: Browser, browser_context_args: Dict) -> Iterator[Optional[BrowserContextPool]]:
+    """Пул контекстов на процесс: под pytest-xdist (`-n auto`) у каждого воркера свой Browser и пул.
+
+    При записи HAR пул не используется: HAR дописывается на диск при закрытии контекста.
+    """
+
+    if load_app_config().har.mode == "record":
+        yield None
+        return
+    pool = default_context_pool(browser, context_args=browser_context_args, configure=_configure_context)
+    yield pool
+    if pool is not None:
+        pool.close()
+
+
+@pytest.fixture
+def context(
+    request,
+    context_pool: Optional[BrowserContextPool],
+    new_context: Callable[..., BrowserContext],
+) -> Iterator[BrowserContext]:
+    """Контекст теста: из пула (секция `pool:` config.yaml) или новый, как в pytest-playwright.
+
+    Тесты с маркером fresh_context получают контекст, который после теста закрывается.
+    Контекст упавшего теста тоже не переиспользуется.
+    """
+
+    if context_pool is None:
+        ctx = new_context()
+        _configure_context(ctx)
+        yield ctx
+        _log_network_stats(ctx)
+        return
+
+    ctx = context_pool.acquire()
+    yield ctx
+    _log_network_stats(ctx)
+
+    rep = getattr(request.node, "rep_call", None)
+    reusable = rep is not None and rep.passed and request.node.get_closest_marker("fresh_context") is None
+    context_pool.release(ctx, reusable=reusable)
 
 
 @pytest.fixture(autouse=True)
 def _configure_expect_timeout() -> None:
     """Настраиваем глобальный таймаут для expect-assertions."""
 
-    playwright_expect.set_options(timeout=10_000)
+    playwright_expect.set_options(timeout=load_app_config().playwright.expect_timeout_ms)
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    """Хук pytest: дописываем очередь фонового писателя событий до выхода из сессии."""
+
+    shutdown_event_writer()
 
 
 @pytest.hookimpl(hookwrapper=True)
@@ -69,31 +256,72 @@ def pytest_runtest_makereport(item, call):
     setattr(item, "rep_" + rep.when, rep)
 
 
+@pytest.fixture(scope="session")
+def artifact_store() -> Iterator[Optional[ArtifactStore]]:
+    """Фоновая запись артефактов упавших тестов; дописывается до конца сессии."""
+
+    store = default_artifact_store()
+    yield store
+    if store is not None:
+        store.close()
+
+
 @pytest.fixture(autouse=True)
-def _capture_artifacts_on_failure(request, page: Page) -> None:
-    """Сохраняет скриншот и логирует событие при падении теста.
+def _capture_artifacts_on_failure(request, artifact_store: Optional[ArtifactStore]) -> None:
+    """Пишет trace-чанк каждого теста и сохраняет его со скриншотом только при падении.
 
+    У зелёного теста чанк отбрасывается без записи на диск. Скриншот снимается в
+    память, а упаковка и квота на artifacts/ обрабатываются в фоне (ArtifactStore).
     Логика остаётся в слое тестов (runner), доменный код об этом не знает.
+    Тестам с маркером own_browser страница `page` не выдаётся и артефакты не пишутся.
     """
 
+    if request.node.get_closest_marker("own_browser") is not None:
+        yield
+        return
+
+    page: Page = request.getfixturevalue("page")
+    config = load_app_config().artifacts
+    # Screencast в trace — только по конфигу или с pytest-playwright --tracing=on|retain-on-failure.
+    screenshots = config.trace_screenshots or request.config.getoption("--tracing", "off") != "off"
+    tracing = artifact_store is not None and start_test_trace(page.context, request.node.nodeid, config, screenshots)
+
     yield
 
     rep = getattr(request.node, "rep_call", None)
-    if rep is not None and rep.failed:
-        test_name = request.node.name
-        screenshot_dir = ARTIFACTS_DIR / "screenshots"
-        screenshot_dir.mkdir(parents=True, exist_ok=True)
-        screenshot_path = screenshot_dir / f"{test_name}.png"
+    failed = rep is not None and rep.failed
 
+    screenshot = None
+    if failed and artifact_store is not None and config.screenshot:
         try:
-            page.screenshot(path=str(screenshot_path), full_page=True)
+            screenshot = page.screenshot(full_page=config.full_page)
         except Exception:
             # Если страница уже закрыта или упала раньше, просто пропускаем.
-            screenshot_path = None
+            screenshot = None
+
+    trace_path = None
+    if tracing:
+        keep = Path(tempfile.gettempdir()) / f"trace-{uuid.uuid4().hex}.zip" if failed else None
+        try:
+            trace_path = stop_test_trace(page.context, keep)
+        except Exception:
+            # Контекст уже закрыт тестом — trace потерян, но скриншот ещё может пригодиться.
+            trace_path = None
+    if not failed:
+        return
 
-        log_event(
-            stage="test_failure",
-            status="error",
-            message=f"Test {test_name} failed",
-            data={"screenshot": str(screenshot_path) if screenshot_path else None},
+    test_name = request.node.name
+    bundle = None
+    if artifact_store is not None:
+        bundle = artifact_store.save_failure(
+            test_name,
+            screenshot=screenshot,
+            trace_path=trace_path,
+            meta={"test": request.node.nodeid, "error": str(rep.longrepr)[-4000:]},
         )
+    log_event(
+        stage="test_failure",
+        status="error",
+        message=f"Test {test_name} failed",
+        data={"artifacts": str(bundle) if bundle else None, "trace": trace_path is not None},
+    )
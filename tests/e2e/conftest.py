@@ -0,0 +1,35 @@
+from typing import Optional
+
+import pytest
+
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.health.preflight import PREFLIGHT_DOWN, preflight
+
+
+# Причина пропуска e2e-тестов ("" — магазин доступен); считается один раз за сессию.
+_SKIP_REASON = pytest.StashKey[str]()
+
+
+def _preflight_skip_reason(config) -> str:
+    har_mode = config.getoption("--har-mode") or load_app_config().har.mode
+    if config.getoption("--no-preflight") or not load_app_config().preflight.gate or har_mode == "replay":
+        return ""
+    report = preflight()
+    return f"Store pre-flight: down ({report.summary()})" if report.verdict == PREFLIGHT_DOWN else ""
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item) -> None:
+    """Хук pytest: если HTTP pre-flight признал магазин недоступным, e2e-тесты пропускаются.
+
+    Проверка делается перед первым запускаемым e2e-тестом и до его фикстур (браузер не
+    запускается): при --collect-only или если -k отобрал другие тесты её нет.
+    Она занимает миллисекунды; при HAR replay сеть не нужна, и гейт не работает.
+    Подозрительный (odd) ответ тесты не пропускает — его разберёт smoke.
+    """
+
+    reason: Optional[str] = item.config.stash.get(_SKIP_REASON, None)
+    if reason is None:
+        reason = item.config.stash[_SKIP_REASON] = _preflight_skip_reason(item.config)
+    if reason:
+        pytest.skip(reason)
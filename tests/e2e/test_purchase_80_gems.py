@@ -1,13 +1,18 @@
-import re
-
 from playwright.sync_api import Page, expect
 
 from src.application.flows.login_supercell import login_supercell_with_manual_otp
 from src.application.flows.purchase_80_gems_flow import purchase_80_gems_flow
-from src.infrastructure.config.settings import Settings
+from src.infrastructure.browser import selectors
+from src.infrastructure.browser.supercell_store_client import SupercellStoreClient
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.config.settings import GooglePaySettings, SupercellSettings
 
 
-def test_purchase_80_gems_end_to_end(page: Page, settings: Settings) -> None:
+def test_purchase_80_gems_end_to_end(
+    page: Page,
+    supercell_settings: SupercellSettings,
+    google_pay_settings: GooglePaySettings,
+) -> None:
     """Полный e2e-сценарий: логин в Supercell + покупка 80 гемов через Google Pay.
 
     Проверяем, что после завершения потока пользователь разлогинен (видна кнопка Log in).
@@ -15,15 +20,14 @@ def test_purchase_80_gems_end_to_end(page: Page, settings: Settings) -> None:
     """
 
     # 1. Логин по email + ручной ввод ОТП.
-    login_supercell_with_manual_otp(page, settings)
+    login_supercell_with_manual_otp(page, supercell_settings)
 
     # 2. Покупка 80 гемов + оплата Google Pay + best-effort финализация сессии.
-    purchase_80_gems_flow(page, settings)
-
-    # 3. Проверяем, что мы вернулись на страницу магазина и видим кнопку входа.
-    page.goto("https://store.supercell.com/brawlstars")
-    login_button = page.get_by_role(
-        "link",
-        name=re.compile("Log in|Войти", re.IGNORECASE),
-    )
-    expect(login_button).to_be_visible()
+    purchase_80_gems_flow(page, google_pay_settings)
+
+    # 3. Проверяем, что на странице игры (supercell.base_url / game_slug, в т.ч. stand-in)
+    # снова видна кнопка входа.
+    cfg = load_app_config().supercell
+    SupercellStoreClient(page=page, base_url=cfg.base_url, game_slug=cfg.game_slug).open_store()
+    login_button = page.get_by_role("link", name=selectors.STORE_LOGIN_LINK_NAME)
+    expect(login_button.first).to_be_visible()
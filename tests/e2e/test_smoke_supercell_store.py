@@ -1,18 +1,43 @@
-import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
 
+import pytest
 from playwright.sync_api import Page, expect
 
+from src.application.flows.aio.store_smoke import store_smoke
+from src.infrastructure.config.app_config import load_app_config
+from src.infrastructure.health.preflight import title_pattern
+
 
 def test_supercell_store_smoke(page: Page) -> None:
-    """Smoke-тест доступности магазина Brawl Stars на Supercell Store.
+    """Smoke-тест доступности страницы игры из `supercell:` config.yaml.
 
     Использует встроенную фикстуру `page` из pytest-playwright.
     """
-    page.goto("https://store.supercell.com/brawlstars")
+    cfg = load_app_config().supercell
+    page.goto(f"{cfg.base_url.rstrip('/')}/{cfg.game_slug}")
+
+    # Проверяем, что заголовок страницы относится к магазину игры.
+    expect(page).to_have_title(title_pattern(cfg.game_slug))
+
+    # Дополнительная проверка: на странице есть заголовок с названием игры ("Discover Brawl Stars Store" или похожим).
+    heading = page.get_by_role("heading", name=title_pattern(cfg.game_slug))
+    expect(heading.first).to_be_visible()
+
+
+@pytest.mark.own_browser
+def test_supercell_store_smoke_matrix(browser_name: str, browser_context_args: Dict) -> None:
+    """Все игры из `smoke.game_slugs` параллельно в одном браузере (см. store_smoke).
+
+    Отчёт матрицы пишется в logs/events.ndjson (stage=smoke) и попадает в сообщение assert.
+    """
 
-    # Проверяем, что заголовок страницы относится к Brawl Stars Store.
-    expect(page).to_have_title(re.compile("Brawl Stars", re.IGNORECASE))
+    # Sync API pytest-playwright уже держит event loop этого потока, поэтому async-матрица
+    # запускается в отдельном потоке со своим loop.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        report = executor.submit(
+            asyncio.run, store_smoke(browser_name, context_args=browser_context_args)
+        ).result()
 
-    # Дополнительная проверка: на странице есть заголовок с текстом "Discover Brawl Stars Store" или похожим.
-    heading = page.get_by_role("heading", name=re.compile("Brawl Stars", re.IGNORECASE))
-    expect(heading).to_be_visible()
+    assert report.passed, report.format_text()
@@ -0,0 +1,104 @@
+"""Общие фикстуры и фейки unit-тестов.
+
+Фейки импортируются тестами напрямую: `from conftest import FakePage`.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+
+from src.infrastructure.logging import events
+
+
+@pytest.fixture(autouse=True)
+def _capture_artifacts_on_failure() -> None:
+    """Unit-тесты не используют браузер: скриншоты при падении не нужны."""
+
+
+@pytest.fixture(autouse=True)
+def _trace_run() -> None:
+    """Unit-тесты не пишут span прогона в общий logs/events.ndjson."""
+
+
+@pytest.fixture(autouse=True)
+def event_log(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """События и span-ы пишутся в sync-режиме во временный лог, а не в logs/events.ndjson.
+
+    Возвращает файл лога этого процесса (под pytest-xdist у воркера свой, см. events.log_file).
+    """
+
+    monkeypatch.setattr(events, "LOG_FILE", tmp_path / "events.ndjson")
+    monkeypatch.setattr(events, "_get_writer", lambda: None)
+    return events.log_file()
+
+
+@pytest.fixture
+def read_events(event_log: Path) -> Callable[[], List[Dict[str, Any]]]:
+    """Записи временного лога событий на момент вызова (включая записанные из event loop-а)."""
+
+    def read() -> List[Dict[str, Any]]:
+        events.flush_events()
+        return [json.loads(line) for line in event_log.read_text(encoding="utf-8").splitlines()]
+
+    return read
+
+
+# -------------------- Фейки Playwright --------------------
+DEFAULT_STORAGE_STATE: Dict[str, Any] = {"cookies": [{"name": "sid", "value": "1"}], "origins": []}
+
+
+class FakeResponse:
+    ok = True
+
+
+class FakeContext:
+    """Минимальная замена BrowserContext: таймауты по умолчанию и storage_state."""
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None) -> None:
+        self.state = state if state is not None else DEFAULT_STORAGE_STATE
+        self.applied: List[Dict[str, Any]] = []
+        self.timeouts: List[Tuple[str, float]] = []
+
+    def storage_state(self) -> Dict[str, Any]:
+        return self.state
+
+    def set_storage_state(self, state: Dict[str, Any]) -> None:
+        self.applied.append(state)
+
+    def set_default_timeout(self, timeout: float) -> None:
+        self.timeouts.append(("default", timeout))
+
+    def set_default_navigation_timeout(self, timeout: float) -> None:
+        self.timeouts.append(("navigation", timeout))
+
+
+class FakePage:
+    """goto переходит на url, если он не в redirects (иначе — на страницу логина)."""
+
+    def __init__(self, redirects: Optional[Dict[str, str]] = None) -> None:
+        self.url = "about:blank"
+        self.context = FakeContext()
+        self.redirects = redirects or {}
+
+    def goto(self, url: str, timeout: Optional[float] = None) -> FakeResponse:
+        self.url = self.redirects.get(url, url)
+        return FakeResponse()
+
+
+class AsyncFakeContext(FakeContext):
+    async def storage_state(self) -> Dict[str, Any]:
+        return FakeContext.storage_state(self)
+
+    async def set_storage_state(self, state: Dict[str, Any]) -> None:
+        FakeContext.set_storage_state(self, state)
+
+
+class AsyncFakePage(FakePage):
+    def __init__(self, redirects: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(redirects)
+        self.context = AsyncFakeContext()
+
+    async def goto(self, url: str, timeout: Optional[float] = None) -> FakeResponse:
+        return FakePage.goto(self, url, timeout)
@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+
+from src.infrastructure.config.app_config import ConfigRegistry, PlaywrightConfig
+
+
+def _write(path: Path, text: str, mtime_ns: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_registry_parses_all_sections(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.yaml"
+    _write(
+        config_path,
+        "supercell:\n  game_slug: clashroyale\n"
+        "order:\n  sku_name: 80_gems\n  product_url: https://example.test/p\n"
+        "playwright:\n  page_timeout_ms: 1000\n  unknown_key: 1\n",
+        1_000_000_000,
+    )
+
+    config = ConfigRegistry(config_path).get()
+
+    assert config.supercell.game_slug == "clashroyale"
+    assert config.supercell.base_url == "https://store.supercell.com"
+    assert config.order.product_url == "https://example.test/p"
+    assert config.playwright.page_timeout_ms == 1000
+    assert config.playwright.navigation_timeout_ms == PlaywrightConfig().navigation_timeout_ms
+
+
+def test_registry_reloads_only_on_mtime_change(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.yaml"
+    _write(config_path, "supercell:\n  game_slug: brawlstars\n", 1_000_000_000)
+    registry = ConfigRegistry(config_path)
+
+    first = registry.get()
+    assert registry.get() is first
+
+    _write(config_path, "supercell:\n  game_slug: clashroyale\n", 2_000_000_000)
+    second = registry.get()
+
+    assert second is not first
+    assert second.supercell.game_slug == "clashroyale"
+
+
+def test_registry_defaults_when_file_missing(tmp_path: Path) -> None:
+    config = ConfigRegistry(tmp_path / "missing.yaml").get()
+
+    assert config.supercell.game_slug == "brawlstars"
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.perf.benchmark import (
+    RoundTripCounter,
+    StageRecorder,
+    StageStats,
+    _send_message_patchable,
+    compare_to_baseline,
+    load_baseline,
+    percentile,
+    save_baseline,
+)
+
+
+def _stats(p95_ms: float, round_trips: float = 3) -> StageStats:
+    return StageStats(samples=10, p50_ms=p95_ms / 2, p95_ms=p95_ms, p99_ms=p95_ms, mean_ms=p95_ms / 2, round_trips_p50=round_trips)
+
+
+def test_percentile_interpolates() -> None:
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_recorder_summarises_stages() -> None:
+    recorder = StageRecorder()
+    for _ in range(3):
+        with recorder.stage("open_store"):
+            recorder.counter.total += 2
+
+    stats = recorder.summary()["open_store"]
+    assert stats.samples == 3
+    assert stats.round_trips_p50 == 2
+
+
+def test_baseline_roundtrip_and_regression_gate(tmp_path: Path) -> None:
+    path = tmp_path / "baseline.json"
+    save_baseline(path, {"open_store": _stats(100), "logout_supercell": _stats(10)})
+    baseline = load_baseline(path)
+    assert baseline is not None
+
+    current = {
+        "open_store": _stats(130, round_trips=4),
+        "logout_supercell": _stats(20),  # +100%, но всего +10 мс — ниже min_delta_ms
+        "new_stage": _stats(500),
+    }
+    regressions = compare_to_baseline(current, baseline, threshold_pct=20, min_delta_ms=15)
+
+    assert {(r.stage, r.metric) for r in regressions} == {("open_store", "p95_ms"), ("open_store", "round_trips_p50")}
+    assert load_baseline(tmp_path / "missing.json") is None
+
+
+def test_round_trip_counter_patches_only_known_signature() -> None:
+    counter = RoundTripCounter()
+    with counter.installed():
+        assert counter.active
+    assert not counter.active
+
+    def unknown(self, message): ...
+
+    assert _send_message_patchable(lambda self, object, method, params, timeout: None)
+    assert not _send_message_patchable(unknown)
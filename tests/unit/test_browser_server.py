@@ -0,0 +1,63 @@
+import http.client
+import json
+import socket
+import threading
+import time
+from typing import Iterator, Tuple
+
+import pytest
+
+from src.infrastructure.browser.browser_server import ConnectionProxy
+
+
+@pytest.fixture
+def upstream() -> Iterator[Tuple[str, int]]:
+    """Эхо-сервер вместо драйвера Playwright."""
+
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def echo(conn: socket.socket) -> None:
+        with conn:
+            for chunk in iter(lambda: conn.recv(4096), b""):
+                conn.sendall(chunk)
+
+    def serve() -> None:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=echo, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield listener.getsockname()[:2]
+    listener.close()
+
+
+def _health(address: Tuple[str, int]) -> dict:
+    connection = http.client.HTTPConnection(*address, timeout=2)
+    connection.request("GET", "/__health")
+    return json.loads(connection.getresponse().read())
+
+
+def test_proxy_forwards_ws_path_enforces_limit_and_tracks_idle(upstream: Tuple[str, int]) -> None:
+    proxy = ConnectionProxy("127.0.0.1", 0, upstream=upstream, ws_path="/pw", max_connections=1).start()
+    request = b"GET /pw HTTP/1.1\r\nHost: x\r\n\r\n"
+
+    with socket.create_connection(proxy.address, timeout=2) as first:
+        first.sendall(request)
+        assert first.recv(4096) == request
+        assert _health(proxy.address)["active"] == 1
+        assert proxy.idle_for() == 0
+
+        with socket.create_connection(proxy.address, timeout=2) as second:
+            second.sendall(request)
+            assert b" 503 " in second.recv(4096)
+
+    deadline = time.monotonic() + 2
+    while _health(proxy.address)["active"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    health = _health(proxy.address)
+    assert (health["active"], health["total"], health["rejected"]) == (0, 1, 1)
+    assert proxy.idle_for() > 0
+    proxy.close()
@@ -0,0 +1,51 @@
+import json
+import time
+from pathlib import Path
+
+from src.infrastructure.browser.catalog_index import CatalogIndex, build_catalog, match_sku
+
+
+GAME_URL = "https://store.example.test/brawlstars"
+
+LINKS = [
+    ("Log in", "https://store.example.test/login"),
+    ("Brawl Stars", "https://store.example.test/brawlstars"),
+    ("  80 Gems €0.99 ", "https://store.example.test/brawlstars/product/80-gems?ref=home#top"),
+    ("800 Gems", "https://store.example.test/brawlstars/product/800-gems"),
+    ("", "https://store.example.test/brawlstars/product/brawl-pass"),
+    ("80 Gems", "https://store.example.test/clashroyale/product/80-gems"),
+]
+
+
+def test_catalog_maps_sku_names_to_product_urls_of_the_game() -> None:
+    products = build_catalog(LINKS, GAME_URL)
+
+    assert match_sku(products, "80_gems") == "https://store.example.test/brawlstars/product/80-gems"
+    assert match_sku(products, "800 Gems") == "https://store.example.test/brawlstars/product/800-gems"
+    assert match_sku(products, "brawl_pass") == "https://store.example.test/brawlstars/product/brawl-pass"
+    assert match_sku(products, "log_in") is None
+    assert match_sku(products, "brawl_stars") is None
+
+
+def test_index_persists_per_game_and_expires(tmp_path: Path) -> None:
+    path = tmp_path / "catalog.json"
+    CatalogIndex(path, ttl_s=60).put(GAME_URL, build_catalog(LINKS, GAME_URL))
+
+    index = CatalogIndex(path, ttl_s=60)
+    assert index.lookup(GAME_URL, "80_gems") == "https://store.example.test/brawlstars/product/80-gems"
+    assert index.lookup("http://127.0.0.1:8765/brawlstars", "80_gems") is None
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload[GAME_URL]["crawled_at"] = time.time() - 120
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    assert CatalogIndex(path, ttl_s=60).lookup(GAME_URL, "80_gems") is None
+
+
+def test_invalidate_drops_game_from_disk(tmp_path: Path) -> None:
+    path = tmp_path / "catalog.json"
+    index = CatalogIndex(path, ttl_s=60)
+    index.put(GAME_URL, {"80_gems": "https://store.example.test/brawlstars/product/80-gems"})
+
+    index.invalidate(GAME_URL)
+
+    assert CatalogIndex(path, ttl_s=60).products(GAME_URL) is None
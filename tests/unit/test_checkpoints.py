@@ -0,0 +1,164 @@
+import asyncio
+from pathlib import Path
+from typing import List
+
+from conftest import AsyncFakePage, FakePage
+
+from src.application.flows.aio import scenario_engine as aio_engine
+from src.application.flows.aio.checkpoints import AsyncPageCheckpointer
+from src.application.flows.checkpoints import PageCheckpointer
+from src.application.flows.scenario_engine import (
+    STEP_DEFERRED,
+    STEP_OK,
+    STEP_RESTORED,
+    ScenarioContext,
+    run_scenario,
+)
+from src.domain.scenario import Scenario, Step, compile_scenario
+from src.infrastructure.browser.checkpoint_store import CheckpointStore
+
+
+SCENARIO = compile_scenario(
+    Scenario(
+        "checkpointed",
+        (
+            Step("product", "navigate", checkpoint=True),
+            Step("checkout", "navigate", requires=("product",), checkpoint=True),
+            Step("pay", "pay", requires=("checkout",)),
+            Step("detach", "detach", after=("pay",), always=True, required=False),
+            Step("logout", "record", after=("detach",), always=True, required=False, ends_session=True),
+        ),
+    )
+)
+
+
+def test_retry_resumes_from_last_checkpoint_and_defers_only_logout(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, ttl_s=60)
+    calls: List[str] = []
+    fail = {"pay": True}
+
+    def navigate(ctx: ScenarioContext) -> None:
+        calls.append(f"navigate:{len(calls)}")
+        ctx.page.goto(f"https://store.example.test/step{len(calls)}")
+
+    def pay(ctx: ScenarioContext) -> None:
+        calls.append("pay")
+        if fail["pay"]:
+            raise RuntimeError("popup closed")
+
+    actions = {
+        "navigate": navigate,
+        "pay": pay,
+        "detach": lambda ctx: calls.append("detach"),
+        "record": lambda ctx: calls.append("logout"),
+    }
+
+    page = FakePage()
+    checkpointer = PageCheckpointer(store, "k", page, defer_finalize_on_failure=True)
+    first = run_scenario(SCENARIO, actions, ScenarioContext(page=page), checkpointer)
+    assert str(first.error) == "popup closed"
+    # Оплата отвязывается и при отложенном логауте.
+    assert first.statuses["detach"] == STEP_OK and "detach" in calls
+    assert first.statuses["logout"] == STEP_DEFERRED
+    assert store.load("k")["completed"] == ["product", "checkout"]
+
+    calls.clear()
+    fail["pay"] = False
+    page = FakePage()
+    second = run_scenario(SCENARIO, actions, ScenarioContext(page=page), PageCheckpointer(store, "k", page))
+
+    assert second.ok
+    assert second.statuses == {
+        "product": STEP_RESTORED,
+        "checkout": STEP_RESTORED,
+        "pay": STEP_OK,
+        "detach": STEP_OK,
+        "logout": STEP_OK,
+    }
+    assert calls == ["pay", "detach", "logout"]
+    assert page.context.applied and store.load("k") is None
+
+
+def test_checkpoint_rejected_by_probe_is_dropped(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, ttl_s=60)
+    store.save("k", ["product"], "https://store.example.test/brawlstars/product/80-gems", {"cookies": []})
+
+    page = FakePage(redirects={"https://store.example.test/brawlstars/product/80-gems": "https://store.example.test/login"})
+    checkpointer = PageCheckpointer(store, "k", page)
+
+    assert checkpointer.resume() == ()
+    assert not checkpointer.defer_finalize
+    assert store.load("k") is None
+
+
+def test_finalize_is_not_deferred_by_default(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, ttl_s=60)
+    calls: List[str] = []
+
+    def pay(ctx: ScenarioContext) -> None:
+        raise RuntimeError("declined")
+
+    actions = {
+        "navigate": lambda ctx: ctx.page.goto("https://store.example.test/checkout"),
+        "pay": pay,
+        "detach": lambda ctx: calls.append("detach"),
+        "record": lambda ctx: calls.append("logout"),
+    }
+    page = FakePage()
+    result = run_scenario(SCENARIO, actions, ScenarioContext(page=page), PageCheckpointer(store, "k", page))
+
+    assert result.statuses["logout"] == STEP_OK
+    assert calls == ["detach", "logout"]
+
+
+IRREVERSIBLE = compile_scenario(
+    Scenario(
+        "irreversible",
+        (
+            Step("checkout", "navigate", checkpoint=True),
+            Step("pay", "pay", requires=("checkout",), irreversible=True),
+        ),
+    )
+)
+
+
+def _failing_pay(ctx: ScenarioContext) -> None:
+    raise RuntimeError("completion signal timed out")
+
+
+def test_checkpoint_is_dropped_before_irreversible_step(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, ttl_s=60)
+    actions = {"navigate": lambda ctx: ctx.page.goto("https://store.example.test/checkout"), "pay": _failing_pay}
+
+    page = FakePage()
+    result = run_scenario(IRREVERSIBLE, actions, ScenarioContext(page=page), PageCheckpointer(store, "k", page))
+
+    # Оплата могла пройти: повтор не должен снова начинать с checkout.
+    assert str(result.error) == "completion signal timed out"
+    assert store.load("k") is None
+    assert PageCheckpointer(store, "k", FakePage()).resume() == ()
+
+
+def test_async_checkpointer_resumes_and_drops_before_irreversible_step(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path, ttl_s=60)
+    store.save("k", ["checkout"], "https://store.example.test/checkout", {"cookies": []})
+    calls: List[str] = []
+
+    async def pay(ctx: ScenarioContext) -> None:
+        calls.append("pay")
+        assert store.load("k") is None
+        raise RuntimeError("declined")
+
+    async def navigate(ctx: ScenarioContext) -> None:
+        calls.append("navigate")
+
+    page = AsyncFakePage()
+    result = asyncio.run(
+        aio_engine.run_scenario(
+            IRREVERSIBLE, {"navigate": navigate, "pay": pay}, ScenarioContext(page=page), AsyncPageCheckpointer(store, "k", page)
+        )
+    )
+
+    assert result.statuses["checkout"] == STEP_RESTORED
+    assert calls == ["pay"]
+    assert page.context.applied and store.load("k") is None
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, Callable, Dict, List
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.infrastructure.browser.aio.completion import wait_for_completion as async_wait_for_completion
+from src.infrastructure.browser.completion import (
+    ElementVisible,
+    PopupClosed,
+    ResponseReceived,
+    UrlChanged,
+    wait_for_completion,
+)
+
+
+class FakeResponse:
+    def __init__(self, url: str, status: int) -> None:
+        self.url = url
+        self.status = status
+
+
+class FakeLocator:
+    """Элемент становится видимым, когда тест выставляет page.element_visible."""
+
+    def __init__(self, page: "FakePage") -> None:
+        self.page = page
+
+    def filter(self, visible: bool) -> "FakeLocator":
+        return self
+
+    def or_(self, other: "FakeLocator") -> "FakeLocator":
+        return self
+
+    @property
+    def first(self) -> "FakeLocator":
+        return self
+
+    def count(self) -> int:
+        return int(self.page.element_visible)
+
+    def wait_for(self, state: str, timeout: float) -> None:
+        self.page.waits += 1
+        if not self.page.element_visible:
+            raise PlaywrightTimeoutError("timeout")
+
+
+class FakePage:
+    def __init__(self) -> None:
+        self.listeners: Dict[str, List[Callable[[Any], None]]] = {}
+        self.main_frame = object()
+        self.waits = 0
+        self.element_visible = False
+
+    def on(self, event: str, listener: Callable[[Any], None]) -> None:
+        self.listeners.setdefault(event, []).append(listener)
+
+    def remove_listener(self, event: str, listener: Callable[[Any], None]) -> None:
+        self.listeners[event].remove(listener)
+
+    def emit(self, event: str, payload: Any) -> None:
+        for listener in list(self.listeners.get(event, [])):
+            listener(payload)
+
+    def wait_for_timeout(self, timeout: float) -> None:
+        self.waits += 1
+
+
+def test_first_fired_event_completes_stage_and_listeners_are_removed(read_events) -> None:
+    page = FakePage()
+    signals = [PopupClosed(), ResponseReceived("/gpay/confirm", status=200, name="confirm")]
+
+    with wait_for_completion(page, "pay", signals, timeout_ms=1000) as done:
+        page.emit("response", FakeResponse("https://x.test/gpay/confirm", 500))
+        page.emit("response", FakeResponse("https://x.test/gpay/confirm", 200))
+        page.emit("close", page)
+
+    assert done.signal == "confirm"
+    assert page.waits == 0
+    assert all(not listeners for listeners in page.listeners.values())
+    (record,) = read_events()
+    assert record["stage"] == "completion" and record["data"]["signal"] == "confirm"
+
+
+def test_element_signal_and_timeout() -> None:
+    page = FakePage()
+    signals = [UrlChanged("/checkout"), ElementVisible("heading", lambda root: FakeLocator(root))]
+
+    with wait_for_completion(page, "checkout", signals, timeout_ms=1000) as done:
+        page.element_visible = True
+    assert done.signal == "heading"
+
+    page.element_visible = False
+    with pytest.raises(RuntimeError, match="checkout"):
+        with wait_for_completion(page, "checkout", signals, timeout_ms=1):
+            pass
+
+
+class AsyncFakeLocator(FakeLocator):
+    async def wait_for(self, state: str, timeout: float) -> None:
+        await self.page.element_shown.wait()
+
+
+def test_async_waiter_returns_whichever_signal_is_first() -> None:
+    async def scenario() -> List[str]:
+        page = FakePage()
+        page.element_shown = asyncio.Event()
+        signals = [PopupClosed(), ElementVisible("complete", lambda root: AsyncFakeLocator(root))]
+
+        async with async_wait_for_completion(page, "pay", signals, timeout_ms=1000) as by_element:
+            page.element_shown.set()
+
+        page.element_shown.clear()
+        async with async_wait_for_completion(page, "pay", signals, timeout_ms=1000) as by_event:
+            asyncio.get_running_loop().call_later(0.01, page.emit, "close", page)
+        return [by_element.signal, by_event.signal]
+
+    assert asyncio.run(scenario()) == ["complete", "popup_closed"]
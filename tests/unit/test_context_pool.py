@@ -0,0 +1,78 @@
+from typing import Any, Dict, List
+
+import pytest
+
+from src.infrastructure.browser.context_pool import BrowserContextPool
+
+
+class FakeContext:
+    """Минимальная замена BrowserContext: запоминает вызовы сброса."""
+
+    def __init__(self, args: Dict[str, Any]) -> None:
+        self.args = args
+        self.pages: List[Any] = []
+        self.local_storage: List[Dict[str, str]] = []
+        self.cookies_cleared = 0
+        self.closed = False
+
+    def storage_state(self) -> Dict[str, Any]:
+        return {"cookies": [], "origins": [{"origin": "x", "localStorage": self.local_storage}]}
+
+    def clear_cookies(self) -> None:
+        self.cookies_cleared += 1
+
+    def clear_permissions(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.contexts: List[FakeContext] = []
+
+    def new_context(self, **kwargs: Any) -> FakeContext:
+        context = FakeContext(kwargs)
+        self.contexts.append(context)
+        return context
+
+
+def test_contexts_are_prewarmed_reset_and_reused() -> None:
+    browser = FakeBrowser()
+    configured: List[FakeContext] = []
+    pool = BrowserContextPool(browser, context_args={"proxy": {"server": "p"}}, configure=configured.append)
+    pool.warm(1)
+
+    first = pool.acquire()
+    assert browser.contexts == [first] and first.args == {"proxy": {"server": "p"}}
+    pool.release(first)
+    assert first.cookies_cleared == 1 and not first.closed
+    assert configured == [first, first]
+
+    assert pool.acquire() is first
+    assert pool.stats.created == 1 and pool.stats.reused == 1
+
+
+def test_contexts_are_recycled_after_max_uses_failure_or_local_storage() -> None:
+    browser = FakeBrowser()
+    pool = BrowserContextPool(browser, max_uses=2)
+
+    context = pool.acquire()
+    pool.release(context)
+    assert pool.acquire() is context
+    pool.release(context)
+    assert context.closed
+
+    failed = pool.acquire()
+    pool.release(failed, reusable=False)
+    assert failed.closed
+
+    dirty = pool.acquire()
+    dirty.local_storage.append({"name": "k", "value": "v"})
+    pool.release(dirty)
+    assert dirty.closed
+    assert pool.stats.recycled == 3
+
+    with pytest.raises(RuntimeError):
+        pool.release(dirty)
@@ -0,0 +1,65 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from src.infrastructure.logging.report import build_report, iter_records, log_segments, main, parse_ts, RecordFilter
+
+
+def _record(ts: str, stage: str, status: str = "ok", duration_ms: float = 10.0, run_id: str = "r1") -> Dict[str, Any]:
+    return {
+        "ts": ts,
+        "stage": stage,
+        "status": status,
+        "message": "",
+        "data": {"duration_ms": duration_ms},
+        "run_id": run_id,
+    }
+
+
+def _write(path: Path, records: List[Dict[str, Any]]) -> None:
+    lines = "".join(json.dumps(r) + "\n" for r in records)
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(lines)
+    else:
+        path.write_text(lines, encoding="utf-8")
+
+
+def test_report_streams_rotated_segments_oldest_first(tmp_path: Path) -> None:
+    log = tmp_path / "events.ndjson"
+    _write(tmp_path / "events.ndjson.2.gz", [_record("2026-01-01T00:00:00+00:00", "checkout", duration_ms=100)])
+    _write(tmp_path / "events.ndjson.1", [_record("2026-01-02T00:00:00+00:00", "checkout", "error", 300)])
+    _write(log, [_record("2026-01-03T00:00:00+00:00", "logout", duration_ms=5)])
+    with log.open("a", encoding="utf-8") as f:
+        f.write('{"ts": "2026-01-03T00:00:01+00:00", "stage": "log')  # оборванная запись
+
+    segments = log_segments(log)
+    assert [p.name for p in segments] == ["events.ndjson.2.gz", "events.ndjson.1", "events.ndjson"]
+
+    stages = build_report(iter_records(segments))
+    checkout = stages["checkout"].as_dict()
+    assert checkout["count"] == 2 and checkout["failure_rate"] == 0.5
+    assert checkout["p99_ms"] == pytest.approx(300, rel=0.02)
+    assert stages["logout"].count == 1
+
+
+def test_filters_by_time_run_and_stage_and_prints_json(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    log = tmp_path / "events.ndjson"
+    _write(
+        log,
+        [
+            _record("2026-01-01T00:00:00+00:00", "store.checkout", run_id="a"),
+            _record("2026-01-02T00:00:00+00:00", "store.checkout", run_id="b"),
+            _record("2026-01-02T00:00:00+00:00", "store.logout", run_id="b"),
+            _record("2026-01-02T00:00:00+00:00", "google_pay.confirm", run_id="b"),
+        ],
+    )
+
+    record_filter = RecordFilter(since=parse_ts("2026-01-01T12:00:00"), run_ids=["b"], stages=["store.*"])
+    assert sorted(build_report(iter_records([log]), record_filter)) == ["store.checkout", "store.logout"]
+
+    main([str(log), "--run-id", "a", "--format", "json"])
+    assert json.loads(capsys.readouterr().out)["store.checkout"]["count"] == 1
@@ -0,0 +1,145 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.config.app_config import AppConfig, EventLogConfig, override_app_config
+from src.infrastructure.logging import events
+from src.infrastructure.logging.report import log_segments
+from src.infrastructure.logging.writer import _STOP, BufferedEventWriter
+
+
+def test_writer_flushes_batches_in_order(tmp_path: Path) -> None:
+    path = tmp_path / "events.ndjson"
+    writer = BufferedEventWriter(path, batch_size=10, flush_interval_s=0.01, fsync="batch")
+
+    for i in range(25):
+        writer.write({"i": i})
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["i"] for line in lines] == list(range(25))
+
+
+def test_writer_rotates_and_compresses_segments(tmp_path: Path) -> None:
+    path = tmp_path / "events.ndjson"
+    writer = BufferedEventWriter(path, batch_size=1, flush_interval_s=0.01, max_bytes=64, backup_count=2)
+
+    for i in range(20):
+        writer.write({"i": i, "pad": "x" * 40})
+    writer.close()
+
+    first = path.with_name("events.ndjson.1.gz")
+    assert first.exists()
+    assert path.with_name("events.ndjson.2.gz").exists()
+    assert not path.with_name("events.ndjson.3.gz").exists()
+    with gzip.open(first, "rt", encoding="utf-8") as f:
+        assert json.loads(f.readline())["pad"] == "x" * 40
+
+
+def test_close_drains_queue(tmp_path: Path) -> None:
+    path = tmp_path / "events.ndjson"
+    writer = BufferedEventWriter(path, flush_interval_s=10)
+
+    writer.write({"stage": "login"})
+    writer.close()
+    writer.close()
+
+    assert json.loads(path.read_text(encoding="utf-8"))["stage"] == "login"
+
+
+def test_failed_batch_closes_file_and_writer_recovers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "events.ndjson"
+    writer = BufferedEventWriter(path, batch_size=1, flush_interval_s=0.01, fsync="batch")
+    opened = []
+    real_open = Path.open
+    monkeypatch.setattr(Path, "open", lambda self, *a, **kw: opened.append(real_open(self, *a, **kw)) or opened[-1])
+
+    def broken_fsync(fd: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", broken_fsync)
+    writer.write({"i": 0})
+    assert writer.flush(timeout=5)
+    assert opened and opened[0].closed
+
+    monkeypatch.undo()
+    writer.write({"i": 1})
+    writer.close()
+    assert [json.loads(line)["i"] for line in path.read_text(encoding="utf-8").splitlines()] == [0, 1]
+
+
+def test_unserializable_record_fails_in_caller_and_stopped_writer_rejects_records(tmp_path: Path) -> None:
+    path = tmp_path / "events.ndjson"
+    writer = BufferedEventWriter(path, queue_size=1, flush_interval_s=0.01, put_timeout_s=0.05)
+
+    with pytest.raises(TypeError):
+        writer.write({"x": object()})
+    assert writer.write({"i": 0})
+    assert writer.flush(timeout=5)
+
+    # Поток-писатель остановлен (как после падения): запись не принимается и не ждёт.
+    writer._queue.put(_STOP)
+    writer._thread.join(5)
+    assert writer.write({"i": 1}) is False
+    writer.close()
+    assert [json.loads(line)["i"] for line in path.read_text(encoding="utf-8").splitlines()] == [0]
+
+
+def test_closed_writer_rejects_records_and_log_event_falls_back_to_sync(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "events.ndjson"
+    writer = BufferedEventWriter(tmp_path / "buffered.ndjson")
+    writer.close()
+    monkeypatch.setattr(events, "LOG_FILE", path)
+    monkeypatch.setattr(events, "_get_writer", lambda: writer)
+
+    assert writer.write({"i": 0}) is False
+    events.log_event(stage="logout", status="ok", message="after shutdown")
+
+    assert json.loads(path.read_text(encoding="utf-8"))["stage"] == "logout"
+
+
+def test_sync_log_event_rotates_per_worker_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "events.ndjson"
+    cfg = AppConfig(logging=EventLogConfig(max_bytes=200, backup_count=2, compress_rotated=False))
+    monkeypatch.setattr(events, "LOG_FILE", path)
+    monkeypatch.setattr(events, "_get_writer", lambda: None)
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw1")
+
+    with override_app_config(cfg):
+        for i in range(10):
+            events.log_event(stage="open_store", status="ok", message="x" * 40, data={"i": i})
+
+        events.log_event(stage="logout", status="ok", message="short")
+
+    assert events.log_file() == tmp_path / "events.gw1.ndjson" and not path.exists()
+    assert [p.name for p in log_segments(path)] == ["events.gw1.ndjson.2", "events.gw1.ndjson.1", "events.gw1.ndjson"]
+
+
+def test_sync_log_event_in_event_loop_writes_off_the_loop_thread(read_events, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_sync = events._write_sync
+    threads = []
+
+    def recording_write(record):
+        threads.append(threading.current_thread())
+        write_sync(record)
+
+    monkeypatch.setattr(events, "_write_sync", recording_write)
+
+    async def main() -> None:
+        for i in range(5):
+            events.log_event(stage="open_store", status="ok", message="in loop", data={"i": i})
+
+    asyncio.run(main())
+    events.log_event(stage="logout", status="ok", message="outside loop")
+
+    assert [e["data"].get("i") for e in read_events()] == [0, 1, 2, 3, 4, None]
+    # Событие вне loop-а идёт той же очередью и не обгоняет записи из loop-а.
+    assert all(thread is not threading.current_thread() for thread in threads)
@@ -0,0 +1,65 @@
+import os
+import zipfile
+from pathlib import Path
+
+from src.infrastructure.browser.failure_artifacts import ArtifactStore, start_test_trace
+from src.infrastructure.config.app_config import ArtifactConfig
+
+
+def test_failure_bundle_is_written_in_background_and_trace_moved(tmp_path: Path) -> None:
+    trace = tmp_path / "trace-tmp.zip"
+    trace.write_bytes(b"PK-trace")
+    store = ArtifactStore(tmp_path / "artifacts", max_bytes=10_000_000)
+
+    bundle = store.save_failure("test_checkout[chromium]", screenshot=b"\x89PNG" * 100, trace_path=trace)
+    store.flush(timeout=5)
+
+    assert bundle.name.endswith("_test_checkout_chromium_.zip")
+    with zipfile.ZipFile(bundle) as archive:
+        assert sorted(archive.namelist()) == ["meta.json", "screenshot.png", "trace.zip"]
+        assert archive.getinfo("screenshot.png").compress_size < 400
+    assert not trace.exists()
+    store.close()
+
+
+def test_quota_removes_oldest_artifacts_first(tmp_path: Path) -> None:
+    directory = tmp_path / "artifacts"
+    directory.mkdir()
+    for index in range(4):
+        path = directory / f"old{index}.bin"
+        path.write_bytes(b"x" * 1000)
+        os.utime(path, (1_000_000 + index, 1_000_000 + index))
+
+    ArtifactStore(directory, max_bytes=2500).enforce_quota()
+
+    assert sorted(p.name for p in directory.iterdir()) == ["old2.bin", "old3.bin"]
+
+
+class _FakeTracing:
+    def __init__(self) -> None:
+        self.started = []
+        self.chunks = []
+
+    def start(self, **kwargs) -> None:
+        self.started.append(kwargs)
+
+    def start_chunk(self, title=None) -> None:
+        self.chunks.append(title)
+
+
+class _FakeContext:
+    def __init__(self) -> None:
+        self.tracing = _FakeTracing()
+
+
+def test_trace_is_started_without_screenshots_unless_requested() -> None:
+    plain = _FakeContext()
+    requested = _FakeContext()
+
+    assert start_test_trace(plain, "test_a", ArtifactConfig())
+    assert start_test_trace(plain, "test_b", ArtifactConfig())
+    assert start_test_trace(requested, "test_c", ArtifactConfig(), screenshots=True)
+
+    assert plain.tracing.started == [{"screenshots": False, "snapshots": True}]
+    assert plain.tracing.chunks == ["test_a", "test_b"]
+    assert requested.tracing.started == [{"screenshots": True, "snapshots": True}]
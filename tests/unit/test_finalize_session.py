@@ -0,0 +1,119 @@
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from conftest import FakeContext, FakePage
+
+from src.application.flows.finalize_supercell_session import (
+    LOGOUT_FAST,
+    LOGOUT_UI,
+    TEARDOWN_FAILED,
+    TEARDOWN_FALLBACK,
+    TEARDOWN_OK,
+    FinalizeReport,
+    detach_payment,
+    logout_session,
+    logout_status,
+)
+from src.infrastructure.browser.deadlines import deadline
+from src.infrastructure.browser.teardown import is_logged_out_status
+from src.infrastructure.config.app_config import FinalizeConfig, load_app_config
+
+
+class FakeClient:
+    """Клиент магазина: сессия «живёт», пока её не очистили (или сервер игнорирует очистку)."""
+
+    def __init__(self, server_keeps_session: bool = False, has_logout_button: bool = True) -> None:
+        self.page = FakePage()
+        self.server_keeps_session = server_keeps_session
+        self.has_logout_button = has_logout_button
+        self.calls: List[str] = []
+
+    def clear_session(self) -> None:
+        self.calls.append("clear_session")
+
+    def is_logged_out(self, account_url: Optional[str] = None, timeout_ms: Optional[float] = None) -> bool:
+        self.calls.append(f"is_logged_out:{timeout_ms}")
+        return is_logged_out_status(200 if self.server_keeps_session else 303)
+
+    def logout_supercell(self, timeout_ms: Optional[float] = None) -> bool:
+        self.calls.append(f"logout_supercell:{timeout_ms}")
+        return self.has_logout_button
+
+    def detach_payment_method(self) -> bool:
+        self.calls.append("detach_payment_method")
+        return False
+
+
+CFG = FinalizeConfig(detach_timeout_ms=300, verify_timeout_ms=200, ui_logout_timeout_ms=500)
+
+
+def test_fast_logout_skips_ui_when_verified() -> None:
+    client = FakeClient()
+
+    assert logout_session(client, None, CFG) == LOGOUT_FAST
+    assert client.calls == ["clear_session", "is_logged_out:200"]
+    assert logout_status(CFG, LOGOUT_FAST) == TEARDOWN_OK
+
+
+def test_ui_logout_is_fallback_when_session_survives(event_log: Path) -> None:
+    client = FakeClient(server_keeps_session=True)
+
+    assert logout_session(client, None, CFG) == LOGOUT_UI
+    assert client.calls[-1] == "logout_supercell:500"
+    assert logout_status(CFG, LOGOUT_UI) == TEARDOWN_FALLBACK
+    assert "falling back to UI logout" in event_log.read_text(encoding="utf-8")
+    assert logout_status(replace(CFG, logout=LOGOUT_UI), LOGOUT_UI) == TEARDOWN_OK
+
+
+def test_ui_only_logout_fails_without_button() -> None:
+    client = FakeClient(has_logout_button=False)
+
+    with pytest.raises(RuntimeError):
+        logout_session(client, None, replace(CFG, logout=LOGOUT_UI))
+    assert client.calls == ["logout_supercell:500"]
+
+
+def test_steps_run_under_deadline_and_restore_timeouts() -> None:
+    client = FakeClient()
+    playwright = load_app_config().playwright
+
+    assert detach_payment(client, CFG) is False
+    assert client.page.context.timeouts == [
+        ("default", 300),
+        ("navigation", 300),
+        ("default", playwright.page_timeout_ms),
+        ("navigation", playwright.navigation_timeout_ms),
+    ]
+
+    context = FakeContext()
+    with deadline(context, None):
+        pass
+    assert context.timeouts == []
+
+
+def test_report_records_failures_instead_of_raising(event_log: Path) -> None:
+    report = FinalizeReport()
+    with report.step("open_account"):
+        raise TimeoutError("account page")
+    report.skip("detach_payment", "account page not opened")
+    with report.step("logout") as outcome:
+        outcome.detail = LOGOUT_FAST
+
+    assert report.failed("open_account")
+    assert report.steps["open_account"].status == TEARDOWN_FAILED
+    assert report.steps["open_account"].detail == "TimeoutError: account page"
+    assert report.steps["logout"].status == TEARDOWN_OK
+    assert not report.ok
+    assert report.as_dict()["steps"]["detach_payment"]["status"] == "skipped"
+
+    report.log()
+    assert '"stage": "finalize"' in event_log.read_text(encoding="utf-8")
+
+
+def test_logged_out_statuses() -> None:
+    assert is_logged_out_status(303)
+    assert is_logged_out_status(401)
+    assert not is_logged_out_status(200)
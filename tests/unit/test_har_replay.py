@@ -0,0 +1,44 @@
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from src.infrastructure.browser.har_replay import install_har_routing
+from src.infrastructure.config.app_config import HarConfig, parse_app_config
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    def route(self, url: str, handler: Any) -> None:
+        self.calls.append(("route", {"url": url}))
+
+    def route_from_har(self, har: Path, **kwargs: Any) -> None:
+        self.calls.append((Path(har).name, kwargs))
+
+
+def test_record_mode_writes_one_har_per_stage_with_common_first(tmp_path: Path) -> None:
+    context = FakeContext()
+    install_har_routing(context, HarConfig(mode="record"), "brawlstars", tmp_path)
+
+    names = [name for name, _ in context.calls]
+    assert names == ["common.har", "store_page.har", "product_page.har", "checkout.har", "account_page.har"]
+    assert context.calls[2][1] == {"url": "**/brawlstars/product/**", "not_found": "abort", "update": True}
+
+
+def test_replay_miss_policies(tmp_path: Path) -> None:
+    (tmp_path / "common.har").write_text("{}", encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match="store_page"):
+        install_har_routing(FakeContext(), HarConfig(mode="replay"), "brawlstars", tmp_path)
+
+    context = FakeContext()
+    install_har_routing(context, HarConfig(mode="replay", on_miss="log"), "brawlstars", tmp_path)
+    assert context.calls == [
+        ("route", {"url": "**/*"}),
+        ("common.har", {"url": "**/*", "not_found": "fallback", "update": False}),
+    ]
+
+    with pytest.raises(RuntimeError):
+        parse_app_config({"har": {"mode": "replay", "on_miss": "ignore"}})
@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+
+from src.infrastructure.config.app_config import PROJECT_ROOT
+
+
+# Модули, которые импортируют CLI (report, browser_server --status) и воркеры до запуска браузера.
+STARTUP_MODULES = (
+    "src.infrastructure.config.app_config",
+    "src.infrastructure.config.settings",
+    "src.infrastructure.logging.events",
+    "src.infrastructure.logging.tracing",
+    "src.infrastructure.logging.report",
+    "src.infrastructure.perf.benchmark",
+    "src.infrastructure.browser.browser_server",
+)
+
+# Тяжёлые зависимости, которые должны подгружаться только по требованию.
+LAZY_DEPENDENCIES = ("yaml", "dotenv", "playwright", "http.client")
+
+# Бюджет на суммарный импорт STARTUP_MODULES (мс) с запасом на медленный CI.
+IMPORT_BUDGET_MS = 250
+
+
+def _import_in_subprocess() -> dict:
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"for name in {STARTUP_MODULES!r}: __import__(name)\n"
+        "elapsed = (time.perf_counter() - started) * 1000\n"
+        f"print(json.dumps({{'elapsed_ms': elapsed, 'loaded': [m for m in {LAZY_DEPENDENCIES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_startup_imports_have_no_side_effects_and_fit_budget() -> None:
+    runs = [_import_in_subprocess() for _ in range(3)]
+
+    assert runs[0]["loaded"] == []
+    assert min(run["elapsed_ms"] for run in runs) < IMPORT_BUDGET_MS
@@ -0,0 +1,124 @@
+from pathlib import Path
+import re
+from typing import List, Optional, Set, Tuple
+
+from src.infrastructure.browser.locator_resolver import (
+    LearnedLocatorCache,
+    LocatorResolver,
+    LocatorStrategy,
+    url_pattern,
+)
+
+
+class FakeLocator:
+    """Минимальная замена Locator: стратегия находит элемент, если её имя есть в present."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @property
+    def first(self) -> "FakeLocator":
+        return self
+
+
+class FakeProbe:
+    """Замена first_match_probe: ветки с has/has_not и меткой-позицией, evaluate_all — один запрос."""
+
+    def __init__(self, page: "FakePage", has: Tuple[str, ...] = (), has_not: Tuple[str, ...] = (), marks=()) -> None:
+        self.page = page
+        self.has = has
+        self.has_not = has_not
+        self.marks: List[Tuple[int, "FakeProbe"]] = list(marks)
+
+    def filter(self, has: Optional[FakeLocator] = None, has_not: Optional[FakeLocator] = None) -> "FakeProbe":
+        return FakeProbe(
+            self.page,
+            self.has + ((has.name,) if has else ()),
+            self.has_not + ((has_not.name,) if has_not else ()),
+        )
+
+    def locator(self, selector: str) -> "FakeProbe":
+        position = int(re.fullmatch(r"xpath=\(//\*\)\[(\d+)\]", selector).group(1))
+        return FakeProbe(self.page, marks=[(position, self)])
+
+    def or_(self, other: "FakeProbe") -> "FakeProbe":
+        return FakeProbe(self.page, marks=self.marks + other.marks)
+
+    def evaluate_all(self, expression: str) -> int:
+        self.page.calls.append("+".join(gate.has[-1] for _, gate in self.marks))
+        present = self.page.present
+        passed = [
+            position - 1
+            for position, gate in self.marks
+            if all(name in present for name in gate.has) and not any(name in present for name in gate.has_not)
+        ]
+        assert len(passed) <= 1
+        return passed[0] if passed else -1
+
+
+class FakePage:
+    url = "https://store.example.test/brawlstars/product/12345?ref=1"
+
+    def __init__(self, present: Set[str]) -> None:
+        self.present = present
+        self.calls: List[str] = []
+
+    def locator(self, selector: str) -> FakeProbe:
+        assert selector == ":root"
+        return FakeProbe(self)
+
+    def strategy(self, name: str) -> LocatorStrategy:
+        return LocatorStrategy(name, lambda root: FakeLocator(name))
+
+
+def test_url_pattern_strips_query_and_ids() -> None:
+    assert url_pattern(FakePage.url) == "store.example.test/brawlstars/product/*"
+
+
+def test_cold_and_warm_lookups_are_one_round_trip(tmp_path: Path) -> None:
+    cache = LearnedLocatorCache(tmp_path / "locators.json")
+    page = FakePage(present={"css"})
+    strategies = [page.strategy("role"), page.strategy("css")]
+
+    resolver = LocatorResolver(page, cache=cache)
+    found = resolver.find("email", strategies)
+    assert found is not None and found.name == "css"
+    assert resolver.round_trips == 1
+    assert LearnedLocatorCache(cache.path).get("store.example.test/brawlstars/product/*::email") == "css"
+
+    page.calls.clear()
+    resolver = LocatorResolver(page, cache=cache)
+    assert resolver.find("email", strategies) is not None
+    # Выученная стратегия проверяется первой, но в том же единственном запросе.
+    assert page.calls == ["css+role"]
+    assert resolver.round_trips == 1
+
+
+def test_stale_learned_strategy_is_dropped(tmp_path: Path) -> None:
+    cache = LearnedLocatorCache(tmp_path / "locators.json")
+    page = FakePage(present={"role"})
+    key = "store.example.test/brawlstars/product/*::email"
+    cache.put(key, "css")
+
+    found = LocatorResolver(page, cache=cache).find("email", [page.strategy("role"), page.strategy("css")])
+
+    assert found is not None and found.name == "role"
+    assert cache.get(key) == "role"
+
+
+def test_miss_costs_single_round_trip(tmp_path: Path) -> None:
+    page = FakePage(present=set())
+    resolver = LocatorResolver(page, cache=LearnedLocatorCache(tmp_path / "locators.json"))
+
+    assert resolver.find("email", [page.strategy("a"), page.strategy("b"), page.strategy("c")]) is None
+    assert page.calls == ["a+b+c"]
+
+
+def test_first_strategy_by_priority_wins_when_several_match(tmp_path: Path) -> None:
+    page = FakePage(present={"role", "css"})
+    resolver = LocatorResolver(page, cache=LearnedLocatorCache(tmp_path / "locators.json"))
+
+    found = resolver.find("email", [page.strategy("role"), page.strategy("css")])
+
+    assert found is not None and found.name == "role"
+    assert page.calls == ["role+css"]
@@ -0,0 +1,72 @@
+from typing import Any, Callable, List
+
+import pytest
+
+from src.infrastructure.browser.network_policy import NetworkPolicy, install_network_policy, network_stats
+from src.infrastructure.config.app_config import parse_app_config
+
+
+RAW = {
+    "network": {
+        "enabled": True,
+        "rules": [
+            {"action": "allow", "domains": ["accounts.google.com"]},
+            {"action": "block", "domains": [".google-analytics.com"]},
+            {"action": "block", "resource_types": ["image", "font"]},
+        ],
+        "estimated_bytes": {"image": 1000},
+        "default_estimated_bytes": 10,
+    }
+}
+
+
+def test_first_matching_rule_wins_and_domains_match_subdomains() -> None:
+    policy = NetworkPolicy(parse_app_config(RAW).network)
+
+    assert not policy.is_blocked("https://accounts.google.com/logo.png", "image")
+    assert policy.is_blocked("https://www.google-analytics.com/collect", "xhr")
+    assert policy.is_blocked("https://store.supercell.com/hero.png", "image")
+    assert not policy.is_blocked("https://store.supercell.com/brawlstars", "document")
+    assert not policy.is_blocked("https://notgoogle-analytics.com/x.js", "script")
+
+
+def test_unknown_rule_action_is_rejected() -> None:
+    with pytest.raises(RuntimeError):
+        parse_app_config({"network": {"rules": [{"action": "drop"}]}})
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str, calls: List[str]) -> None:
+        self.request = type("Request", (), {"url": url, "resource_type": resource_type})()
+        self.calls = calls
+
+    def abort(self, error_code: str) -> None:
+        self.calls.append("abort")
+
+    def fallback(self) -> None:
+        self.calls.append("fallback")
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.handlers: List[Callable[[Any], None]] = []
+
+    def route(self, pattern: str, handler: Callable[[Any], None]) -> None:
+        self.handlers.append(handler)
+
+
+def test_installed_policy_counts_blocked_requests_and_estimated_bytes() -> None:
+    context = FakeContext()
+    install_network_policy(context, NetworkPolicy(parse_app_config(RAW).network))
+    calls: List[str] = []
+
+    (handler,) = context.handlers
+    handler(FakeRoute("https://cdn.example.test/a.png", "image", calls))
+    handler(FakeRoute("https://cdn.example.test/a.woff2", "font", calls))
+    handler(FakeRoute("https://store.supercell.com/", "document", calls))
+
+    stats = network_stats(context)
+    assert calls == ["abort", "abort", "fallback"]
+    assert stats is not None
+    assert (stats.blocked, stats.allowed, stats.estimated_bytes_saved) == (2, 1, 1010)
+    assert stats.as_dict()["blocked_by_domain"] == {"cdn.example.test": 2}
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+import urllib.request
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pytest
+
+from src.infrastructure.otp.mailboxes import ImapMailbox, MaildirMailbox
+from src.infrastructure.otp.messages import OtpMatcher, newest_code, otp_mail, parse_message
+from src.infrastructure.otp.providers import MailboxOtpProvider
+from src.infrastructure.standin.imap_standin import ImapStandIn
+from src.infrastructure.standin.supercell_store_standin import SupercellStoreStandIn
+
+
+EMAIL = "player@example.test"
+MATCHER = OtpMatcher(sender_pattern="supercell", code_pattern=r"\b(\d{6})\b", recipient=EMAIL)
+
+
+def _deliver_later(deliver, *args, delay_s: float = 0.2) -> threading.Thread:
+    thread = threading.Thread(target=lambda: (time.sleep(delay_s), deliver(*args)), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_matcher_takes_newest_fresh_code_from_supercell() -> None:
+    now = time.time()
+    fresh = parse_message(otp_mail(EMAIL, "123456").as_bytes(), received_at=now)
+    newer = parse_message(otp_mail(EMAIL, "654321").as_bytes(), received_at=now + 5)
+    stale = parse_message(otp_mail(EMAIL, "111111").as_bytes(), received_at=now - 600)
+    other_user = parse_message(otp_mail("someone@example.test", "222222").as_bytes(), received_at=now + 10)
+    spam = otp_mail(EMAIL, "333333")
+    spam.replace_header("From", "Promo <deals@example.test>")
+
+    assert "123456" in fresh.text and "<b>" not in fresh.text
+    assert newest_code([fresh, stale], MATCHER, since=now - 60) == "123456"
+    assert newest_code([fresh, newer, other_user], MATCHER, since=now - 60) == "654321"
+    assert newest_code([stale], MATCHER, since=now - 60) is None
+    assert newest_code([parse_message(spam.as_bytes(), received_at=now)], MATCHER, since=now - 60) is None
+
+
+def test_maildir_provider_returns_as_soon_as_mail_arrives(tmp_path: Path) -> None:
+    maildir = MaildirMailbox(tmp_path / "Maildir", poll_interval_s=0.02)
+    maildir.deliver(otp_mail(EMAIL, "111111"))
+    for path in (tmp_path / "Maildir" / "new").iterdir():
+        os.utime(path, (time.time() - 600, time.time() - 600))  # письмо от прошлого логина
+
+    provider = MailboxOtpProvider(maildir, MATCHER, timeout_s=5)
+    _deliver_later(maildir.deliver, otp_mail(EMAIL, "246810"))
+    started = time.monotonic()
+
+    assert provider() == "246810"
+    assert time.monotonic() - started < 2
+
+
+def test_maildir_provider_times_out_without_mail(tmp_path: Path) -> None:
+    provider = MailboxOtpProvider(MaildirMailbox(tmp_path / "Maildir", poll_interval_s=0.02), MATCHER, timeout_s=0.1)
+
+    with pytest.raises(RuntimeError):
+        provider()
+
+
+@pytest.mark.parametrize("idle", [True, False])
+def test_imap_provider_idle_and_polling(idle: bool) -> None:
+    with ImapStandIn(idle=idle) as server:
+        server.deliver(otp_mail(EMAIL, "111111"), received_at=time.time() - 600)
+        host, port = server.address
+        mailbox = ImapMailbox(host, port, "otp", "otp", ssl=False, poll_interval_s=0.1)
+        provider = MailboxOtpProvider(mailbox, MATCHER, timeout_s=5)
+
+        assert mailbox.supports_idle is idle
+        _deliver_later(server.deliver, otp_mail(EMAIL, "135790"))
+        started = time.monotonic()
+        assert provider() == "135790"
+        assert time.monotonic() - started < 2
+
+
+def test_supercell_standin_mails_issued_code(tmp_path: Path) -> None:
+    maildir = MaildirMailbox(tmp_path / "Maildir")
+    since = time.time() - 1
+    with SupercellStoreStandIn(port=0) as standin:
+        standin.add_mail_sink(maildir.deliver)
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        opener.open(f"{standin.base_url}/login", data=urlencode({"email": EMAIL}).encode()).close()
+
+        assert newest_code(maildir.messages(since), MATCHER, since) == standin.latest_otp(EMAIL)
@@ -0,0 +1,81 @@
+import socket
+from dataclasses import replace
+from typing import Iterator
+
+import pytest
+
+from src.infrastructure.config.app_config import AppConfig, PreflightConfig, SupercellConfig
+from src.infrastructure.health.preflight import (
+    PREFLIGHT_DOWN,
+    PREFLIGHT_ODD,
+    PREFLIGHT_OK,
+    PreflightTarget,
+    check_target,
+    default_targets,
+    new_connection_pool,
+    run_preflight,
+    title_pattern,
+)
+from src.infrastructure.standin.supercell_store_standin import SupercellStoreStandIn
+
+
+CFG = PreflightConfig(timeout_ms=2_000, slow_ms=1_000)
+
+
+@pytest.fixture
+def standin() -> Iterator[SupercellStoreStandIn]:
+    with SupercellStoreStandIn(port=0) as server:
+        yield server
+
+
+def _targets(base_url: str, *slugs: str):
+    return default_targets(AppConfig(supercell=SupercellConfig(base_url=base_url, game_slug="brawlstars")), slugs)
+
+
+def test_preflight_ok_against_standin_reuses_connections(standin: SupercellStoreStandIn) -> None:
+    pool = new_connection_pool(CFG)
+    targets = _targets(standin.base_url, "brawlstars", "clashofclans")
+
+    first = run_preflight(targets, pool, CFG)
+    second = run_preflight(targets, pool, CFG)
+
+    assert first.verdict == PREFLIGHT_OK, first.format_text()
+    by_name = {check.name: check for check in first.checks}
+    assert by_name["game:clashofclans"].title == "Clash of Clans Store"
+    # Без сессии аккаунт уводит на страницу игры.
+    assert by_name["account"].redirects == [f"{standin.base_url}/brawlstars"]
+    assert second.verdict == PREFLIGHT_OK
+    assert all(check.reused for check in second.checks)
+    assert pool.stats.created <= len(targets)
+
+
+def test_preflight_odd_on_title_mismatch_and_slow_store(standin: SupercellStoreStandIn) -> None:
+    pool = new_connection_pool(CFG)
+    wrong_title = PreflightTarget("game", f"{standin.base_url}/brawlstars", title=title_pattern("hayday"))
+
+    check = check_target(pool, wrong_title, CFG)
+    assert check.verdict == PREFLIGHT_ODD and "title" in check.detail
+
+    standin.set_latency(150)
+    slow = check_target(pool, replace(wrong_title, title=None), replace(CFG, slow_ms=100))
+    assert slow.verdict == PREFLIGHT_ODD and "slow" in slow.detail
+
+
+def test_preflight_down_when_nothing_listens() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    report = run_preflight(_targets(f"http://127.0.0.1:{port}"), new_connection_pool(CFG), CFG)
+
+    assert report.verdict == PREFLIGHT_DOWN
+    assert all(check.verdict == PREFLIGHT_DOWN for check in report.checks)
+    assert "Connection" in report.summary()
+
+
+def test_preflight_goes_through_http_proxy(standin: SupercellStoreStandIn) -> None:
+    # Stand-in принимает абсолютный URL в строке запроса и поэтому годится как прокси.
+    pool = new_connection_pool(CFG, proxy=standin.base_url)
+    target = PreflightTarget("game", "http://store.invalid/hayday", title=title_pattern("hayday"))
+
+    assert check_target(pool, target, CFG).verdict == PREFLIGHT_OK
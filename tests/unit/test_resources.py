@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+from src.infrastructure.config.app_config import ProfilingConfig
+from src.infrastructure.logging.tracing import span
+from src.infrastructure.perf.resources import (
+    LeakWatchdog,
+    install_profiler,
+    parse_proc_stat,
+    process_tree,
+    uninstall_profiler,
+)
+
+
+def _stat(pid: int, name: str, ppid: int, rss_pages: int, utime: int = 0, stime: int = 0) -> str:
+    fields = ["S", str(ppid)] + ["0"] * 9 + [str(utime), str(stime)] + ["0"] * 8 + [str(rss_pages)] + ["0"] * 20
+    return f"{pid} ({name}) " + " ".join(fields)
+
+
+def test_parse_proc_stat_handles_spaces_in_name() -> None:
+    sample = parse_proc_stat(_stat(42, "chrome (renderer)", 7, 256, utime=150, stime=50), page_size=4096, clock_ticks=100)
+
+    assert (sample.pid, sample.ppid, sample.name) == (42, 7, "chrome (renderer)")
+    assert sample.rss_bytes == 256 * 4096
+    assert sample.cpu_s == 2.0
+
+
+def test_process_tree_collects_descendants_only(tmp_path: Path) -> None:
+    for pid, name, ppid in ((10, "python", 1), (11, "node", 10), (12, "chrome", 11), (13, "chrome", 12), (20, "other", 1)):
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "stat").write_text(_stat(pid, name, ppid, 10), encoding="utf-8")
+    (tmp_path / "self").mkdir()
+
+    assert sorted(p.pid for p in process_tree([10], proc=tmp_path)) == [10, 11, 12, 13]
+    assert process_tree([99], proc=tmp_path) == []
+
+
+def test_watchdog_flags_sustained_growth_not_spikes(read_events) -> None:
+    watchdog = LeakWatchdog(window=4, thresholds={"rss_mb": 50})
+
+    for rss in (100, 400, 100, 110):  # разовый всплеск
+        assert watchdog.observe("spiky_flow", {"rss_mb": rss}) == []
+    flagged = [watchdog.observe("leaky_flow", {"rss_mb": rss}) for rss in (100, 120, 200, 260)]
+
+    assert flagged[-1] == ["rss_mb"]
+    warnings = [e for e in read_events() if e["stage"] == "resources.watchdog"]
+    assert [w["data"]["span"] for w in warnings] == ["leaky_flow"]
+
+
+def test_profiler_adds_resources_to_span_events(read_events) -> None:
+    cfg = ProfilingConfig(enabled=True, top_n=3, process_tree=os.path.isdir("/proc"))
+    profiler = install_profiler(cfg)
+    try:
+        assert profiler is not None
+        with span("purchase_flow", kind="flow"):
+            with span("go_to_product", kind="client"):
+                payload = [bytearray(64 * 1024) for _ in range(16)]
+    finally:
+        uninstall_profiler()
+    del payload
+
+    by_stage = {e["stage"]: e["data"]["resources"] for e in read_events()}
+    client, flow = by_stage["go_to_product"], by_stage["purchase_flow"]
+    assert client["delta"]["python_mb"] >= 0.9
+    assert "top_allocations" not in client
+    assert 0 < len(flow["top_allocations"]) <= 3
+    assert flow["leaks"] == []
+    if cfg.process_tree:
+        assert flow["rss_mb"] > 0
+        assert flow["by_name"]
+
+    with span("after_uninstall", kind="flow"):
+        pass
+    assert "resources" not in read_events()[-1]["data"]
+    assert install_profiler(ProfilingConfig(enabled=False)) is None
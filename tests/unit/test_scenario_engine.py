@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+
+from src.application.flows.aio import scenario_engine as aio_engine
+from src.application.flows.finalize_supercell_session import TEARDOWN_FAILED, TEARDOWN_SKIPPED
+from src.application.flows.purchase_order_flow import PURCHASE, finalize_report, new_context
+from src.application.flows.scenario_engine import STEP_FAILED, STEP_OK, STEP_SKIPPED, ScenarioContext, run_scenario
+from src.domain.scenario import RetryPolicy, Scenario, Step, compile_scenario, purchase_scenario
+
+
+def test_compile_orders_steps_and_rejects_bad_graphs() -> None:
+    compiled = compile_scenario(purchase_scenario())
+
+    names = [step.name for step in compiled.order]
+    assert names.index("checkout") < names.index("confirm_payment") < names.index("open_account")
+    assert compile_scenario(purchase_scenario()) is compiled
+
+    with pytest.raises(RuntimeError, match="неизвестного"):
+        compile_scenario(Scenario("bad", (Step("a", "x", requires=("missing",)),)))
+    with pytest.raises(RuntimeError, match="Цикл"):
+        compile_scenario(Scenario("cycle", (Step("a", "x", after=("b",)), Step("b", "x", requires=("a",)))))
+
+
+def test_purchase_logs_out_even_when_account_page_fails() -> None:
+    def ok(ctx: ScenarioContext) -> None:
+        pass
+
+    def open_account(ctx: ScenarioContext) -> None:
+        with ctx["finalize"].step("open_account", reraise=True):
+            raise TimeoutError("account page")
+
+    def pay(ctx: ScenarioContext) -> None:
+        raise RuntimeError("declined")
+
+    def logout(ctx: ScenarioContext) -> None:
+        with ctx["finalize"].step("logout", reraise=True) as outcome:
+            outcome.detail = "fast"
+
+    actions = {step.action: ok for step in PURCHASE.order}
+    actions.update({"google_pay.confirm": pay, "store.open_account": open_account, "store.logout": logout})
+    ctx = new_context(None, None, None, None)
+
+    result = run_scenario(PURCHASE, actions, ctx)
+    report = finalize_report(ctx, result)
+
+    assert isinstance(result.error, RuntimeError)
+    assert result.statuses["detach_payment"] == STEP_SKIPPED and result.statuses["logout"] == STEP_OK
+    assert list(report.steps) == ["open_account", "detach_payment", "logout"]
+    assert report.steps["logout"].detail == "fast"
+    assert report.steps["open_account"].status == TEARDOWN_FAILED
+    assert report.steps["detach_payment"].status == TEARDOWN_SKIPPED
+
+
+def test_required_failure_runs_only_always_steps_and_retries() -> None:
+    calls: List[str] = []
+    attempts = {"flaky": 0}
+
+    def flaky(ctx: ScenarioContext) -> None:
+        attempts["flaky"] += 1
+        calls.append("flaky")
+        if attempts["flaky"] < 2:
+            raise RuntimeError("transient")
+
+    def fail(ctx: ScenarioContext) -> None:
+        calls.append("pay")
+        raise RuntimeError("declined")
+
+    scenario = Scenario(
+        "s",
+        (
+            Step("open", "flaky", retry=RetryPolicy(attempts=2)),
+            Step("pay", "fail", requires=("open",)),
+            Step("receipt", "record", requires=("pay",)),
+            Step("cleanup", "record", after=("pay",), always=True),
+            Step("unrelated", "record", after=("open",)),
+        ),
+    )
+    actions = {"flaky": flaky, "fail": fail, "record": lambda ctx: calls.append("record")}
+
+    result = run_scenario(compile_scenario(scenario), actions, ScenarioContext(page=None))
+
+    assert str(result.error) == "declined"
+    assert result.statuses == {
+        "open": STEP_OK,
+        "pay": STEP_FAILED,
+        "receipt": STEP_SKIPPED,
+        "cleanup": STEP_OK,
+        "unrelated": STEP_SKIPPED,
+    }
+    assert calls == ["flaky", "flaky", "pay", "record"]
+
+
+def test_async_engine_bounds_step_by_its_timeout() -> None:
+    def sleeper(seconds: float):
+        async def action(ctx: ScenarioContext) -> None:
+            await asyncio.sleep(seconds)
+
+        return action
+
+    scenario = Scenario(
+        "bounded",
+        (
+            Step("a", "sleep"),
+            Step("slow", "slow", requires=("a",), timeout_ms=20),
+            Step("cleanup", "sleep", after=("slow",), always=True),
+        ),
+    )
+    actions = {"sleep": sleeper(0.01), "slow": sleeper(1)}
+
+    started = time.perf_counter()
+    result = asyncio.run(aio_engine.run_scenario(compile_scenario(scenario), actions, ScenarioContext(page=None)))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert result.statuses == {"a": STEP_OK, "slow": STEP_FAILED, "cleanup": STEP_OK}
+    assert isinstance(result.error, asyncio.TimeoutError)
@@ -0,0 +1,37 @@
+import json
+import time
+from pathlib import Path
+
+from conftest import FakeContext
+
+from src.infrastructure.browser.session_store import SessionStore
+
+
+LIVE = "https://store.example.test"
+STANDIN = "http://127.0.0.1:8765"
+STATE = {"cookies": [{"name": "sid", "value": "1", "domain": "store.example.test", "path": "/"}], "origins": []}
+
+
+def test_saved_session_is_restored_per_store_account_and_game(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path, ttl_s=60)
+    store.save(FakeContext(STATE), f"{LIVE}/", "Player@Example.test", "brawlstars")
+
+    context = FakeContext({})
+    assert store.restore(context, LIVE, "player@example.test", "brawlstars")
+    assert context.applied == [STATE]
+    assert not store.restore(FakeContext({}), LIVE, "player@example.test", "clashroyale")
+    # Сессия боевого магазина не подставляется в прогон против stand-in.
+    assert not store.restore(FakeContext({}), STANDIN, "player@example.test", "brawlstars")
+    assert all("example" not in p.name for p in tmp_path.iterdir())
+
+
+def test_expired_session_is_discarded(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path, ttl_s=60)
+    store.save(FakeContext(STATE), LIVE, "player@example.test", "brawlstars")
+    (path,) = tmp_path.iterdir()
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload["saved_at"] = time.time() - 120
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+    assert store.load(LIVE, "player@example.test", "brawlstars") is None
+    assert not path.exists()
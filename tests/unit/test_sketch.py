@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from src.infrastructure.perf.benchmark import percentile
+from src.infrastructure.perf.sketch import QuantileSketch
+
+
+def test_sketch_quantiles_stay_within_relative_accuracy() -> None:
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1) for _ in range(20_000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    assert len(sketch.buckets) < 2048
+    for q in (50, 90, 95, 99):
+        exact = percentile(values, q)
+        assert abs(sketch.quantile(q) - exact) / exact < 0.03
+
+
+def test_sketch_memory_is_bounded_and_merge_round_trips() -> None:
+    sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=64)
+    for i in range(1, 10_000):
+        sketch.add(float(i))
+    assert len(sketch.buckets) == 64
+    assert sketch.quantile(99) == pytest.approx(9900, rel=0.02)
+
+    other = QuantileSketch.from_dict(sketch.to_dict())
+    other.merge(sketch)
+    assert other.count == 2 * sketch.count
+    assert other.quantile(50) == sketch.quantile(50)
+
@@ -0,0 +1,73 @@
+import re
+from typing import Optional, Set
+
+import pytest
+
+from src.infrastructure.browser import deadlines, selectors
+from src.infrastructure.browser.supercell_store_client import PlaywrightTimeoutError, SupercellStoreClient
+
+
+@pytest.fixture(autouse=True)
+def _no_learned_timeouts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(deadlines, "learned_timeout_ms", lambda stage, origin=None: None)
+
+
+class FakeLocator:
+    def __init__(self, page: "FakePage", names: Set[str]) -> None:
+        self.page = page
+        self.names = names
+
+    @property
+    def first(self) -> "FakeLocator":
+        return self
+
+    def or_(self, other: "FakeLocator") -> "FakeLocator":
+        return FakeLocator(self.page, self.names | other.names)
+
+    def is_visible(self) -> bool:
+        return bool(self.names & self.page.links)
+
+    def wait_for(self, state: str, timeout: Optional[float] = None) -> None:
+        self.page.waits.append(timeout)
+        if not self.is_visible():
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded.")
+
+
+class FakePage:
+    context = None
+
+    def __init__(self, *links: str) -> None:
+        self.links = set(links)
+        self.waits = []
+
+    def get_by_role(self, role: str, name: re.Pattern) -> FakeLocator:
+        return FakeLocator(self, {link for link in ("Account", "Log in") if name.search(link)})
+
+
+def _client(page: FakePage, monkeypatch: pytest.MonkeyPatch) -> SupercellStoreClient:
+    client = SupercellStoreClient(page, "https://store.invalid", "brawlstars", resolver=object(), catalog=object())
+    monkeypatch.setattr(client, "open_store", lambda: None)
+    return client
+
+
+@pytest.mark.parametrize(
+    "links, logged_in",
+    [(("Account",), True), (("Log in",), False), ((), False)],
+    ids=["account", "login", "blank"],
+)
+
+
+def test_is_logged_in_decides_on_first_visible_marker(
+    links, logged_in: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    page = FakePage(*links)
+
+    assert _client(page, monkeypatch).is_logged_in(timeout_ms=3_000) is logged_in
+    # Одно ожидание на оба маркера, без отдельного таймаута на "Log in".
+    assert page.waits == [3_000]
+
+
+def test_account_and_login_selectors_do_not_overlap() -> None:
+    assert selectors.STORE_ACCOUNT_LINK_NAME.search("Account")
+    assert not selectors.STORE_ACCOUNT_LINK_NAME.search("Log in")
+    assert not selectors.STORE_LOGIN_LINK_NAME.search("Account")
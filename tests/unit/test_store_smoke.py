@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from src.application.flows.aio.store_smoke import (
+    SMOKE_FAILED,
+    SMOKE_OK,
+    SMOKE_TIMEOUT,
+    run_smoke_matrix,
+)
+from src.infrastructure.config.app_config import parse_app_config
+from src.infrastructure.health.preflight import title_pattern
+from src.infrastructure.standin.supercell_store_standin import GAME_TITLES
+
+
+def test_matrix_bounds_concurrency_and_isolates_failures(read_events) -> None:
+    in_flight, peak = 0, 0
+
+    async def check(slug: str) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(5 if slug == "hayday" else 0.05)
+            if slug == "clashroyale":
+                raise RuntimeError("heading not found")
+        finally:
+            in_flight -= 1
+
+    slugs = ["brawlstars", "clashroyale", "hayday", "clashofclans", "squadbusters", "brawlstars"]
+    report = asyncio.run(run_smoke_matrix(slugs, check, concurrency=2, deadline_ms=300))
+
+    assert peak == 2
+    assert [r.slug for r in report.results] == ["brawlstars", "clashroyale", "hayday", "clashofclans", "squadbusters"]
+    assert {r.slug: r.status for r in report.results} == {
+        "brawlstars": SMOKE_OK,
+        "clashroyale": SMOKE_FAILED,
+        "hayday": SMOKE_TIMEOUT,
+        "clashofclans": SMOKE_OK,
+        "squadbusters": SMOKE_OK,
+    }
+    # Медленная игра упирается в свой срок, а не держит матрицу.
+    assert report.results[2].elapsed_ms < 1_000
+    assert not report.passed
+    assert "FAIL: 3/5 ok" in report.format_text()
+
+    spans = read_events()
+    assert sorted(e["data"]["game_slug"] for e in spans if e["status"] == "error") == ["clashroyale", "hayday"]
+
+
+def test_title_pattern_matches_game_names() -> None:
+    for slug, title in GAME_TITLES.items():
+        assert title_pattern(slug).search(f"Discover {title} Store"), slug
+    assert not title_pattern("brawlstars").search("Clash Royale Store")
+
+
+def test_smoke_section_dedupes_slugs_and_rejects_zero_concurrency() -> None:
+    cfg = parse_app_config({"smoke": {"game_slugs": ["brawlstars", "/hayday/", "brawlstars"], "concurrency": 3}})
+
+    assert cfg.smoke.game_slugs == ("brawlstars", "hayday")
+    assert parse_app_config({}).smoke.game_slugs == ()
+    with pytest.raises(RuntimeError):
+        parse_app_config({"smoke": {"concurrency": 0}})
@@ -0,0 +1,65 @@
+import time
+import urllib.request
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+
+import pytest
+
+from src.infrastructure.standin.supercell_store_standin import SupercellStoreStandIn
+
+
+@pytest.fixture
+def standin():
+    with SupercellStoreStandIn(port=0) as server:
+        yield server
+
+
+def _opener() -> urllib.request.OpenerDirector:
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+
+def _get(opener, url: str) -> str:
+    with opener.open(url) as response:
+        return response.read().decode("utf-8")
+
+
+def test_login_with_otp_and_account_page(standin: SupercellStoreStandIn) -> None:
+    opener = _opener()
+
+    store_page = _get(opener, f"{standin.base_url}/brawlstars")
+    assert "<title>Brawl Stars Store</title>" in store_page
+    assert ">Log in<" in store_page
+    assert "/brawlstars/product/80-gems" in store_page
+
+    opener.open(f"{standin.base_url}/login", data=urlencode({"email": "Player@Example.test"}).encode())
+    code = _get(opener, f"{standin.base_url}/__standin/otp?email=player@example.test")
+    with opener.open(f"{standin.base_url}/login/code", data=urlencode({"code": code}).encode()) as response:
+        assert response.url.endswith("/brawlstars")
+        assert ">Log in<" not in response.read().decode("utf-8")
+
+    account_page = _get(opener, f"{standin.base_url}/account")
+    assert "<h1>Account</h1>" in account_page
+    assert "Payment information" in account_page
+    assert ">Log out<" in account_page
+
+    _get(opener, f"{standin.base_url}/logout")
+    assert ">Log in<" in _get(opener, f"{standin.base_url}/brawlstars")
+
+
+def test_wrong_otp_is_rejected(standin: SupercellStoreStandIn) -> None:
+    opener = _opener()
+    opener.open(f"{standin.base_url}/login", data=urlencode({"email": "player@example.test"}).encode())
+
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        opener.open(f"{standin.base_url}/login/code", data=urlencode({"code": "not-a-code"}).encode())
+    assert exc_info.value.code == 401
+
+
+def test_injected_latency(standin: SupercellStoreStandIn) -> None:
+    standin.set_latency(50)
+    opener = _opener()
+
+    started = time.perf_counter()
+    _get(opener, f"{standin.base_url}/__standin/health")
+
+    assert time.perf_counter() - started >= 0.05
@@ -0,0 +1,185 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from conftest import AsyncFakePage, FakePage
+
+from src.infrastructure.browser import deadlines
+from src.infrastructure.browser.deadlines import adaptive_deadline, current_deadline_ms, deadline, task_deadline
+from src.infrastructure.config.app_config import TimeoutPolicyConfig, load_app_config
+from src.infrastructure.logging import events
+from src.infrastructure.perf import timeout_policy
+from src.infrastructure.perf.timeout_policy import TimeoutPolicy, learn_quantiles, load_timeout_policy
+
+
+NOW = datetime(2026, 5, 1, tzinfo=timezone.utc)
+CFG = TimeoutPolicyConfig(quantile=99, factor=3.0, floor_ms=1_000, cap_ms=20_000, min_samples=3, history_days=7)
+
+
+def _span(stage: str, duration_ms: float, status: str = "ok", kind: str = "client", age_days: float = 0) -> Dict[str, Any]:
+    return {
+        "ts": (NOW - timedelta(days=age_days)).isoformat(),
+        "stage": stage,
+        "status": status,
+        "data": {"kind": kind, "duration_ms": duration_ms},
+    }
+
+
+def test_learns_only_recent_client_spans_and_skips_other_errors() -> None:
+    records = [
+        *(_span("go_to_product", 1_000) for _ in range(5)),
+        _span("go_to_product", 30_000, status="error"),  # ошибка не таймаут: не учитывается
+        _span("go_to_product", 30_000, age_days=30),  # вне окна истории
+        _span("purchase_order_flow", 30_000, kind="flow"),
+    ]
+
+    learned = learn_quantiles(records, CFG, now=NOW)
+
+    assert set(learned) == {"go_to_product"}
+    assert learned["go_to_product"]["count"] == 5
+    assert learned["go_to_product"]["quantile_ms"] == pytest.approx(1_000, rel=0.02)
+
+
+def test_timed_out_calls_count_at_least_at_their_deadline() -> None:
+    timed_out = _span("go_to_product", 2_900, status="error")
+    timed_out["data"].update(error="TimeoutError: Timeout 3000ms exceeded.", timeout_ms=3_000)
+    no_signal = _span("go_to_product", 3_100, status="error")
+    no_signal["data"]["error"] = "CompletionTimeoutError: ни один сигнал завершения не сработал"
+    records = [*(_span("go_to_product", 1_000) for _ in range(5)), timed_out, no_signal]
+
+    learned = learn_quantiles(records, CFG, now=NOW)
+
+    assert learned["go_to_product"]["count"] == 7
+    assert learned["go_to_product"]["quantile_ms"] == pytest.approx(3_100, rel=0.02)
+    assert timeout_policy.learned_sample_ms(timed_out) == 3_000
+
+
+def test_history_is_kept_per_origin() -> None:
+    standin, live = "http://127.0.0.1:8765", "https://store.supercell.com"
+    records = [_span("open_store", 20) for _ in range(5)]
+    for record in records:
+        record["data"]["origin"] = standin
+    policy = TimeoutPolicy(learn_quantiles(records, CFG, now=NOW), CFG)
+
+    assert policy.timeout_ms("open_store", standin) == 1_000
+    assert policy.timeout_ms("open_store", live) is None  # stand-in не урезает сроки боевого магазина
+    assert policy.timeout_ms("open_store") is None
+
+
+def test_client_origin_prefers_base_url_over_page() -> None:
+    client = Client()
+    assert deadlines.client_origin(client) is None  # about:blank
+    client.page.url = "https://accounts.google.com/signin?x=1"
+    assert deadlines.client_origin(client) == "https://accounts.google.com"
+    client.base_url = "http://127.0.0.1:8765/"
+    assert deadlines.client_origin(client) == "http://127.0.0.1:8765"
+
+
+def test_timeout_is_quantile_times_factor_within_bounds() -> None:
+    policy = TimeoutPolicy(
+        {
+            "go_to_product": {"count": 10, "quantile_ms": 2_000},
+            "open_store": {"count": 10, "quantile_ms": 50},
+            "login_and_confirm_payment": {"count": 10, "quantile_ms": 60_000},
+            "add_to_cart": {"count": 2, "quantile_ms": 500},
+        },
+        CFG,
+    )
+
+    assert policy.timeout_ms("go_to_product") == 6_000
+    assert policy.timeout_ms("open_store") == 1_000  # floor
+    assert policy.timeout_ms("login_and_confirm_payment") == 20_000  # cap
+    assert policy.timeout_ms("add_to_cart") is None  # мало истории
+    assert policy.timeout_ms("unknown") is None
+
+
+def test_policy_is_cached_until_rebuild(tmp_path: Path) -> None:
+    log_file = tmp_path / "events.ndjson"
+    cache_path = tmp_path / "timeouts.json"
+    log_file.write_text("".join(json.dumps(_span("open_store", 100)) + "\n" for _ in range(3)), encoding="utf-8")
+    cfg = TimeoutPolicyConfig(min_samples=3, history_days=36_500)
+
+    first = load_timeout_policy(cfg, log_file=log_file, cache_path=cache_path)
+    assert first.learned["open_store"]["count"] == 3
+
+    log_file.write_text("", encoding="utf-8")
+    assert load_timeout_policy(cfg, log_file=log_file, cache_path=cache_path).learned == first.learned
+    assert load_timeout_policy(cfg, log_file=log_file, cache_path=cache_path, rebuild=True).learned == {}
+
+
+class Client:
+    def __init__(self) -> None:
+        self.page = FakePage()
+        self.seen: List[Any] = []
+
+    @adaptive_deadline()
+    def go_to_product(self) -> None:
+        self.seen.append(current_deadline_ms())
+
+    @adaptive_deadline()
+    def add_to_cart(self) -> None:
+        self.seen.append(current_deadline_ms())
+
+
+def test_nested_deadline_is_capped_by_outer_and_restores_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    policy = TimeoutPolicy({"go_to_product": {"count": 10, "quantile_ms": 2_000}}, CFG)
+    monkeypatch.setattr(timeout_policy, "default_timeout_policy", lambda: policy)
+    client = Client()
+    context = client.page.context
+    playwright = load_app_config().playwright
+
+    client.go_to_product()
+    client.add_to_cart()  # без истории срок не ставится
+    with deadline(context, 3_000):
+        client.go_to_product()
+
+    assert client.seen == [6_000, None, 3_000]
+    assert current_deadline_ms() is None
+    # Выученный срок метода не трогает навигационный таймаут; явный deadline() ставит оба.
+    assert context.timeouts == [
+        ("default", 6_000),
+        ("default", playwright.page_timeout_ms),
+        ("default", 3_000),
+        ("navigation", 3_000),
+        ("default", 3_000),
+        ("default", 3_000),
+        ("default", playwright.page_timeout_ms),
+        ("navigation", playwright.navigation_timeout_ms),
+    ]
+
+
+class AsyncClient:
+    def __init__(self) -> None:
+        self.page = AsyncFakePage()
+
+    @adaptive_deadline()
+    async def go_to_product(self, pause_s: float) -> Any:
+        await asyncio.sleep(pause_s)
+        return current_deadline_ms()
+
+
+def test_async_deadlines_stay_per_task_and_leave_context_alone(monkeypatch: pytest.MonkeyPatch) -> None:
+    policy = TimeoutPolicy({"go_to_product": {"count": 10, "quantile_ms": 2_000}}, CFG)
+    monkeypatch.setattr(timeout_policy, "default_timeout_policy", lambda: policy)
+    client = AsyncClient()
+
+    async def one(timeout_ms: float, pause_s: float) -> Any:
+        with task_deadline(timeout_ms):
+            return await client.go_to_product(pause_s)
+
+    async def main() -> List[Any]:
+        # Задачи делят одну страницу и пересекаются по времени.
+        return list(await asyncio.gather(one(3_000, 0.02), one(20_000, 0), client.go_to_product(0.01)))
+
+    assert asyncio.run(main()) == [3_000, 6_000, 6_000]
+    assert client.page.context.timeouts == []
+
+
+def test_disabled_policy_keeps_config_timeouts(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(timeout_policy, "default_timeout_policy", lambda: None)
+
+    assert deadlines.learned_timeout_ms("go_to_product") is None
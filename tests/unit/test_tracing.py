@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.logging import events
+from src.infrastructure.logging.tracing import run, span, traced
+
+
+class Client:
+    @traced()
+    def proceed_to_checkout(self) -> str:
+        return "done"
+
+    @traced()
+    def detach_payment_method(self) -> None:
+        raise RuntimeError("no button")
+
+
+def test_spans_nest_and_share_run_id(read_events) -> None:
+    with run(name="test", run_id="run-1"):
+        with span("purchase_80_gems_flow", kind="flow"):
+            assert Client().proceed_to_checkout() == "done"
+            with pytest.raises(RuntimeError):
+                Client().detach_payment_method()
+        events.log_event(stage="custom", status="info", message="inside run")
+
+    records = {r["stage"]: r for r in read_events()}
+    flow = records["purchase_80_gems_flow"]
+    root = records["test"]
+
+    assert {r["run_id"] for r in records.values()} == {"run-1"}
+    assert flow["data"]["parent_id"] == root["data"]["span_id"]
+    assert records["proceed_to_checkout"]["data"]["parent_id"] == flow["data"]["span_id"]
+    assert records["proceed_to_checkout"]["status"] == "ok"
+    assert records["detach_payment_method"]["status"] == "error"
+    assert "no button" in records["detach_payment_method"]["data"]["error"]
+    assert flow["data"]["duration_ms"] >= 0
+
+
+def test_concurrent_runs_get_distinct_run_ids(read_events) -> None:
+    @traced(kind="flow")
+    async def flow() -> None:
+        await asyncio.sleep(0)
+
+    async def one(run_id: str) -> None:
+        with run(run_id=run_id):
+            await flow()
+
+    async def main() -> None:
+        await asyncio.gather(one("a"), one("b"))
+
+    asyncio.run(main())
+
+    flows = [r for r in read_events() if r["stage"] == "flow"]
+    assert sorted(r["run_id"] for r in flows) == ["a", "b"]
+    assert events.current_run_id() is None